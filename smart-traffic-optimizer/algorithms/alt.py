@@ -0,0 +1,159 @@
+import numpy as np
+from datetime import datetime
+from algorithms.compiled_graph import as_compiled
+from algorithms.dijkstra import shortest_path_tree
+from algorithms.astar import astar_cost_table, astar_search, terrain_heuristic_array
+
+# Default number of landmarks; each one costs two distance arrays over all nodes
+DEFAULT_NUM_LANDMARKS = 8
+
+
+class ALTLandmarks:
+    """
+    Landmark distance tables for ALT (A*, Landmarks, Triangle inequality)
+
+    forward[k, v] is the cost from landmark k to node v and backward[k, v] the
+    cost from node v to landmark k. By the triangle inequality both
+    forward[k, t] - forward[k, v] and backward[k, v] - backward[k, t] are lower
+    bounds on the cost from v to t.
+    """
+
+    def __init__(self, landmarks, forward, backward):
+        self.landmarks = landmarks
+        self.forward = forward
+        self.backward = backward
+
+    def lower_bounds(self, target):
+        """Admissible and consistent heuristic from every node to node index target"""
+        with np.errstate(invalid='ignore'):
+            bounds = np.maximum(
+                self.forward[:, target][:, None] - self.forward,
+                self.backward - self.backward[:, target][:, None]
+            )
+        # inf - inf (both unreachable from a landmark) carries no information
+        bounds = np.nan_to_num(bounds, nan=0.0, posinf=np.inf, neginf=0.0)
+        return np.maximum(bounds.max(axis=0), 0.0)
+
+
+def select_landmarks(G, costs, num_landmarks=DEFAULT_NUM_LANDMARKS, seeds=None):
+    """
+    Pick landmarks by farthest-point selection and precompute their distance tables
+
+    Starting from the seed nodes (string IDs, e.g. the Char Dham temples) or,
+    without seeds, from the node farthest from node 0, each further landmark is
+    the reachable node with the largest round-trip cost to its nearest landmark
+    so far, which tends to pick border towns and other periphery nodes.
+
+    Args:
+        G: CompiledGraph
+        costs: Per-edge cost array the heuristic must be admissible for
+        num_landmarks: Total number of landmarks
+        seeds: Optional list of string node IDs to use as the first landmarks
+    """
+    n = G.num_nodes
+    num_landmarks = min(num_landmarks, n)
+    landmarks = [G.index[node_id] for node_id in (seeds or []) if node_id in G.index][:num_landmarks]
+
+    if not landmarks:
+        distances, _ = shortest_path_tree(G, 0, weights=costs)
+        distances[~np.isfinite(distances)] = -1.0
+        landmarks = [int(np.argmax(distances))]
+
+    forward, backward = [], []
+    nearest = np.full(n, np.inf)
+    while True:
+        for landmark in landmarks[len(forward):]:
+            forward.append(shortest_path_tree(G, landmark, weights=costs)[0])
+            backward.append(shortest_path_tree(G, landmark, weights=costs, reverse=True)[0])
+            nearest = np.minimum(nearest, forward[-1] + backward[-1])
+        if len(landmarks) >= num_landmarks:
+            break
+
+        candidates = np.where(np.isfinite(nearest), nearest, -1.0)
+        candidates[landmarks] = -1.0
+        farthest = int(np.argmax(candidates))
+        if candidates[farthest] <= 0:
+            break
+        landmarks.append(farthest)
+
+    return ALTLandmarks(np.asarray(landmarks), np.vstack(forward), np.vstack(backward))
+
+
+def alt_astar_algorithm(G, start, end, current_month=None, num_landmarks=DEFAULT_NUM_LANDMARKS,
+                        seeds=None, stats=None):
+    """
+    A* with ALT landmark lower bounds on the terrain-aware edge costs of astar_algorithm
+
+    Unlike terrain_aware_heuristic the landmark bound never overestimates, so
+    the returned route is optimal for the A* cost model. Landmark tables are
+    cached on the compiled graph per month and graph version.
+
+    Args:
+        G: NetworkX graph or CompiledGraph
+        start: Starting node
+        end: Target node
+        current_month: Month for seasonal factors (defaults to now)
+        num_landmarks: Number of landmarks to select
+        seeds: Optional string node IDs to use as the first landmarks
+        stats: Optional dict that receives the number of node expansions
+
+    Returns:
+        cost: Total A* cost of the route
+        path: List of nodes in path
+    """
+    G = as_compiled(G)
+    if start not in G or end not in G:
+        return float('inf'), []
+    if current_month is None:
+        current_month = datetime.now().month
+
+    costs = astar_cost_table(G, current_month)
+    landmarks = G.derived(
+        ('alt_landmarks', current_month, num_landmarks, tuple(seeds or ())),
+        lambda: select_landmarks(G, costs, num_landmarks, seeds)
+    )
+
+    t = G.index[end]
+    heuristic = landmarks.lower_bounds(t).tolist()
+    cost, predecessors = astar_search(G, G.index[start], t, costs, heuristic, stats)
+    if cost == float('inf'):
+        return float('inf'), []
+
+    return cost, G.path_from_predecessors(predecessors, t)
+
+
+def compare_heuristics(G, pairs, current_month=None, num_landmarks=DEFAULT_NUM_LANDMARKS):
+    """
+    Run A* with the terrain-aware heuristic and with ALT on the same queries
+
+    Args:
+        G: NetworkX graph or CompiledGraph
+        pairs: Iterable of (start, end) string node IDs
+
+    Returns:
+        list of dicts with the cost and node expansions of both heuristics per pair
+    """
+    G = as_compiled(G)
+    if current_month is None:
+        current_month = datetime.now().month
+    costs = astar_cost_table(G, current_month)
+
+    rows = []
+    for start, end in pairs:
+        s, t = G.index[start], G.index[end]
+
+        terrain_stats = {}
+        terrain_cost, _ = astar_search(G, s, t, costs, terrain_heuristic_array(G, t).tolist(), terrain_stats)
+
+        alt_stats = {}
+        alt_cost, _ = alt_astar_algorithm(G, start, end, current_month, num_landmarks, stats=alt_stats)
+
+        rows.append({
+            'start': start,
+            'end': end,
+            'terrain_cost': terrain_cost,
+            'terrain_expanded': terrain_stats['expanded'],
+            'alt_cost': alt_cost,
+            'alt_expanded': alt_stats['expanded']
+        })
+    return rows
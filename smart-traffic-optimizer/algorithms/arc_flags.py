@@ -0,0 +1,200 @@
+import heapq
+import numpy as np
+from algorithms.compiled_graph import as_compiled
+from algorithms.delta_stepping import many_source_distances
+from algorithms.dijkstra import _dijkstra_compiled
+from algorithms.overlay_graph import kmeans_partition
+
+# Regions used by the k-means partition
+DEFAULT_NUM_REGIONS = 8
+
+# Upper bound on the entries of the distance and tightness arrays built per
+# chunk of boundary nodes (boundary nodes x max(nodes, edges))
+MAX_CHUNK_ENTRIES = 1 << 22
+
+
+class ArcFlags:
+    """
+    Arc flags: per edge, the regions whose shortest paths can use it
+
+    flags[e, r] is set when edge e lies on some shortest path into region r,
+    so a query towards a node of region r may skip every edge whose flag for
+    r is off without losing optimality.
+    """
+
+    def __init__(self, regions, flags):
+        self.regions = regions
+        self.flags = flags
+
+    @property
+    def num_regions(self):
+        return self.flags.shape[1]
+
+    def stats(self):
+        """Share of edges flagged per region, on average"""
+        return {
+            'regions': self.num_regions,
+            'flagged_share': float(self.flags.mean()),
+            'bytes': self.flags.nbytes
+        }
+
+
+def region_partition(G, method='division', num_regions=DEFAULT_NUM_REGIONS):
+    """
+    Regions for arc flags: the division of each node, or k-means cells over pos
+
+    Returns:
+        ndarray: region id of every node
+    """
+    G = as_compiled(G)
+    if method == 'division':
+        _, regions = np.unique(G.division, return_inverse=True)
+        return regions.astype(np.int64)
+    if method == 'kmeans':
+        return kmeans_partition(G, num_regions)
+    raise ValueError(f"Unknown region method: {method}")
+
+
+def build_arc_flags(G, regions, weights=None):
+    """
+    Compute arc flags for a region partition
+
+    A shortest path into region r enters it for the last time through a
+    boundary node b of r (a node of r with an incoming edge from outside),
+    and stays inside r from there. So edge u -> v gets flag r when it is
+    inside r, or tight (dist(u, b) = w + dist(v, b)) in the backward search
+    from some boundary node b of r. Backward searches run as batched
+    delta-stepping over chunks of boundary nodes, so memory stays within
+    MAX_CHUNK_ENTRIES whatever the number of boundary nodes.
+
+    Args:
+        G: NetworkX graph or CompiledGraph
+        regions: Region id of every node
+        weights: Optional per-edge weight array (defaults to G.weight)
+
+    Returns:
+        ArcFlags
+    """
+    G = as_compiled(G)
+    weights = G.weight if weights is None else np.asarray(weights, dtype=np.float64)
+    regions = np.asarray(regions, dtype=np.int64)
+    tails, heads = G.sources, G.targets
+    num_regions = int(regions.max()) + 1 if len(regions) else 0
+
+    flags = np.zeros((G.num_edges, num_regions), dtype=bool)
+    inside = regions[tails] == regions[heads]
+    flags[inside, regions[heads[inside]]] = True
+
+    entering = ~inside
+    chunk_size = max(1, MAX_CHUNK_ENTRIES // max(G.num_nodes, G.num_edges, 1))
+    for r in range(num_regions):
+        boundary = np.unique(heads[entering & (regions[heads] == r)])
+        for start in range(0, len(boundary), chunk_size):
+            distances = many_source_distances(G, boundary[start:start + chunk_size], weights=weights, reverse=True)
+            to_tail, to_head = distances[:, tails], distances[:, heads]
+            with np.errstate(invalid='ignore'):
+                tight = np.isfinite(to_head) & (to_tail >= to_head + weights - 1e-9 * np.maximum(to_tail, 1.0))
+            flags[tight.any(axis=0), r] = True
+
+    return ArcFlags(regions, flags)
+
+
+def arc_flags_for(G, method='division', num_regions=DEFAULT_NUM_REGIONS):
+    """Arc flags for the graph weights, cached on the graph per traffic version"""
+    G = as_compiled(G)
+    return G.derived(('arc_flags', method, num_regions),
+                     lambda: build_arc_flags(G, region_partition(G, method, num_regions)))
+
+
+def arc_flags_algorithm(G, source, target, method='division', num_regions=DEFAULT_NUM_REGIONS, stats=None):
+    """
+    Dijkstra's algorithm that only follows edges flagged for the target's region
+
+    Args:
+        G: NetworkX graph or CompiledGraph
+        source: Starting node
+        target: Target node
+        method: Region partition ('division' or 'kmeans')
+        num_regions: Number of k-means regions
+        stats: Optional dict that receives the number of settled nodes
+
+    Returns:
+        distance: Total weight of the shortest path
+        path: List of nodes in path
+    """
+    G = as_compiled(G)
+    s = G.index.get(source)
+    t = G.index.get(target)
+    if s is None or t is None:
+        return float('infinity'), []
+
+    arc_flags = arc_flags_for(G, method, num_regions)
+    usable = arc_flags.flags[:, arc_flags.regions[t]]
+    offsets, targets, weights = G.offsets, G.targets, G.weight
+
+    distances = {s: 0.0}
+    predecessors = {s: -1}
+    priority_queue = [(0.0, s)]
+    visited = set()
+
+    while priority_queue:
+        current_distance, current_node = heapq.heappop(priority_queue)
+
+        if current_node == t:
+            break
+
+        if current_node in visited:
+            continue
+
+        visited.add(current_node)
+
+        start, stop = offsets[current_node], offsets[current_node + 1]
+        for neighbor, weight, flagged in zip(targets[start:stop].tolist(), weights[start:stop].tolist(),
+                                             usable[start:stop].tolist()):
+            if not flagged or neighbor in visited:
+                continue
+
+            distance = current_distance + weight
+            if distance < distances.get(neighbor, float('infinity')):
+                distances[neighbor] = distance
+                predecessors[neighbor] = current_node
+                heapq.heappush(priority_queue, (distance, neighbor))
+
+    if stats is not None:
+        stats['settled'] = len(visited)
+
+    if t not in distances:
+        return float('infinity'), []
+
+    return distances[t], G.path_from_predecessors(predecessors, t)
+
+
+def compare_settled(G, pairs, method='division', num_regions=DEFAULT_NUM_REGIONS):
+    """
+    Run plain Dijkstra and arc-flag Dijkstra on the same queries
+
+    Args:
+        G: NetworkX graph or CompiledGraph
+        pairs: Iterable of (source, target) string node IDs
+
+    Returns:
+        list of dicts with the distance and settled nodes of both searches per pair
+    """
+    G = as_compiled(G)
+    rows = []
+    for source, target in pairs:
+        plain_stats = {}
+        plain_distance, _ = _dijkstra_compiled(G, source, target, plain_stats)
+
+        flag_stats = {}
+        flag_distance, _ = arc_flags_algorithm(G, source, target, method, num_regions, flag_stats)
+
+        rows.append({
+            'source': source,
+            'target': target,
+            'dijkstra_distance': plain_distance,
+            'dijkstra_settled': plain_stats.get('settled', 0),
+            'arc_flags_distance': flag_distance,
+            'arc_flags_settled': flag_stats.get('settled', 0)
+        })
+    return rows
@@ -1,7 +1,19 @@
+import heapq
 import networkx as nx
 import numpy as np
 from math import sqrt
 from datetime import datetime
+from algorithms.compiled_graph import CompiledGraph
+
+# Main pilgrimage routes with extra traffic in the Yatra season
+PILGRIMAGE_ROUTES = ['NH-7', 'NH-58', 'NH-109']
+
+# Road type and condition factors
+ROAD_FACTORS = {
+    'highway': {'excellent': 0.8, 'good': 0.9, 'moderate': 1.0},
+    'hill': {'excellent': 0.9, 'good': 1.1, 'moderate': 1.3},
+    'mountain': {'excellent': 1.0, 'good': 1.3, 'moderate': 1.6, 'challenging': 2.0}
+}
 
 def euclidean_distance(pos1, pos2):
     """Calculate Euclidean distance between two points"""
@@ -31,7 +43,7 @@ def get_seasonal_factor(edge_data, current_month=None):
     
     # Tourist/Yatra season (April to September)
     if current_month in [4, 5, 6, 7, 8, 9]:
-        if edge_data.get('name') in ['NH-7', 'NH-58', 'NH-109']:  # Main pilgrimage routes
+        if edge_data.get('name') in PILGRIMAGE_ROUTES:  # Main pilgrimage routes
             seasonal_factor *= 1.4  # Higher traffic on pilgrimage routes
     
     return seasonal_factor
@@ -78,6 +90,10 @@ def astar_algorithm(G, start, end, current_month=None):
     if start not in G or end not in G:
         return float('inf'), []
     
+    # Array-backed graphs use the CSR implementation
+    if isinstance(G, CompiledGraph):
+        return _astar_compiled(G, start, end, current_month)
+    
     # Initialize data structures
     frontier = {start: 0}  # Priority queue
     came_from = {start: None}
@@ -101,15 +117,9 @@ def astar_algorithm(G, start, end, current_month=None):
             traffic_factor = 1 + edge_data['traffic']
             
             # Road type and condition factors
-            road_factors = {
-                'highway': {'excellent': 0.8, 'good': 0.9, 'moderate': 1.0},
-                'hill': {'excellent': 0.9, 'good': 1.1, 'moderate': 1.3},
-                'mountain': {'excellent': 1.0, 'good': 1.3, 'moderate': 1.6, 'challenging': 2.0}
-            }
-            
             road_type = edge_data['type']
             road_condition = edge_data['condition']
-            road_factor = road_factors.get(road_type, {}).get(road_condition, 1.0)
+            road_factor = ROAD_FACTORS.get(road_type, {}).get(road_condition, 1.0)
             
             # Lane factor
             lane_factor = 1.5 if edge_data['lanes'] == 1 else 1.0
@@ -163,3 +173,154 @@ def astar_algorithm(G, start, end, current_month=None):
     path.reverse()
     
     return cost_so_far[end], path
+
+def _astar_compiled(G, start, end, current_month=None):
+    """astar_algorithm over a CompiledGraph using the heap engine and a cost table"""
+    if current_month is None:
+        current_month = datetime.now().month
+    
+    t = G.index[end]
+    costs = astar_cost_table(G, current_month)
+    heuristic = terrain_heuristic_array(G, t).tolist()
+    
+    cost, predecessors = astar_search(G, G.index[start], t, costs, heuristic)
+    if cost == float('inf'):
+        return float('inf'), []
+    
+    return cost, G.path_from_predecessors(predecessors, t)
+
+def astar_cost_table(G, current_month=None):
+    """
+    Per-edge A* costs for a CompiledGraph
+    
+    Folds the traffic, road/condition, lane, seasonal, elevation and route
+    factors of astar_algorithm into one array, multiplied in the same order so
+    route costs match the NetworkX implementation exactly. The table is cached
+    on the graph per month and rebuilt when the graph version (traffic) changes.
+    """
+    if current_month is None:
+        current_month = datetime.now().month
+    return G.derived(('astar_costs', current_month), lambda: _build_cost_table(G, current_month))
+
+def _build_cost_table(G, current_month):
+    road_types = G.labels['road_type']
+    conditions = G.labels['condition']
+    node_types = G.labels['node_type']
+    
+    # Road type and condition factors, indexed by category code
+    road_factor_table = np.array([
+        [ROAD_FACTORS.get(road_type, {}).get(condition, 1.0) for condition in conditions]
+        for road_type in road_types
+    ])
+    
+    # Seasonal factors depend only on road type and whether it is a pilgrimage route
+    seasonal_table = np.array([
+        [get_seasonal_factor({'type': road_type, 'name': name}, current_month)
+         for name in (None, PILGRIMAGE_ROUTES[0])]
+        for road_type in road_types
+    ])
+    if G.edge_names is not None:
+        pilgrimage_route = np.isin(np.asarray(G.edge_names, dtype=object), PILGRIMAGE_ROUTES).astype(np.intp)
+    else:
+        pilgrimage_route = np.zeros(G.num_edges, dtype=np.intp)
+    
+    # Special route types, indexed by the node type of the edge head
+    route_factor_table = np.array([
+        {'char_dham': 1.4, 'pilgrimage': 1.2, 'tourist': 1.1}.get(node_type, 1.0)
+        for node_type in node_types
+    ])
+    
+    elevation_diff = np.abs(G.elevation[G.targets] - G.elevation[G.sources])
+    elevation_factor = np.select(
+        [elevation_diff > 1000, elevation_diff > 500, elevation_diff > 200],
+        [2.0, 1.5, 1.2],
+        default=1.0
+    )
+    
+    traffic_factor = 1 + G.traffic
+    road_factor = road_factor_table[G.road_type, G.condition]
+    lane_factor = np.where(G.lanes == 1, 1.5, 1.0)
+    seasonal_factor = seasonal_table[G.road_type, pilgrimage_route]
+    route_factor = route_factor_table[G.node_type[G.targets]]
+    
+    return (G.distance * traffic_factor * road_factor *
+            lane_factor * seasonal_factor * elevation_factor *
+            route_factor)
+
+def terrain_heuristic_array(G, target):
+    """terrain_aware_heuristic from every node of a CompiledGraph to node index target"""
+    delta = G.pos - G.pos[target]
+    base_distance = np.sqrt(delta[:, 0]**2 + delta[:, 1]**2)
+    
+    elevation_diff = np.abs(G.elevation - G.elevation[target])
+    elevation_factor = np.select([elevation_diff > 1000, elevation_diff > 500], [2.0, 1.5], default=1.0)
+    
+    division_factor = np.where(G.division != G.division[target], 1.2, 1.0)
+    
+    destination_type = G.label('node_type', G.node_type[target])
+    destination_factor = 1.0
+    if destination_type in ['char_dham', 'pilgrimage']:
+        destination_factor = 1.3
+    elif destination_type == 'tourist':
+        destination_factor = 1.2
+    
+    return base_distance * elevation_factor * division_factor * destination_factor
+
+def astar_search(G, source, target, costs, heuristic, stats=None):
+    """
+    Binary-heap A* over a CompiledGraph with lazy deletion
+    
+    Args:
+        G: CompiledGraph
+        source, target: Node indices
+        costs: Per-edge cost array (e.g. from astar_cost_table)
+        heuristic: Sequence of heuristic values indexed by node
+        stats: Optional dict that receives the number of node expansions
+    
+    Returns:
+        cost: Cost of the path found (inf if unreachable)
+        predecessors: Dict of node index -> predecessor index (-1 at source)
+    """
+    offsets, targets = G.offsets, G.targets
+    
+    cost_so_far = {source: 0.0}
+    came_from = {source: -1}
+    
+    # Priority currently queued for each open node; heap entries that no longer
+    # match it are stale and skipped when popped
+    open_priority = {source: heuristic[source]}
+    frontier = [(heuristic[source], 0, source)]
+    counter = 1
+    expansions = 0
+    
+    while frontier:
+        priority, _, current = heapq.heappop(frontier)
+        if open_priority.get(current) != priority:
+            continue
+        
+        if current == target:
+            break
+        
+        del open_priority[current]
+        expansions += 1
+        
+        current_cost = cost_so_far[current]
+        start, stop = offsets[current], offsets[current + 1]
+        for next_node, edge_cost in zip(targets[start:stop].tolist(), costs[start:stop].tolist()):
+            new_cost = current_cost + edge_cost
+            
+            if next_node not in cost_so_far or new_cost < cost_so_far[next_node]:
+                cost_so_far[next_node] = new_cost
+                came_from[next_node] = current
+                priority = new_cost + heuristic[next_node]
+                open_priority[next_node] = priority
+                heapq.heappush(frontier, (priority, counter, next_node))
+                counter += 1
+    
+    if stats is not None:
+        stats['expanded'] = expansions
+    
+    if target not in came_from:
+        return float('inf'), came_from
+    
+    return cost_so_far[target], came_from
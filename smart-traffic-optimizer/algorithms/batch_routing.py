@@ -0,0 +1,261 @@
+"""
+Batch routing of origin-destination pairs
+
+Python API:
+    run_batch(graph, read_od_pairs("od.csv"), "routes.jsonl", workers=4)
+
+Command line (from the project directory):
+    python -m algorithms.batch_routing od.csv routes.jsonl --workers 4
+
+With --snapshot (see algorithms.snapshot) the graph is memory-mapped from a
+binary snapshot and workers map the same file instead of receiving a copy.
+"""
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import time
+from collections import OrderedDict
+from algorithms.compiled_graph import as_compiled, compiled_graph_from_data
+from algorithms.dijkstra import shortest_path_tree
+from algorithms.snapshot import load_snapshot
+from algorithms.utils import calculate_path_metrics
+
+DEFAULT_DATA_PATH = 'data/uttarakhand_realistic_data.json'
+
+# Seconds between progress reports
+PROGRESS_INTERVAL = 2.0
+
+# Graph shipped to each worker process once by the pool initializer
+_worker_graph = None
+
+
+def read_od_pairs(path):
+    """
+    Yield (source, target) node IDs from a CSV or JSON Lines file
+
+    CSV files need a header with 'source' and 'target' columns (or 'from' and
+    'to'); JSON Lines records use the same keys.
+    """
+    if path.endswith('.jsonl') or path.endswith('.ndjson'):
+        with open(path, 'r') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                record = json.loads(line)
+                yield record.get('source', record.get('from')), record.get('target', record.get('to'))
+    else:
+        with open(path, 'r', newline='') as f:
+            for row in csv.DictReader(f):
+                yield row.get('source', row.get('from')), row.get('target', row.get('to'))
+
+
+def shard_by_source(pairs):
+    """
+    Group OD pairs by source so one search tree answers all of a source's targets
+
+    Returns:
+        list of (source, [(pair_number, target), ...]) in first-seen order
+    """
+    shards = OrderedDict()
+    for number, (source, target) in enumerate(pairs):
+        shards.setdefault(source, []).append((number, target))
+    return list(shards.items())
+
+
+def route_shard(G, source, targets):
+    """
+    Route one source to all of its targets with a single shortest path tree
+
+    Returns:
+        list of result records (one per target, in input order)
+    """
+    s = G.index.get(source)
+    if s is None:
+        return [_error_record(number, source, target, 'unknown source') for number, target in targets]
+
+    wanted = [G.index[target] for _, target in targets if target in G.index]
+    distances, predecessors = shortest_path_tree(G, s, stop_at=wanted)
+
+    records = []
+    for number, target in targets:
+        t = G.index.get(target)
+        if t is None:
+            records.append(_error_record(number, source, target, 'unknown target'))
+            continue
+        if distances[t] == float('infinity'):
+            records.append(_error_record(number, source, target, 'unreachable'))
+            continue
+        path = G.path_from_predecessors(predecessors, t)
+        records.append({
+            'pair': number,
+            'source': source,
+            'target': target,
+            'cost': float(distances[t]),
+            'path': path,
+            'metrics': calculate_path_metrics(G, path)
+        })
+    return records
+
+
+def _error_record(number, source, target, error):
+    return {'pair': number, 'source': source, 'target': target,
+            'cost': None, 'path': [], 'metrics': None, 'error': error}
+
+
+def _init_worker(G, snapshot=None, consider_traffic=None):
+    global _worker_graph
+    if snapshot:
+        G = load_snapshot(snapshot)
+        G.set_consider_traffic(consider_traffic)
+    _worker_graph = G
+
+
+def _route_shard_in_worker(shard):
+    source, targets = shard
+    return route_shard(_worker_graph, source, targets)
+
+
+class _ResultWriter:
+    """Streams result records to a JSON Lines or CSV file"""
+
+    CSV_FIELDS = ['pair', 'source', 'target', 'cost', 'distance', 'traffic_level',
+                  'travel_time', 'num_intersections', 'path', 'error']
+
+    def __init__(self, path):
+        self.file = open(path, 'w', newline='')
+        self.csv = None
+        if path.endswith('.csv'):
+            self.csv = csv.DictWriter(self.file, fieldnames=self.CSV_FIELDS)
+            self.csv.writeheader()
+
+    def write(self, record):
+        if self.csv is None:
+            self.file.write(json.dumps(record) + '\n')
+            return
+        row = {
+            'pair': record['pair'],
+            'source': record['source'],
+            'target': record['target'],
+            'cost': record['cost'],
+            'path': '>'.join(record['path']),
+            'error': record.get('error', '')
+        }
+        row.update(record['metrics'] or {})
+        self.csv.writerow(row)
+
+    def close(self):
+        self.file.close()
+
+
+def run_batch(G, pairs, output_path, workers=None, progress=sys.stderr, snapshot=None):
+    """
+    Route many OD pairs and stream the results to output_path
+
+    Pairs are sharded by source; every shard costs one early-stopping Dijkstra
+    search. With workers > 1 the compiled graph is sent to each worker process
+    once, when the pool starts, and shards are routed in parallel; given the
+    snapshot G was loaded from, workers memory-map that file instead. Records
+    are written as shards complete, so the output is not in input order; each
+    record carries its input 'pair' number.
+
+    Args:
+        G: NetworkX graph or CompiledGraph
+        pairs: Iterable of (source, target) node IDs
+        output_path: .jsonl (default) or .csv output file
+        workers: Number of worker processes (defaults to the CPU count; 1 runs in-process)
+        progress: Stream for progress reports, or None to stay quiet
+        snapshot: Optional snapshot file holding G, loaded by workers instead of
+            pickling G (with G's current traffic setting)
+
+    Returns:
+        dict with pair/shard counts, failures, elapsed seconds and throughput
+    """
+    G = as_compiled(G)
+    shards = shard_by_source(pairs)
+    total = sum(len(targets) for _, targets in shards)
+    workers = workers or os.cpu_count() or 1
+
+    writer = _ResultWriter(output_path)
+    start_time = time.time()
+    last_report = start_time
+    done = 0
+    failed = 0
+
+    def report(final=False):
+        elapsed = time.time() - start_time
+        rate = done / elapsed if elapsed > 0 else 0.0
+        if progress is not None:
+            progress.write(f"\r{done}/{total} pairs routed ({rate:,.0f} pairs/s)")
+            if final:
+                progress.write("\n")
+            progress.flush()
+
+    pool = None
+    try:
+        if workers == 1:
+            results = (route_shard(G, source, targets) for source, targets in shards)
+        else:
+            initargs = (None, snapshot, G.consider_traffic) if snapshot else (G,)
+            pool = multiprocessing.Pool(workers, initializer=_init_worker, initargs=initargs)
+            results = pool.imap_unordered(_route_shard_in_worker, shards)
+
+        for records in results:
+            for record in records:
+                writer.write(record)
+                failed += 'error' in record
+            done += len(records)
+            if time.time() - last_report >= PROGRESS_INTERVAL:
+                report()
+                last_report = time.time()
+
+        if pool is not None:
+            pool.close()
+            pool.join()
+    finally:
+        # Stop the workers if routing failed or was interrupted
+        if pool is not None:
+            pool.terminate()
+        writer.close()
+
+    report(final=True)
+    elapsed = time.time() - start_time
+    return {
+        'pairs': total,
+        'shards': len(shards),
+        'failed': failed,
+        'elapsed': elapsed,
+        'pairs_per_second': total / elapsed if elapsed > 0 else 0.0
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Route origin-destination pairs in bulk")
+    parser.add_argument('pairs', help="CSV or JSON Lines file with source/target columns")
+    parser.add_argument('output', help="Output file (.jsonl or .csv)")
+    parser.add_argument('--data', default=DEFAULT_DATA_PATH, help="Road network JSON file")
+    parser.add_argument('--snapshot', help="Binary graph snapshot to load instead of --data")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: CPU count)")
+    parser.add_argument('--no-traffic', action='store_true', help="Route on distance only")
+    args = parser.parse_args(argv)
+
+    if args.snapshot:
+        G = load_snapshot(args.snapshot)
+        G.set_consider_traffic(not args.no_traffic)
+    else:
+        with open(args.data, 'r') as f:
+            data = json.load(f)
+        G = compiled_graph_from_data(data, consider_traffic=not args.no_traffic)
+
+    summary = run_batch(G, read_od_pairs(args.pairs), args.output, workers=args.workers,
+                        snapshot=args.snapshot)
+    print(f"Routed {summary['pairs']} pairs from {summary['shards']} sources in "
+          f"{summary['elapsed']:.1f}s ({summary['pairs_per_second']:,.0f} pairs/s, "
+          f"{summary['failed']} failed)")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,13 @@
+from collections import deque
+import numpy as np
+from algorithms.compiled_graph import CompiledGraph, as_compiled
+
 def bellman_ford_algorithm(G, source, target):
 
+    # Array-backed graphs use the CSR implementation
+    if isinstance(G, CompiledGraph):
+        return _bellman_ford_compiled(G, source, target)
+
     # Initialize distances with infinity for all nodes except the source
     distances = {node: float('infinity') for node in G.nodes()}
     distances[source] = 0
@@ -39,3 +47,156 @@ def bellman_ford_algorithm(G, source, target):
     path.reverse()
     
     return distances[target], path
+
+def _bellman_ford_compiled(G, source, target):
+    """Bellman-Ford over a CompiledGraph, relaxing the flat edge arrays"""
+    s = G.index.get(source)
+    t = G.index.get(target)
+    if s is None or t is None:
+        return float('infinity'), []
+    
+    n = G.num_nodes
+    distances = [float('infinity')] * n
+    distances[s] = 0.0
+    predecessors = [-1] * n
+    
+    # Edge list as (tail, head, weight) triples in CSR order
+    edges = list(zip(G.sources.tolist(), G.targets.tolist(), G.weight.tolist()))
+    
+    # Relax edges |V| - 1 times
+    for _ in range(n - 1):
+        for u, v, weight in edges:
+            if distances[u] != float('infinity') and distances[u] + weight < distances[v]:
+                distances[v] = distances[u] + weight
+                predecessors[v] = u
+    
+    # Check for negative weight cycles
+    for u, v, weight in edges:
+        if distances[u] != float('infinity') and distances[u] + weight < distances[v]:
+            return float('infinity'), []
+    
+    if distances[t] == float('infinity'):
+        return float('infinity'), []
+    
+    return distances[t], G.path_from_predecessors(predecessors, t)
+
+def spfa_algorithm(G, source, target, stats=None):
+    """
+    Queue-based Bellman-Ford (SPFA)
+    
+    Only nodes whose distance just improved are queued for relaxation, so
+    converged parts of the graph are not scanned again. A node relaxed |V|
+    times must lie on (or behind) a negative cycle.
+    
+    Args:
+        G: NetworkX graph or CompiledGraph
+        source: Starting node
+        target: Target node
+        stats: Optional dict that receives the number of edge relaxations
+    
+    Returns:
+        tuple: (distance, path), (infinity, []) if unreachable or on a negative cycle
+    """
+    G = as_compiled(G)
+    s = G.index.get(source)
+    t = G.index.get(target)
+    if s is None or t is None:
+        return float('infinity'), []
+    
+    n = G.num_nodes
+    offsets, targets, weights = G.offsets, G.targets, G.weight
+    distances = [float('infinity')] * n
+    distances[s] = 0.0
+    predecessors = [-1] * n
+    relax_counts = [0] * n
+    in_queue = [False] * n
+    queue = deque([s])
+    in_queue[s] = True
+    relaxations = 0
+    
+    while queue:
+        current_node = queue.popleft()
+        in_queue[current_node] = False
+        current_distance = distances[current_node]
+        
+        start, stop = offsets[current_node], offsets[current_node + 1]
+        for neighbor, weight in zip(targets[start:stop].tolist(), weights[start:stop].tolist()):
+            relaxations += 1
+            distance = current_distance + weight
+            if distance < distances[neighbor]:
+                distances[neighbor] = distance
+                predecessors[neighbor] = current_node
+                relax_counts[neighbor] += 1
+                if relax_counts[neighbor] >= n:
+                    # Negative weight cycle detected
+                    return float('infinity'), []
+                if not in_queue[neighbor]:
+                    queue.append(neighbor)
+                    in_queue[neighbor] = True
+    
+    if stats is not None:
+        stats['relaxations'] = relaxations
+    
+    if distances[t] == float('infinity'):
+        return float('infinity'), []
+    
+    return distances[t], G.path_from_predecessors(predecessors, t)
+
+def vectorized_bellman_ford_algorithm(G, source, target, stats=None):
+    """
+    Bellman-Ford relaxing all edges per pass with NumPy array operations
+    
+    Each pass computes every edge's candidate distance at once and folds the
+    candidates into the heads with np.minimum.at. The loop stops as soon as a
+    pass changes nothing; a change in pass |V| means a negative cycle.
+    
+    Args:
+        G: NetworkX graph or CompiledGraph
+        source: Starting node
+        target: Target node
+        stats: Optional dict that receives the number of passes
+    
+    Returns:
+        tuple: (distance, path), (infinity, []) if unreachable or on a negative cycle
+    """
+    G = as_compiled(G)
+    s = G.index.get(source)
+    t = G.index.get(target)
+    if s is None or t is None:
+        return float('infinity'), []
+    
+    n = G.num_nodes
+    tails, heads, weights = G.sources, G.targets, G.weight
+    distances = np.full(n, np.inf)
+    distances[s] = 0.0
+    predecessors = np.full(n, -1, dtype=np.int64)
+    
+    passes = 0
+    converged = False
+    while passes < n:
+        passes += 1
+        candidates = distances[tails] + weights
+        updated = distances.copy()
+        np.minimum.at(updated, heads, candidates)
+        
+        improved = updated < distances
+        if not improved.any():
+            converged = True
+            break
+        
+        # Record the tail of an edge achieving each improved distance
+        best_edges = np.flatnonzero(improved[heads] & (candidates == updated[heads]))
+        predecessors[heads[best_edges]] = tails[best_edges]
+        distances = updated
+    
+    if stats is not None:
+        stats['passes'] = passes
+    
+    if not converged:
+        # Negative weight cycle detected
+        return float('infinity'), []
+    
+    if distances[t] == np.inf:
+        return float('infinity'), []
+    
+    return float(distances[t]), G.path_from_predecessors(predecessors, t)
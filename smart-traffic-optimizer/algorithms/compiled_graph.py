@@ -0,0 +1,402 @@
+import hashlib
+import numpy as np
+import networkx as nx
+
+# Known category labels, in code order. Unknown labels found while compiling
+# are appended per graph, so codes are only meaningful with the graph's labels.
+ROAD_TYPES = ['highway', 'hill', 'mountain', 'rural']
+ROAD_CONDITIONS = ['excellent', 'good', 'moderate', 'challenging', 'fair', 'poor']
+NODE_TYPES = ['capital', 'city', 'town', 'char_dham', 'pilgrimage', 'tourist',
+              'village', 'pass', 'intersection']
+DIVISIONS = ['Garhwal', 'Kumaon']
+
+
+def traffic_weight(distance, traffic):
+    """Routing weight of a road with traffic: congestion up to triples the distance cost"""
+    return distance * (1 + traffic * 2)
+
+
+class CompiledGraph:
+    """
+    Array-backed (CSR) road network built once from a NetworkX graph
+
+    Nodes are numbered 0..n-1 in graph order. The outgoing edges of node i are
+    edge ids offsets[i]..offsets[i+1]-1, whose heads are stored in targets and
+    whose attributes live in parallel NumPy arrays. String node IDs are only
+    needed at the boundary (query input and returned paths).
+    """
+
+    def __init__(self, node_ids, offsets, targets, weight, distance, traffic, lanes,
+                 road_type, condition, elevation, pos, node_type, division,
+                 node_names=None, edge_names=None, labels=None, consider_traffic=True):
+        self.node_ids = node_ids
+        self.offsets = offsets
+        self.targets = targets
+
+        # Edge attributes
+        self.weight = weight
+        self.distance = distance
+        self.traffic = traffic
+        self.lanes = lanes
+        self.road_type = road_type
+        self.condition = condition
+        self.edge_names = edge_names
+
+        # Node attributes
+        self.elevation = elevation
+        self.pos = pos
+        self.node_type = node_type
+        self.division = division
+        self.node_names = node_names
+
+        self.labels = labels or {
+            'road_type': list(ROAD_TYPES),
+            'condition': list(ROAD_CONDITIONS),
+            'node_type': list(NODE_TYPES),
+            'division': list(DIVISIONS)
+        }
+
+        # Whether weight includes the traffic penalty (see create_graph_from_data).
+        # The weights of the other setting are kept once built, so toggling
+        # only swaps arrays (see set_consider_traffic)
+        self.consider_traffic = consider_traffic
+        self._other_weight = None
+
+        # Bumped whenever edge weights change so derived data can be refreshed
+        self.version = 0
+
+        self._index = None
+        self._sources = None
+        self._reverse = None
+        self._topology_signature = None
+        self._derived = {}
+
+    @property
+    def num_nodes(self):
+        return len(self.offsets) - 1
+
+    @property
+    def num_edges(self):
+        return len(self.targets)
+
+    @property
+    def index(self):
+        """Mapping from string node ID to integer node index"""
+        if self._index is None:
+            self._index = {node_id: i for i, node_id in enumerate(self.node_ids)}
+        return self._index
+
+    @property
+    def sources(self):
+        """Tail node index of every edge (expanded from the CSR offsets)"""
+        if self._sources is None:
+            degrees = np.diff(self.offsets)
+            self._sources = np.repeat(np.arange(self.num_nodes, dtype=self.targets.dtype), degrees)
+        return self._sources
+
+    def reverse_csr(self):
+        """
+        Reverse adjacency in CSR form: (offsets, sources, edge_ids)
+
+        The incoming edges of node i are edge_ids[offsets[i]:offsets[i+1]],
+        with tails sources[offsets[i]:offsets[i+1]]. Edge ids index the
+        forward attribute arrays, so weight changes need no rebuild.
+        """
+        if self._reverse is None:
+            order = np.argsort(self.targets, kind='stable')
+            counts = np.bincount(self.targets, minlength=self.num_nodes)
+            offsets = np.zeros(self.num_nodes + 1, dtype=np.int64)
+            np.cumsum(counts, out=offsets[1:])
+            self._reverse = (offsets, self.sources[order], order.astype(np.int64))
+        return self._reverse
+
+    def derived(self, key, build):
+        """
+        Return data derived from the edge weights (cost tables, landmarks, ...)
+
+        build() is called on first use and again whenever the graph version
+        has changed since the cached value was computed.
+        """
+        entry = self._derived.get(key)
+        if entry is None or entry[0] != self.version:
+            entry = (self.version, build())
+            self._derived[key] = entry
+        return entry[1]
+
+    def topology_signature(self):
+        """Fingerprint of node IDs and edge structure, unaffected by weight changes"""
+        if self._topology_signature is None:
+            digest = hashlib.sha1()
+            digest.update('\n'.join(map(str, self.node_ids)).encode('utf-8'))
+            digest.update(np.ascontiguousarray(self.offsets, dtype=np.int64).tobytes())
+            digest.update(np.ascontiguousarray(self.targets, dtype=np.int64).tobytes())
+            self._topology_signature = digest.hexdigest()
+        return self._topology_signature
+
+    def weights_digest(self):
+        """Fingerprint of the current edge weights, recomputed when the version changes"""
+        return self.derived('weights_digest', lambda: hashlib.sha1(
+            np.ascontiguousarray(self.weight, dtype=np.float64).tobytes()).hexdigest())
+
+    def attributes_digest(self):
+        """
+        Fingerprint of the weights and of every attribute route costs are derived from
+
+        Covers what weights_digest leaves out: A* costs also read traffic,
+        road type, condition, lanes, elevation, node type and positions, which
+        can change while the weights stay the same (e.g. a traffic patch on
+        distance-only weights).
+        """
+        def build():
+            digest = hashlib.sha1()
+            for array in (self.weight, self.distance, self.traffic, self.lanes, self.road_type,
+                          self.condition, self.elevation, self.node_type, self.pos):
+                digest.update(np.ascontiguousarray(array).tobytes())
+            return digest.hexdigest()
+        return self.derived('attributes_digest', build)
+
+    def set_consider_traffic(self, consider_traffic):
+        """Switch weight between the traffic-aware and the distance-only weights"""
+        consider_traffic = bool(consider_traffic)
+        if consider_traffic == self.consider_traffic:
+            return
+        if self._other_weight is None:
+            self._other_weight = traffic_weight(self.distance, self.traffic) if consider_traffic \
+                else self.distance.astype(np.float64)
+        self.weight, self._other_weight = self._other_weight, self.weight
+        self.consider_traffic = consider_traffic
+        self.version += 1
+
+    def apply_traffic(self, edge_ids, traffic):
+        """
+        Set the traffic level of edges, updating the traffic-aware weights in place
+
+        Bumps the version so weight-derived data is rebuilt.
+        """
+        edge_ids = np.asarray(edge_ids, dtype=np.int64)
+        traffic = np.asarray(traffic, dtype=np.float64)
+        self.traffic[edge_ids] = traffic
+        weights = self.weight if self.consider_traffic else self._other_weight
+        if weights is not None:
+            weights[edge_ids] = traffic_weight(self.distance[edge_ids], traffic)
+        self.version += 1
+
+    def __contains__(self, node_id):
+        return node_id in self.index
+
+    def __len__(self):
+        return self.num_nodes
+
+    def edge_range(self, i):
+        """Return the (start, stop) edge ids of the outgoing edges of node i"""
+        return int(self.offsets[i]), int(self.offsets[i + 1])
+
+    def edge_index(self, u, v):
+        """Return the edge id of the road u -> v (string IDs), or -1 if absent"""
+        i, j = self.index.get(u), self.index.get(v)
+        if i is None or j is None:
+            return -1
+        start, stop = self.edge_range(i)
+        hits = np.flatnonzero(self.targets[start:stop] == j)
+        return start + int(hits[0]) if len(hits) else -1
+
+    def label(self, kind, code):
+        """Return the string label for a category code, e.g. label('road_type', 2)"""
+        return self.labels[kind][code]
+
+    def code(self, kind, label):
+        """Return the category code of a label, or -1 if the graph has never seen it"""
+        labels = self.labels[kind]
+        return labels.index(label) if label in labels else -1
+
+    def path_from_predecessors(self, predecessors, target):
+        """
+        Rebuild a path of string IDs by walking predecessor indices back from target
+
+        predecessors may be a dict or an array indexed by node; -1 marks the source.
+        """
+        path = []
+        current = target
+        while current != -1:
+            path.append(self.node_ids[current])
+            current = predecessors[current]
+        path.reverse()
+        return path
+
+
+def _encode(value, labels):
+    """Return the code of value in labels, appending it if it is new"""
+    try:
+        return labels.index(value)
+    except ValueError:
+        labels.append(value)
+        return len(labels) - 1
+
+
+def compile_graph(G):
+    """
+    Compile a graph from create_graph_from_data into a CompiledGraph
+
+    Node and adjacency order follow the NetworkX graph, so algorithms visit
+    neighbours in the same order on both representations.
+    """
+    labels = {
+        'road_type': list(ROAD_TYPES),
+        'condition': list(ROAD_CONDITIONS),
+        'node_type': list(NODE_TYPES),
+        'division': list(DIVISIONS)
+    }
+
+    node_ids = list(G.nodes())
+    index = {node_id: i for i, node_id in enumerate(node_ids)}
+    n = len(node_ids)
+
+    pos = np.zeros((n, 2), dtype=np.float64)
+    elevation = np.zeros(n, dtype=np.float64)
+    node_type = np.zeros(n, dtype=np.int8)
+    division = np.zeros(n, dtype=np.int8)
+    node_names = []
+
+    for i, (node_id, data) in enumerate(G.nodes(data=True)):
+        pos[i] = data.get('pos', (0.0, 0.0))
+        elevation[i] = data.get('elevation', 1000)
+        node_type[i] = _encode(data.get('type', 'city'), labels['node_type'])
+        division[i] = _encode(data.get('division', 'Garhwal'), labels['division'])
+        node_names.append(data.get('name', str(node_id)))
+
+    m = G.number_of_edges()
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    targets = np.empty(m, dtype=np.int32)
+    weight = np.empty(m, dtype=np.float64)
+    distance = np.empty(m, dtype=np.float64)
+    traffic = np.empty(m, dtype=np.float64)
+    lanes = np.empty(m, dtype=np.float64)
+    road_type = np.empty(m, dtype=np.int8)
+    condition = np.empty(m, dtype=np.int8)
+    edge_names = []
+
+    e = 0
+    for i, (node_id, neighbors) in enumerate(G.adjacency()):
+        for neighbor, data in neighbors.items():
+            targets[e] = index[neighbor]
+            weight[e] = data.get('weight', 1.0)
+            distance[e] = data.get('distance', weight[e])
+            traffic[e] = data.get('traffic', 0.0)
+            lanes[e] = data.get('lanes', 2)
+            road_type[e] = _encode(data.get('type', 'highway'), labels['road_type'])
+            condition[e] = _encode(data.get('condition', 'good'), labels['condition'])
+            edge_names.append(data.get('name', ''))
+            e += 1
+        offsets[i + 1] = e
+
+    return CompiledGraph(
+        node_ids, offsets, targets,
+        weight=weight, distance=distance, traffic=traffic, lanes=lanes,
+        road_type=road_type, condition=condition,
+        elevation=elevation, pos=pos, node_type=node_type, division=division,
+        node_names=node_names, edge_names=edge_names, labels=labels,
+        consider_traffic=G.graph.get('consider_traffic', True)
+    )
+
+
+def build_csr(num_nodes, tails, heads):
+    """
+    Order a directed edge list into CSR form, collapsing repeated edges like nx.DiGraph
+
+    Each (tail, head) pair is kept once, at the position of its first
+    occurrence but with the attributes of its last one (add_edge overwrites),
+    and edges of one tail keep their insertion order.
+
+    Returns:
+        offsets: CSR offsets of length num_nodes + 1
+        order: Index into the input edge list giving the attributes of each CSR edge
+    """
+    tails = np.asarray(tails, dtype=np.int64)
+    heads = np.asarray(heads, dtype=np.int64)
+    keys = tails * num_nodes + heads
+
+    _, first = np.unique(keys, return_index=True)
+    _, last_reversed = np.unique(keys[::-1], return_index=True)
+    last = len(keys) - 1 - last_reversed
+
+    csr = np.lexsort((first, tails[first]))
+    order = last[csr]
+
+    counts = np.bincount(tails[order], minlength=num_nodes)
+    offsets = np.zeros(num_nodes + 1, dtype=np.int64)
+    np.cumsum(counts, out=offsets[1:])
+    return offsets, order
+
+
+def compiled_graph_from_data(data, consider_traffic=True):
+    """
+    Build a CompiledGraph straight from the road network JSON structure
+
+    Produces the same graph as compile_graph(create_graph_from_data(data,
+    consider_traffic)) without materialising a NetworkX graph first.
+    """
+    labels = {
+        'road_type': list(ROAD_TYPES),
+        'condition': list(ROAD_CONDITIONS),
+        'node_type': list(NODE_TYPES),
+        'division': list(DIVISIONS)
+    }
+
+    node_ids = list(data["intersections"].keys())
+    index = {node_id: i for i, node_id in enumerate(node_ids)}
+    roads = data["roads"]
+
+    # Roads may reference intersections that are not listed; they are added
+    # with default attributes, as nx.DiGraph.add_edge would
+    for road in roads:
+        for node_id in (road["from"], road["to"]):
+            if node_id not in index:
+                index[node_id] = len(node_ids)
+                node_ids.append(node_id)
+    n = len(node_ids)
+
+    pos = np.zeros((n, 2), dtype=np.float64)
+    elevation = np.full(n, 1000, dtype=np.float64)
+    node_type = np.full(n, labels['node_type'].index('city'), dtype=np.int8)
+    division = np.zeros(n, dtype=np.int8)
+    node_names = list(node_ids)
+    for i, node_data in enumerate(data["intersections"].values()):
+        pos[i] = node_data["pos"]
+        elevation[i] = node_data.get("elevation", 1000)
+        node_type[i] = _encode(node_data.get("type", "city"), labels['node_type'])
+        division[i] = _encode(node_data.get("division", "Garhwal"), labels['division'])
+        node_names[i] = node_data["name"]
+
+    # Every road becomes two directed edges: forward then reverse
+    tails = np.empty(2 * len(roads), dtype=np.int64)
+    heads = np.empty(2 * len(roads), dtype=np.int64)
+    tails[0::2] = heads[1::2] = [index[road["from"]] for road in roads]
+    heads[0::2] = tails[1::2] = [index[road["to"]] for road in roads]
+    offsets, order = build_csr(n, tails, heads)
+    road_of_edge = order // 2
+
+    distance = np.array([road["distance"] for road in roads], dtype=np.float64)
+    traffic = np.array([road["traffic"] for road in roads], dtype=np.float64)
+    weight = traffic_weight(distance, traffic) if consider_traffic else distance.copy()
+    lanes = np.array([road.get("lanes", 2) for road in roads], dtype=np.float64)
+    road_type = np.array([_encode(road.get("type", "highway"), labels['road_type']) for road in roads], dtype=np.int8)
+    condition = np.array([_encode(road.get("condition", "good"), labels['condition']) for road in roads], dtype=np.int8)
+    edge_names = [roads[r]["name"] for r in road_of_edge.tolist()]
+
+    return CompiledGraph(
+        node_ids, offsets, heads[order].astype(np.int32),
+        weight=weight[road_of_edge], distance=distance[road_of_edge], traffic=traffic[road_of_edge],
+        lanes=lanes[road_of_edge], road_type=road_type[road_of_edge], condition=condition[road_of_edge],
+        elevation=elevation, pos=pos, node_type=node_type, division=division,
+        node_names=node_names, edge_names=edge_names, labels=labels,
+        consider_traffic=consider_traffic
+    )
+
+
+def as_compiled(G):
+    """Return G unchanged if it is already compiled, otherwise compile it"""
+    if isinstance(G, CompiledGraph):
+        return G
+    if isinstance(G, nx.Graph):
+        return compile_graph(G)
+    raise TypeError(f"Expected a NetworkX graph or CompiledGraph, got {type(G).__name__}")
@@ -0,0 +1,386 @@
+import heapq
+import hashlib
+import os
+import time
+import numpy as np
+from algorithms.compiled_graph import as_compiled
+
+# Bumped whenever the on-disk layout written by ContractionHierarchy.save changes
+CH_FORMAT_VERSION = 1
+
+# Witness searches give up after settling this many nodes; a failed witness
+# search only costs an unnecessary shortcut, never a wrong answer
+WITNESS_SETTLE_LIMIT = 500
+
+
+class ContractionHierarchy:
+    """
+    Contraction Hierarchy over a CompiledGraph
+
+    Every node has a rank (its position in the contraction order). Arcs of the
+    hierarchy (original edges plus shortcuts) are stored twice in CSR form:
+    up_* holds arcs u -> v with rank[v] > rank[u] under their tail u, and
+    down_* holds arcs u -> v with rank[u] > rank[v] under their head v, so both
+    halves of a query only ever move to higher-ranked nodes. A middle value of
+    -1 marks an original edge; otherwise it is the contracted node the shortcut
+    bypasses.
+    """
+
+    def __init__(self, node_ids, order, up, down, signature, weights_digest):
+        self.node_ids = node_ids
+        self.order = order
+        self.rank = np.empty(len(order), dtype=np.int64)
+        self.rank[order] = np.arange(len(order))
+        self.up_offsets, self.up_targets, self.up_weights, self.up_middle = up
+        self.down_offsets, self.down_sources, self.down_weights, self.down_middle = down
+        self.signature = signature
+        self.weights_digest = weights_digest
+        self.build_time = 0.0
+        self._index = {node_id: i for i, node_id in enumerate(node_ids)}
+
+    @property
+    def num_shortcuts(self):
+        return int(np.count_nonzero(self.up_middle >= 0) + np.count_nonzero(self.down_middle >= 0))
+
+    def query(self, source, target, stats=None):
+        """
+        Bidirectional upward search between two string node IDs
+
+        Returns:
+            distance: Total weight of the shortest path
+            path: List of nodes in path, with shortcuts unpacked
+        """
+        s = self._index.get(source)
+        t = self._index.get(target)
+        if s is None or t is None:
+            return float('infinity'), []
+
+        distance, s_meet, pred_forward, pred_backward, settled = self._search(s, t)
+        if stats is not None:
+            stats['settled'] = settled
+        if s_meet == -1:
+            return float('infinity'), []
+
+        return distance, [self.node_ids[i] for i in self._unpack_path(s_meet, pred_forward, pred_backward)]
+
+    def distance(self, source, target):
+        """Shortest path distance between node indices, without path unpacking"""
+        return self._search(source, target)[0]
+
+    def _search(self, s, t):
+        graphs = (
+            (self.up_offsets, self.up_targets, self.up_weights, self.up_middle),
+            (self.down_offsets, self.down_sources, self.down_weights, self.down_middle)
+        )
+        distances = ({s: 0.0}, {t: 0.0})
+        # Predecessor of each reached node as (previous node, middle of the arc used)
+        predecessors = ({s: (-1, -1)}, {t: (-1, -1)})
+        queues = ([(0.0, s)], [(0.0, t)])
+        settled = 0
+
+        best = float('infinity')
+        meeting_node = -1
+
+        while queues[0] or queues[1]:
+            # A side is finished once its smallest key cannot improve the best path
+            for side in (0, 1):
+                if queues[side] and queues[side][0][0] >= best:
+                    queues[side].clear()
+            if not queues[0] and not queues[1]:
+                break
+
+            if not queues[1] or (queues[0] and queues[0][0][0] <= queues[1][0][0]):
+                side = 0
+            else:
+                side = 1
+
+            offsets, neighbors, weights, middles = graphs[side]
+            dist, pred = distances[side], predecessors[side]
+            current_distance, current_node = heapq.heappop(queues[side])
+            if current_distance > dist[current_node]:
+                continue
+            settled += 1
+
+            other_distance = distances[1 - side].get(current_node)
+            if other_distance is not None and current_distance + other_distance < best:
+                best = current_distance + other_distance
+                meeting_node = current_node
+
+            start, stop = offsets[current_node], offsets[current_node + 1]
+            for neighbor, weight, middle in zip(neighbors[start:stop].tolist(),
+                                                weights[start:stop].tolist(),
+                                                middles[start:stop].tolist()):
+                distance = current_distance + weight
+                if distance < dist.get(neighbor, float('infinity')):
+                    dist[neighbor] = distance
+                    pred[neighbor] = (current_node, middle)
+                    heapq.heappush(queues[side], (distance, neighbor))
+
+        return best, meeting_node, predecessors[0], predecessors[1], settled
+
+    def _unpack_path(self, meeting_node, pred_forward, pred_backward):
+        # Hierarchy arcs from the source up to the meeting node and down to the target
+        arcs = []
+        current = meeting_node
+        while pred_forward[current][0] != -1:
+            previous, middle = pred_forward[current]
+            arcs.append((previous, current, middle))
+            current = previous
+        arcs.reverse()
+        current = meeting_node
+        while pred_backward[current][0] != -1:
+            following, middle = pred_backward[current]
+            arcs.append((current, following, middle))
+            current = following
+
+        path = [arcs[0][0]] if arcs else [meeting_node]
+        for u, v, middle in arcs:
+            path.extend(self.unpack_arc(u, v, middle))
+        return path
+
+    def unpack_arc(self, u, v, middle):
+        """Expand hierarchy arc u -> v into the original nodes after u, ending with v"""
+        nodes = []
+        stack = [(u, v, middle)]
+        while stack:
+            a, b, mid = stack.pop()
+            if mid == -1:
+                nodes.append(b)
+                continue
+            # The shortcut a -> b stands for a -> mid -> b; mid was contracted
+            # before both, so a -> mid is a downward arc and mid -> b an upward one
+            stack.append((mid, b, self._arc_middle(self.up_offsets, self.up_targets, self.up_middle, mid, b)))
+            stack.append((a, mid, self._arc_middle(self.down_offsets, self.down_sources, self.down_middle, mid, a)))
+        return nodes
+
+    @staticmethod
+    def _arc_middle(offsets, neighbors, middles, node, neighbor):
+        start, stop = offsets[node], offsets[node + 1]
+        hit = np.flatnonzero(neighbors[start:stop] == neighbor)[0]
+        return int(middles[start + hit])
+
+    def save(self, path):
+        """Write the hierarchy to an .npz file"""
+        np.savez(
+            path,
+            format_version=CH_FORMAT_VERSION,
+            node_ids=np.asarray(self.node_ids, dtype=str),
+            order=self.order,
+            up_offsets=self.up_offsets, up_targets=self.up_targets,
+            up_weights=self.up_weights, up_middle=self.up_middle,
+            down_offsets=self.down_offsets, down_sources=self.down_sources,
+            down_weights=self.down_weights, down_middle=self.down_middle,
+            signature=np.asarray(self.signature, dtype=str),
+            weights_digest=np.asarray(self.weights_digest, dtype=str)
+        )
+
+    @classmethod
+    def load(cls, path):
+        """Read a hierarchy written by save()"""
+        with np.load(path) as archive:
+            if int(archive['format_version']) != CH_FORMAT_VERSION:
+                raise ValueError(f"Unsupported contraction hierarchy format in {path}")
+            return cls(
+                archive['node_ids'].tolist(),
+                archive['order'],
+                (archive['up_offsets'], archive['up_targets'], archive['up_weights'], archive['up_middle']),
+                (archive['down_offsets'], archive['down_sources'], archive['down_weights'], archive['down_middle']),
+                str(archive['signature']),
+                str(archive['weights_digest'])
+            )
+
+
+def topology_signature(G):
+    """Fingerprint of node IDs and edge structure; node orders stay valid while it matches"""
+    return G.topology_signature()
+
+
+def weights_digest(weights):
+    return hashlib.sha1(np.ascontiguousarray(weights, dtype=np.float64).tobytes()).hexdigest()
+
+
+def build_contraction_hierarchy(G, weights=None):
+    """
+    Preprocess a graph into a ContractionHierarchy
+
+    Nodes are ordered greedily by edge difference (shortcuts added minus arcs
+    removed) plus the number of already contracted neighbours, with lazy
+    priority updates.
+
+    Args:
+        G: NetworkX graph or CompiledGraph
+        weights: Optional per-edge weight array (defaults to G.weight)
+    """
+    G = as_compiled(G)
+    weights = G.weight if weights is None else weights
+    start_time = time.time()
+    ch = _contract(G, weights, order=None)
+    ch.build_time = time.time() - start_time
+    return ch
+
+
+def customize_contraction_hierarchy(ch, G, weights=None):
+    """
+    Apply new edge weights (e.g. fresh traffic) to an existing hierarchy
+
+    The node order is reused and only shortcuts are recomputed, which skips
+    the ordering heuristics. The topology of G must match the hierarchy.
+    """
+    G = as_compiled(G)
+    if topology_signature(G) != ch.signature:
+        raise ValueError("Graph topology does not match the contraction hierarchy")
+    weights = G.weight if weights is None else weights
+    start_time = time.time()
+    customized = _contract(G, weights, order=ch.order)
+    customized.build_time = time.time() - start_time
+    return customized
+
+
+def load_or_build_hierarchy(G, path):
+    """
+    Load a persisted hierarchy for G, customizing or rebuilding it when stale
+
+    Same topology and weights: loaded as is. Same topology, new weights: the
+    stored order is customized. Otherwise the hierarchy is rebuilt. Any new
+    result is written back to path.
+    """
+    G = as_compiled(G)
+    if os.path.exists(path):
+        try:
+            ch = ContractionHierarchy.load(path)
+        except (OSError, ValueError, KeyError):
+            ch = None
+        if ch is not None and ch.signature == topology_signature(G):
+            if ch.weights_digest == weights_digest(G.weight):
+                return ch
+            ch = customize_contraction_hierarchy(ch, G)
+            ch.save(path)
+            return ch
+
+    ch = build_contraction_hierarchy(G)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    ch.save(path)
+    return ch
+
+
+def contraction_hierarchy_algorithm(ch, source, target):
+    """Shortest path query on a prepared hierarchy, returning (distance, path)"""
+    return ch.query(source, target)
+
+
+def _contract(G, weights, order=None):
+    n = G.num_nodes
+
+    # Remaining (uncontracted) graph as adjacency dicts: node -> {neighbor: (weight, middle)}
+    out_arcs = [dict() for _ in range(n)]
+    in_arcs = [dict() for _ in range(n)]
+    for u, v, weight in zip(G.sources.tolist(), G.targets.tolist(), np.asarray(weights).tolist()):
+        if u == v:
+            continue
+        if v not in out_arcs[u] or weight < out_arcs[u][v][0]:
+            out_arcs[u][v] = (weight, -1)
+            in_arcs[v][u] = (weight, -1)
+
+    contracted = [False] * n
+    contracted_neighbors = [0] * n
+    up_arcs = [None] * n
+    down_arcs = [None] * n
+
+    def witness_distances(u, skip, limit):
+        # Dijkstra from u in the remaining graph, avoiding the node being contracted
+        dist = {u: 0.0}
+        queue = [(0.0, u)]
+        settled = 0
+        while queue:
+            d, x = heapq.heappop(queue)
+            if d > dist[x]:
+                continue
+            if d > limit or settled >= WITNESS_SETTLE_LIMIT:
+                break
+            settled += 1
+            for y, (weight, _) in out_arcs[x].items():
+                if y == skip:
+                    continue
+                nd = d + weight
+                if nd < dist.get(y, float('infinity')):
+                    dist[y] = nd
+                    heapq.heappush(queue, (nd, y))
+        return dist
+
+    def shortcuts_for(v):
+        shortcuts = []
+        if not in_arcs[v] or not out_arcs[v]:
+            return shortcuts
+        max_out = max(weight for weight, _ in out_arcs[v].values())
+        for u, (weight_in, _) in in_arcs[v].items():
+            dist = witness_distances(u, v, weight_in + max_out)
+            for w, (weight_out, _) in out_arcs[v].items():
+                if w == u:
+                    continue
+                via = weight_in + weight_out
+                if dist.get(w, float('infinity')) > via:
+                    shortcuts.append((u, w, via))
+        return shortcuts
+
+    def priority(v):
+        edge_difference = len(shortcuts_for(v)) - len(in_arcs[v]) - len(out_arcs[v])
+        return edge_difference + contracted_neighbors[v]
+
+    def contract(v):
+        for u, w, via in shortcuts_for(v):
+            if w not in out_arcs[u] or via < out_arcs[u][w][0]:
+                out_arcs[u][w] = (via, v)
+                in_arcs[w][u] = (via, v)
+        up_arcs[v] = list(out_arcs[v].items())
+        down_arcs[v] = list(in_arcs[v].items())
+        for w in out_arcs[v]:
+            del in_arcs[w][v]
+            contracted_neighbors[w] += 1
+        for u in in_arcs[v]:
+            del out_arcs[u][v]
+            contracted_neighbors[u] += 1
+        out_arcs[v] = {}
+        in_arcs[v] = {}
+        contracted[v] = True
+
+    if order is None:
+        queue = [(priority(v), v) for v in range(n)]
+        heapq.heapify(queue)
+        new_order = []
+        while queue:
+            _, v = heapq.heappop(queue)
+            if contracted[v]:
+                continue
+            # Lazy update: recompute and requeue if v is no longer the cheapest
+            current = priority(v)
+            if queue and current > queue[0][0]:
+                heapq.heappush(queue, (current, v))
+                continue
+            contract(v)
+            new_order.append(v)
+        order = np.asarray(new_order, dtype=np.int64)
+    else:
+        order = np.asarray(order, dtype=np.int64)
+        for v in order.tolist():
+            contract(v)
+
+    up = _arcs_to_csr(up_arcs, n)
+    down = _arcs_to_csr(down_arcs, n)
+    return ContractionHierarchy(list(G.node_ids), order, up, down,
+                                topology_signature(G), weights_digest(weights))
+
+
+def _arcs_to_csr(arcs, n):
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(node_arcs) for node_arcs in arcs])
+    neighbors = np.empty(offsets[-1], dtype=np.int32)
+    weights = np.empty(offsets[-1], dtype=np.float64)
+    middles = np.empty(offsets[-1], dtype=np.int32)
+    for v, node_arcs in enumerate(arcs):
+        for k, (neighbor, (weight, middle)) in enumerate(node_arcs):
+            neighbors[offsets[v] + k] = neighbor
+            weights[offsets[v] + k] = weight
+            middles[offsets[v] + k] = middle
+    return offsets, neighbors, weights, middles
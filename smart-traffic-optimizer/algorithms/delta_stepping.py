@@ -0,0 +1,231 @@
+import multiprocessing
+import os
+from multiprocessing import shared_memory
+import numpy as np
+from algorithms.compiled_graph import as_compiled
+
+# Sources handed to a worker per task; each task runs them as one batch
+SOURCES_PER_TASK = 16
+
+# Upper bound on (source, node) entries searched together in-process
+MAX_BATCH_ENTRIES = 1 << 22
+
+# Worker state: CSR arrays, output matrix and their shared memory blocks
+_worker_state = None
+
+
+def default_delta(weights):
+    """Bucket width: the mean positive edge weight"""
+    positive = weights[weights > 0]
+    return float(positive.mean()) if len(positive) else 1.0
+
+
+def _edges_of(offsets, nodes):
+    """Ids of all outgoing edges of nodes, and the tail of each"""
+    starts = offsets[nodes]
+    counts = offsets[nodes + 1] - starts
+    total = int(counts.sum())
+    if total == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    first = np.cumsum(counts) - counts
+    edges = np.repeat(starts - first, counts) + np.arange(total)
+    return edges, np.repeat(nodes, counts)
+
+
+def _delta_stepping(offsets, heads, weights, n, roots, delta):
+    """
+    Delta-stepping over raw CSR arrays for a batch of searches
+
+    Each entry of roots (a node index or a list of them) starts one search;
+    the result has one distance row per search. Tentative distances fall
+    into buckets of width delta. The lowest non-empty bucket is emptied by
+    relaxing the light edges (weight <= delta) of its nodes in batches until
+    no node re-enters it; then the heavy edges of every node removed from it
+    are relaxed once, since they cannot lead back into the same bucket.
+
+    All searches advance through the buckets together on one flattened
+    (search, node) array, so every batch of relaxations for every search is
+    a single np.minimum.at.
+    """
+    rows = len(roots)
+    distances = np.full(rows * n, np.inf)
+    for row, root in enumerate(roots):
+        distances[row * n + np.atleast_1d(np.asarray(root, dtype=np.int64))] = 0.0
+    settled = np.zeros(rows * n, dtype=bool)
+    light = weights <= delta
+
+    while True:
+        pending = np.flatnonzero(~settled & np.isfinite(distances))
+        if len(pending) == 0:
+            break
+        bucket_end = (np.floor(distances[pending].min() / delta) + 1) * delta
+
+        removed = np.zeros(rows * n, dtype=bool)
+        frontier = pending[distances[pending] < bucket_end]
+        while len(frontier):
+            removed[frontier] = True
+            improved = _relax(distances, offsets, heads, weights, n, frontier, light)
+            frontier = improved[distances[improved] < bucket_end]
+
+        settled |= removed
+        _relax(distances, offsets, heads, weights, n, np.flatnonzero(removed), ~light)
+
+    return distances.reshape(rows, n)
+
+
+def _relax(distances, offsets, heads, weights, n, keys, allowed):
+    """
+    Relax the allowed outgoing edges of (search, node) keys in one batch
+
+    Returns the keys whose distance improved.
+    """
+    rows, nodes = np.divmod(keys, n)
+    edges, tails = _edges_of(offsets, nodes)
+    rows = np.repeat(rows, offsets[nodes + 1] - offsets[nodes])
+    keep = allowed[edges]
+    edges, tails, rows = edges[keep], tails[keep], rows[keep]
+    if len(edges) == 0:
+        return np.empty(0, dtype=np.int64)
+
+    candidates = distances[rows * n + tails] + weights[edges]
+    targets = rows * n + heads[edges]
+    better = candidates < distances[targets]
+    if not better.any():
+        return np.empty(0, dtype=np.int64)
+    targets = targets[better]
+    np.minimum.at(distances, targets, candidates[better])
+    return np.unique(targets)
+
+
+def _search_arrays(G, weights, reverse):
+    """(offsets, heads, weights) of the graph to search, reversed if asked"""
+    weights = G.weight if weights is None else np.asarray(weights, dtype=np.float64)
+    if reverse:
+        offsets, tails, edge_ids = G.reverse_csr()
+        return offsets, tails, weights[edge_ids]
+    return G.offsets, G.targets, weights
+
+
+def delta_stepping_tree(G, source, weights=None, reverse=False, delta=None):
+    """
+    One-to-all shortest paths by delta-stepping, a drop-in for shortest_path_tree
+
+    Args:
+        G: NetworkX graph or CompiledGraph
+        source: Node index, or an iterable of node indices that all start at distance 0
+        weights: Optional per-edge weight array (defaults to G.weight)
+        reverse: Search incoming edges, giving distances *to* the source
+        delta: Bucket width (defaults to the mean edge weight)
+
+    Returns:
+        distances: Array of distances (inf where unreachable)
+        predecessors: Array of the previous node on each shortest path (-1 at
+            roots and unreached nodes); for reverse searches this is the next
+            node towards the source
+    """
+    G = as_compiled(G)
+    offsets, heads, edge_weights = _search_arrays(G, weights, reverse)
+    delta = default_delta(edge_weights) if delta is None else delta
+    sources = np.atleast_1d(np.asarray(source, dtype=np.int64))
+
+    distances = _delta_stepping(offsets, heads, edge_weights, G.num_nodes, [sources], delta)[0]
+
+    # Any tight edge into a node is a valid tree edge
+    tails = np.repeat(np.arange(G.num_nodes), np.diff(offsets))
+    tight = np.flatnonzero(np.isfinite(distances[tails]) & (distances[tails] + edge_weights == distances[heads]))
+    predecessors = np.full(G.num_nodes, -1, dtype=np.int64)
+    predecessors[heads[tight]] = tails[tight]
+    predecessors[sources] = -1
+    return distances, predecessors
+
+
+def delta_stepping_algorithm(G, source, target):
+    """
+    Shortest path between two nodes with delta-stepping
+
+    Returns:
+        tuple: (distance, path) like dijkstra_algorithm
+    """
+    G = as_compiled(G)
+    s = G.index.get(source)
+    t = G.index.get(target)
+    if s is None or t is None:
+        return float('infinity'), []
+    distances, predecessors = delta_stepping_tree(G, s)
+    if distances[t] == np.inf:
+        return float('infinity'), []
+    return float(distances[t]), G.path_from_predecessors(predecessors, t)
+
+
+def many_source_distances(G, sources, weights=None, reverse=False, delta=None, workers=1):
+    """
+    Distance rows from many sources, optionally across a process pool
+
+    With workers > 1 the CSR arrays and the output matrix are placed in
+    shared memory once; workers attach to them and fill in their rows, so
+    neither the graph nor the results are pickled per task.
+
+    Args:
+        G: NetworkX graph or CompiledGraph
+        sources: Node indices
+        weights: Optional per-edge weight array (defaults to G.weight)
+        reverse: Distances to each source instead of from it
+        delta: Bucket width (defaults to the mean edge weight)
+        workers: Number of processes (None for the CPU count, 1 runs in-process)
+
+    Returns:
+        ndarray: distances[i, v] from sources[i] to node v (inf where unreachable)
+    """
+    G = as_compiled(G)
+    offsets, heads, edge_weights = _search_arrays(G, weights, reverse)
+    delta = default_delta(edge_weights) if delta is None else delta
+    sources = [int(s) for s in sources]
+    n = G.num_nodes
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1 or len(sources) <= SOURCES_PER_TASK:
+        result = np.empty((len(sources), n))
+        batch = _batch_size(n)
+        for start in range(0, len(sources), batch):
+            result[start:start + batch] = _delta_stepping(offsets, heads, edge_weights, n,
+                                                          sources[start:start + batch], delta)
+        return result
+
+    blocks = []
+    try:
+        specs = []
+        for array in (offsets, heads, edge_weights, np.empty((len(sources), n))):
+            block = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+            blocks.append(block)
+            np.ndarray(array.shape, dtype=array.dtype, buffer=block.buf)[...] = array
+            specs.append((block.name, array.shape, array.dtype.str))
+
+        tasks = [(start, sources[start:start + SOURCES_PER_TASK])
+                 for start in range(0, len(sources), SOURCES_PER_TASK)]
+        with multiprocessing.Pool(workers, initializer=_attach_worker, initargs=(specs, n, delta)) as pool:
+            pool.map(_fill_rows, tasks)
+
+        name, shape, dtype = specs[-1]
+        return np.ndarray(shape, dtype=dtype, buffer=blocks[-1].buf).copy()
+    finally:
+        for block in blocks:
+            block.close()
+            block.unlink()
+
+
+def _attach_worker(specs, n, delta):
+    global _worker_state
+    blocks = [shared_memory.SharedMemory(name=name) for name, _, _ in specs]
+    arrays = [np.ndarray(shape, dtype=dtype, buffer=block.buf)
+              for block, (_, shape, dtype) in zip(blocks, specs)]
+    _worker_state = (blocks, arrays, n, delta)
+
+
+def _fill_rows(task):
+    _, (offsets, heads, weights, result), n, delta = _worker_state
+    start, sources = task
+    result[start:start + len(sources)] = _delta_stepping(offsets, heads, weights, n, sources, delta)
+
+
+def _batch_size(n):
+    return max(1, MAX_BATCH_ENTRIES // max(n, 1))
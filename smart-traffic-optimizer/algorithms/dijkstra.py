@@ -1,7 +1,13 @@
 import heapq
+import numpy as np
+from algorithms.compiled_graph import CompiledGraph, as_compiled
 
 def dijkstra_algorithm(G, source, target):
     
+    # Array-backed graphs use the CSR implementation
+    if isinstance(G, CompiledGraph):
+        return _dijkstra_compiled(G, source, target)
+    
     # Initialize distances with infinity for all nodes except the source
     distances = {node: float('infinity') for node in G.nodes()}
     distances[source] = 0
@@ -61,3 +67,279 @@ def dijkstra_algorithm(G, source, target):
     path.reverse()
     
     return distances[target], path
+
+def _dijkstra_compiled(G, source, target, stats=None):
+    """Dijkstra's algorithm over a CompiledGraph, working on integer node indices"""
+    s = G.index.get(source)
+    t = G.index.get(target)
+    if s is None or t is None:
+        return float('infinity'), []
+    
+    offsets, targets, weights = G.offsets, G.targets, G.weight
+    
+    # Only nodes touched by the search get an entry
+    distances = {s: 0.0}
+    predecessors = {s: -1}
+    priority_queue = [(0.0, s)]
+    visited = set()
+    
+    while priority_queue:
+        current_distance, current_node = heapq.heappop(priority_queue)
+        
+        if current_node == t:
+            break
+        
+        if current_node in visited:
+            continue
+        
+        visited.add(current_node)
+        
+        start, stop = offsets[current_node], offsets[current_node + 1]
+        for neighbor, weight in zip(targets[start:stop].tolist(), weights[start:stop].tolist()):
+            if neighbor in visited:
+                continue
+            
+            distance = current_distance + weight
+            if distance < distances.get(neighbor, float('infinity')):
+                distances[neighbor] = distance
+                predecessors[neighbor] = current_node
+                heapq.heappush(priority_queue, (distance, neighbor))
+    
+    if stats is not None:
+        stats['settled'] = len(visited)
+    
+    if t not in distances:
+        return float('infinity'), []
+    
+    return distances[t], G.path_from_predecessors(predecessors, t)
+
+def bidirectional_dijkstra_algorithm(G, source, target, stats=None):
+    """
+    Point-to-point Dijkstra searching forward from the source and backward from the target
+    
+    The backward search runs over the reverse adjacency. The search stops once
+    the smallest keys of both queues add up to at least the best source-target
+    distance seen so far, which is then optimal.
+    
+    Args:
+        G: NetworkX graph or CompiledGraph
+        source: Starting node
+        target: Target node
+        stats: Optional dict that receives the number of settled nodes
+    
+    Returns:
+        distance: Total weight of the shortest path
+        path: List of nodes in path
+    """
+    G = as_compiled(G)
+    s = G.index.get(source)
+    t = G.index.get(target)
+    if s is None or t is None:
+        return float('infinity'), []
+    
+    weights = G.weight
+    forward = (G.offsets, G.targets, np.arange(G.num_edges))
+    backward = G.reverse_csr()
+    
+    # Per direction: distances, predecessors, settled set and priority queue
+    distances = ({s: 0.0}, {t: 0.0})
+    predecessors = ({s: -1}, {t: -1})
+    settled = (set(), set())
+    queues = ([(0.0, s)], [(0.0, t)])
+    
+    best = float('infinity') if s != t else 0.0
+    meeting_node = s if s == t else -1
+    
+    while queues[0] and queues[1]:
+        if queues[0][0][0] + queues[1][0][0] >= best:
+            break
+        
+        # Advance the direction with the smaller queue key
+        side = 0 if queues[0][0][0] <= queues[1][0][0] else 1
+        offsets, neighbors, edge_ids = forward if side == 0 else backward
+        dist, pred, done, queue = distances[side], predecessors[side], settled[side], queues[side]
+        other_dist = distances[1 - side]
+        
+        current_distance, current_node = heapq.heappop(queue)
+        if current_node in done:
+            continue
+        done.add(current_node)
+        
+        start, stop = offsets[current_node], offsets[current_node + 1]
+        for neighbor, weight in zip(neighbors[start:stop].tolist(), weights[edge_ids[start:stop]].tolist()):
+            if neighbor in done:
+                continue
+            
+            distance = current_distance + weight
+            if distance < dist.get(neighbor, float('infinity')):
+                dist[neighbor] = distance
+                pred[neighbor] = current_node
+                heapq.heappush(queue, (distance, neighbor))
+            
+            # A node reached from both sides closes a candidate path
+            if neighbor in other_dist and dist[neighbor] + other_dist[neighbor] < best:
+                best = dist[neighbor] + other_dist[neighbor]
+                meeting_node = neighbor
+    
+    if stats is not None:
+        stats['settled'] = len(settled[0]) + len(settled[1])
+    
+    if meeting_node == -1:
+        return float('infinity'), []
+    
+    # Forward half up to the meeting node, then follow backward predecessors to the target
+    path = G.path_from_predecessors(predecessors[0], meeting_node)
+    current = predecessors[1][meeting_node] if meeting_node != t else -1
+    while current != -1:
+        path.append(G.node_ids[current])
+        current = predecessors[1][current]
+    
+    return best, path
+
+def shortest_path_tree(G, source, weights=None, reverse=False, stop_at=None):
+    """
+    One-to-all Dijkstra over a CompiledGraph, on node indices
+    
+    Args:
+        G: CompiledGraph
+        source: Node index, or an iterable of node indices that all start at distance 0
+        weights: Optional per-edge weight array (defaults to G.weight)
+        reverse: Search incoming edges, giving distances *to* the source
+        stop_at: Optional collection of node indices; the search ends once all
+            are settled, leaving only upper bounds for nodes not yet settled
+    
+    Returns:
+        distances: Array of distances (inf where unreachable)
+        predecessors: Array of the previous node on each shortest path (-1 at
+            roots and unreached nodes); for reverse searches this is the next
+            node towards the source
+    """
+    weights = G.weight if weights is None else weights
+    if reverse:
+        offsets, neighbors, edge_ids = G.reverse_csr()
+        edge_weights = weights[edge_ids]
+    else:
+        offsets, neighbors, edge_weights = G.offsets, G.targets, weights
+    
+    n = G.num_nodes
+    sources = [source] if np.isscalar(source) else list(source)
+    distances = [float('infinity')] * n
+    predecessors = [-1] * n
+    visited = [False] * n
+    priority_queue = []
+    for s in sources:
+        distances[s] = 0.0
+        priority_queue.append((0.0, s))
+    heapq.heapify(priority_queue)
+    
+    remaining = set(stop_at) if stop_at is not None else None
+    
+    while priority_queue:
+        current_distance, current_node = heapq.heappop(priority_queue)
+        if visited[current_node]:
+            continue
+        visited[current_node] = True
+        
+        if remaining is not None:
+            remaining.discard(current_node)
+            if not remaining:
+                break
+        
+        start, stop = offsets[current_node], offsets[current_node + 1]
+        for neighbor, weight in zip(neighbors[start:stop].tolist(), edge_weights[start:stop].tolist()):
+            distance = current_distance + weight
+            if distance < distances[neighbor]:
+                distances[neighbor] = distance
+                predecessors[neighbor] = current_node
+                heapq.heappush(priority_queue, (distance, neighbor))
+    
+    return np.array(distances), np.array(predecessors, dtype=np.int64)
+
+
+def bounded_search(G, source, max_distance, weights=None):
+    """
+    Dijkstra from a node index that settles only the nodes within max_distance
+
+    Works on dicts, so the cost depends on the area reached rather than on
+    the size of the graph.
+
+    Args:
+        G: CompiledGraph
+        source: Node index
+        max_distance: Cost budget
+        weights: Optional per-edge weight array (defaults to G.weight)
+
+    Returns:
+        nodes: Settled node indices in order of distance
+        distances: Their distances, in the same order
+    """
+    weights = G.weight if weights is None else weights
+    offsets, targets = G.offsets, G.targets
+    best = {source: 0.0}
+    nodes = []
+    distances = []
+    settled = set()
+    priority_queue = [(0.0, source)]
+
+    while priority_queue:
+        current_distance, current_node = heapq.heappop(priority_queue)
+        if current_node in settled:
+            continue
+        if current_distance > max_distance:
+            break
+        settled.add(current_node)
+        nodes.append(current_node)
+        distances.append(current_distance)
+
+        start, stop = offsets[current_node], offsets[current_node + 1]
+        for neighbor, weight in zip(targets[start:stop].tolist(), weights[start:stop].tolist()):
+            distance = current_distance + weight
+            if distance < best.get(neighbor, float('infinity')):
+                best[neighbor] = distance
+                heapq.heappush(priority_queue, (distance, neighbor))
+
+    return nodes, distances
+
+
+def targeted_search(G, source, targets, weights=None):
+    """
+    Dijkstra from a node index that stops once every target is settled
+
+    Like bounded_search it works on dicts, so a search that ends early costs
+    only the nodes it touched, not the size of the graph.
+
+    Args:
+        G: CompiledGraph
+        source: Node index
+        targets: Collection of node indices
+        weights: Optional per-edge weight array (defaults to G.weight)
+
+    Returns:
+        distances: Dict of node index to distance; exact for every settled
+            node, so for every reachable target
+        predecessors: Dict of node index to the previous node (-1 at the source)
+    """
+    weights = G.weight if weights is None else weights
+    offsets, neighbors = G.offsets, G.targets
+    distances = {source: 0.0}
+    predecessors = {source: -1}
+    settled = set()
+    remaining = set(targets)
+    priority_queue = [(0.0, source)]
+
+    while priority_queue and remaining:
+        current_distance, current_node = heapq.heappop(priority_queue)
+        if current_node in settled:
+            continue
+        settled.add(current_node)
+        remaining.discard(current_node)
+
+        start, stop = offsets[current_node], offsets[current_node + 1]
+        for neighbor, weight in zip(neighbors[start:stop].tolist(), weights[start:stop].tolist()):
+            distance = current_distance + weight
+            if distance < distances.get(neighbor, float('infinity')):
+                distances[neighbor] = distance
+                predecessors[neighbor] = current_node
+                heapq.heappush(priority_queue, (distance, neighbor))
+
+    return distances, predecessors
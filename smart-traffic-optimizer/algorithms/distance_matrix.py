@@ -0,0 +1,64 @@
+import numpy as np
+from algorithms.compiled_graph import as_compiled
+from algorithms.dijkstra import targeted_search
+
+
+class PredecessorTrees:
+    """Shortest path trees kept by distance_matrix (predecessor dicts); paths are rebuilt only on demand"""
+
+    def __init__(self, G, sources, targets, predecessors):
+        self.G = G
+        self.sources = sources
+        self.targets = targets
+        self.predecessors = predecessors
+
+    def path(self, i, j):
+        """Path (string IDs) from the i-th source to the j-th target, [] if unreachable"""
+        t = self.targets[j]
+        predecessors = self.predecessors[i]
+        if t not in predecessors:
+            return []
+        return self.G.path_from_predecessors(predecessors, t)
+
+
+def distance_matrix(G, sources, targets, weights=None, return_predecessors=False):
+    """
+    Travel costs between every source and every target
+
+    Runs one Dijkstra search per source over the compiled graph, stopping as
+    soon as all targets are settled. Searches keep their state in dicts, so a
+    small matrix on a large graph costs only the nodes the searches reach.
+
+    Args:
+        G: NetworkX graph or CompiledGraph
+        sources: List of source node IDs
+        targets: List of target node IDs
+        weights: Optional per-edge weight array (defaults to the graph weights)
+        return_predecessors: Also return the shortest path trees
+
+    Returns:
+        matrix: Array of shape (len(sources), len(targets)), inf where unreachable
+        trees: PredecessorTrees (only if return_predecessors is True)
+    """
+    G = as_compiled(G)
+    source_index = [G.index[node] for node in sources]
+    target_index = [G.index[node] for node in targets]
+
+    matrix = np.full((len(source_index), len(target_index)), np.inf)
+    predecessors = []
+    for i, s in enumerate(source_index):
+        distances, tree = targeted_search(G, s, target_index, weights=weights)
+        matrix[i] = [distances.get(t, np.inf) for t in target_index]
+        if return_predecessors:
+            predecessors.append(tree)
+
+    if return_predecessors:
+        return matrix, PredecessorTrees(G, source_index, target_index, predecessors)
+    return matrix
+
+
+def nodes_of_type(G, node_types):
+    """String IDs of all nodes whose type is one of node_types, in graph order"""
+    G = as_compiled(G)
+    codes = [G.code('node_type', node_type) for node_type in node_types]
+    return [G.node_ids[i] for i in np.flatnonzero(np.isin(G.node_type, codes))]
@@ -0,0 +1,331 @@
+"""
+Shortest path trees kept up to date under partial traffic updates
+
+Benchmark against full recomputation (from the project directory):
+    python -m algorithms.dynamic_sssp --sources DEH HAR --batch-sizes 1 10 100
+"""
+import argparse
+import heapq
+import json
+import random
+import time
+import numpy as np
+from algorithms.compiled_graph import compiled_graph_from_data
+from algorithms.dijkstra import shortest_path_tree
+from algorithms.traffic_patch import apply_traffic_patch
+
+DEFAULT_DATA_PATH = 'data/uttarakhand_realistic_data.json'
+
+# Hot sources whose trees are maintained by default (Dehradun, Haridwar)
+DEFAULT_HOT_SOURCES = ['DEH', 'HAR']
+
+
+class DynamicShortestPathTree:
+    """
+    Single-source shortest path tree over a CompiledGraph that can be repaired
+    after edge weight changes instead of being recomputed
+
+    Each node stores its distance and the id of its tree (parent) edge. The
+    tree reads the current weights from G.weight, so callers change traffic
+    through the graph's traffic API and then call repair() with the old
+    weights of changed edges (HotSourceTrees does both).
+
+    Repair follows Ramalingam and Reps: increased tree edges can only hurt
+    their subtrees, and a subtree node whose distance is still achievable
+    through an unaffected in-neighbor just switches parent. The remaining
+    affected nodes and the heads of decreased edges are then settled again
+    by a Dijkstra search seeded from their unaffected in-neighbors, so the
+    work is proportional to the part of the tree that actually changes.
+    """
+
+    def __init__(self, G, source):
+        self.G = G
+        self.source = source
+        self.recompute()
+
+    def recompute(self):
+        """Rebuild the tree from scratch with the current weights"""
+        G = self.G
+        s = G.index[self.source]
+        distances, predecessors = shortest_path_tree(G, s)
+
+        parent_edge = [-1] * G.num_nodes
+        offsets, targets = G.offsets, G.targets
+        for v, u in enumerate(predecessors.tolist()):
+            if u >= 0:
+                start = offsets[u]
+                parent_edge[v] = start + int(np.flatnonzero(targets[start:offsets[u + 1]] == v)[0])
+
+        self.root = s
+        self.dist = distances.tolist()
+        self.parent_edge = parent_edge
+
+    @property
+    def distances(self):
+        return np.array(self.dist)
+
+    def distance(self, target):
+        """Current shortest distance from the source to target (string ID)"""
+        return self.dist[self.G.index[target]]
+
+    def path(self, target):
+        """Current shortest path from the source to target (string IDs), [] if unreachable"""
+        v = self.G.index[target]
+        if self.dist[v] == float('infinity'):
+            return []
+        sources = self.G.sources
+        path = [v]
+        while self.parent_edge[v] >= 0:
+            v = int(sources[self.parent_edge[v]])
+            path.append(v)
+        return [self.G.node_ids[i] for i in reversed(path)]
+
+    def repair(self, edge_ids, old_weights):
+        """
+        Bring the tree up to date after the weights of edge_ids changed
+
+        Args:
+            edge_ids: Ids of the changed edges (G.weight already holds the new values)
+            old_weights: Their weights before the change
+
+        Returns:
+            int: Number of nodes whose distance or parent was touched
+        """
+        G = self.G
+        weights = G.weight
+        sources, targets = G.sources, G.targets
+        dist, parent_edge = self.dist, self.parent_edge
+
+        increased = []
+        decreased = []
+        for e, old in zip(edge_ids, old_weights):
+            new = float(weights[e])
+            head = int(targets[e])
+            if new > old and parent_edge[head] == e:
+                increased.append(head)
+            elif new < old:
+                decreased.append(e)
+
+        affected = self._affected_nodes(increased) if increased else set()
+        for v in affected:
+            dist[v] = float('infinity')
+            parent_edge[v] = -1
+
+        # Seed the search with the best way into each affected node from the
+        # unaffected part of the tree, and with improved decreased edges
+        reverse_offsets, reverse_sources, reverse_edges = G.reverse_csr()
+        frontier = []
+        for v in affected:
+            start, stop = reverse_offsets[v], reverse_offsets[v + 1]
+            for u, e in zip(reverse_sources[start:stop].tolist(), reverse_edges[start:stop].tolist()):
+                candidate = dist[u] + float(weights[e])
+                if candidate < dist[v]:
+                    dist[v] = candidate
+                    parent_edge[v] = e
+            if dist[v] < float('infinity'):
+                frontier.append((dist[v], v))
+
+        for e in decreased:
+            u, v = int(sources[e]), int(targets[e])
+            candidate = dist[u] + float(weights[e])
+            if candidate < dist[v]:
+                dist[v] = candidate
+                parent_edge[v] = e
+                frontier.append((candidate, v))
+
+        touched = set(affected)
+        heapq.heapify(frontier)
+        offsets = G.offsets
+        while frontier:
+            d, u = heapq.heappop(frontier)
+            if d > dist[u]:
+                continue
+            touched.add(u)
+            start, stop = offsets[u], offsets[u + 1]
+            for e, v, weight in zip(range(start, stop), targets[start:stop].tolist(), weights[start:stop].tolist()):
+                candidate = d + weight
+                if candidate < dist[v]:
+                    dist[v] = candidate
+                    parent_edge[v] = e
+                    heapq.heappush(frontier, (candidate, v))
+
+        return len(touched)
+
+    def _affected_nodes(self, heads):
+        """
+        Nodes whose distance must grow after tree edges into heads got heavier
+
+        Candidates are visited in order of their old distance, so every
+        in-neighbor's status is known before a node is examined. A node with an
+        unaffected in-neighbor that still gives exactly its old distance keeps
+        it (switching its parent edge); otherwise it is affected and its tree
+        children become candidates.
+        """
+        G = self.G
+        weights = G.weight
+        offsets, targets = G.offsets, G.targets
+        reverse_offsets, reverse_sources, reverse_edges = G.reverse_csr()
+        dist, parent_edge = self.dist, self.parent_edge
+
+        affected = set()
+        pending = set(heads)
+        candidates = [(dist[v], v) for v in pending]
+        heapq.heapify(candidates)
+
+        while candidates:
+            d, v = heapq.heappop(candidates)
+            pending.discard(v)
+            start, stop = reverse_offsets[v], reverse_offsets[v + 1]
+            for u, e in zip(reverse_sources[start:stop].tolist(), reverse_edges[start:stop].tolist()):
+                if u not in affected and u not in pending and dist[u] + float(weights[e]) == d:
+                    parent_edge[v] = e
+                    break
+            else:
+                affected.add(v)
+                start, stop = offsets[v], offsets[v + 1]
+                for e, child in zip(range(start, stop), targets[start:stop].tolist()):
+                    if parent_edge[child] == e and child not in pending:
+                        pending.add(child)
+                        heapq.heappush(candidates, (dist[child], child))
+
+        return affected
+
+
+class HotSourceTrees:
+    """
+    Dynamic shortest path trees for a set of frequently queried sources
+
+    update() applies new traffic levels through apply_traffic_patch, which
+    keeps G.traffic, both weight settings and the graph version consistent,
+    and repairs every tree from the resulting weight changes. The weights the
+    trees were last brought up to date with are kept, so changes made to G by
+    other code (another patch, set_consider_traffic) are picked up by
+    refresh() the same way.
+    """
+
+    def __init__(self, G, sources=None):
+        self.G = G
+        self.trees = {source: DynamicShortestPathTree(G, source)
+                      for source in (sources or DEFAULT_HOT_SOURCES) if source in G}
+        self.weight = np.array(G.weight, dtype=np.float64)
+        self.version = G.version
+
+    def __getitem__(self, source):
+        return self.trees[source]
+
+    def __contains__(self, source):
+        return source in self.trees
+
+    def update(self, patch, roads=None):
+        """
+        Apply new traffic levels to G and repair the trees
+
+        Args:
+            patch: dict mapping road ID (index into roads or (from, to) pair)
+                to traffic level, as for apply_traffic_patch
+            roads: The data["roads"] list, for index road IDs
+
+        Returns:
+            dict: source -> number of nodes touched by its repair
+        """
+        apply_traffic_patch(self.G, patch, roads)
+        return self.refresh()
+
+    def refresh(self):
+        """
+        Repair the trees for every edge whose weight changed since the last repair
+
+        Returns:
+            dict: source -> number of nodes touched by its repair
+        """
+        G = self.G
+        if G.version == self.version:
+            return {source: 0 for source in self.trees}
+        edge_ids = np.flatnonzero(G.weight != self.weight)
+        old_weights = self.weight[edge_ids].tolist()
+        self.weight[edge_ids] = G.weight[edge_ids]
+        self.version = G.version
+
+        edge_ids = edge_ids.tolist()
+        return {source: tree.repair(edge_ids, old_weights) for source, tree in self.trees.items()}
+
+    def route(self, source, target):
+        """(cost, path) from a hot source, read off its tree"""
+        tree = self.trees[source]
+        return tree.distance(target), tree.path(target)
+
+
+def benchmark_repair(G, sources=None, batch_sizes=(1, 10, 100), rounds=5, seed=0):
+    """
+    Time tree repair against full recomputation for random traffic changes
+
+    Each round sets batch_size random roads (both directions) to a random
+    traffic level, so weights both increase and decrease, repairs the hot
+    source trees and then recomputes them from scratch to compare time and
+    check the result. Changes accumulate on G, whose traffic is restored
+    afterwards.
+
+    Returns:
+        list of dicts per batch size with mean repair / recompute seconds,
+        speedup, mean nodes touched and whether all distances matched
+    """
+    rng = random.Random(seed)
+    original = G.traffic.copy()
+    trees = HotSourceTrees(G, sources)
+    tails, heads = G.sources, G.targets
+    rows = []
+
+    try:
+        for batch_size in batch_sizes:
+            repair_time = recompute_time = 0.0
+            touched = 0
+            exact = True
+            for _ in range(rounds):
+                edges = rng.sample(range(G.num_edges), min(batch_size, G.num_edges))
+                patch = {(G.node_ids[tails[e]], G.node_ids[heads[e]]): rng.random() for e in edges}
+
+                start = time.perf_counter()
+                touched += sum(trees.update(patch).values())
+                repair_time += time.perf_counter() - start
+
+                start = time.perf_counter()
+                fresh = [shortest_path_tree(G, tree.root)[0] for tree in trees.trees.values()]
+                recompute_time += time.perf_counter() - start
+
+                for tree, distances in zip(trees.trees.values(), fresh):
+                    exact = exact and np.allclose(tree.distances, distances, rtol=1e-9, atol=1e-9)
+
+            rows.append({
+                'batch_size': batch_size,
+                'repair': repair_time / rounds,
+                'recompute': recompute_time / rounds,
+                'speedup': recompute_time / repair_time if repair_time > 0 else float('infinity'),
+                'touched': touched / rounds,
+                'exact': exact
+            })
+    finally:
+        G.apply_traffic(np.arange(G.num_edges), original)
+
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark dynamic shortest path tree repair")
+    parser.add_argument('--data', default=DEFAULT_DATA_PATH, help="Road network JSON file")
+    parser.add_argument('--sources', nargs='+', default=DEFAULT_HOT_SOURCES, help="Hot source node IDs")
+    parser.add_argument('--batch-sizes', nargs='+', type=int, default=[1, 5, 20, 100, 400])
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args(argv)
+
+    with open(args.data, 'r') as f:
+        data = json.load(f)
+    G = compiled_graph_from_data(data)
+
+    print(f"{'batch':>6} {'repair ms':>10} {'recompute ms':>13} {'speedup':>8} {'touched':>8} exact")
+    for row in benchmark_repair(G, args.sources, args.batch_sizes, args.rounds):
+        print(f"{row['batch_size']:>6} {row['repair'] * 1000:>10.3f} {row['recompute'] * 1000:>13.3f} "
+              f"{row['speedup']:>7.1f}x {row['touched']:>8.1f} {row['exact']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+import time
+import numpy as np
+from algorithms.compiled_graph import as_compiled
+from algorithms.contraction_hierarchies import build_contraction_hierarchy
+
+
+class HubLabels:
+    """
+    Hub labeling (2-hop cover) index for exact distance queries
+
+    Every node v has a forward label of (hub, distance v -> hub) pairs and a
+    backward label of (hub, distance hub -> v) pairs; for any s and t some
+    hub on a shortest s -> t path is in both labels, so the distance is the
+    minimum of forward[s][h] + backward[t][h] over their common hubs. Labels
+    are stored in CSR form sorted by hub: fwd_offsets[v]..fwd_offsets[v+1]
+    index fwd_hubs / fwd_dists, and likewise bwd_* for backward labels.
+
+    Each entry also keeps the hierarchy arc it was derived from (parent node
+    and shortcut middle), so paths can be unpacked through the contraction
+    hierarchy the labels were built from.
+    """
+
+    def __init__(self, hierarchy, forward, backward):
+        self.hierarchy = hierarchy
+        self.node_ids = hierarchy.node_ids
+        self.fwd_offsets, self.fwd_hubs, self.fwd_dists, self.fwd_parents, self.fwd_middle = forward
+        self.bwd_offsets, self.bwd_hubs, self.bwd_dists, self.bwd_parents, self.bwd_middle = backward
+        self.build_time = 0.0
+        self._index = {node_id: i for i, node_id in enumerate(self.node_ids)}
+
+    @property
+    def num_entries(self):
+        return len(self.fwd_hubs) + len(self.bwd_hubs)
+
+    @property
+    def nbytes(self):
+        arrays = (self.fwd_offsets, self.fwd_hubs, self.fwd_dists, self.fwd_parents, self.fwd_middle,
+                  self.bwd_offsets, self.bwd_hubs, self.bwd_dists, self.bwd_parents, self.bwd_middle)
+        return sum(array.nbytes for array in arrays)
+
+    def stats(self):
+        """Build time and label sizes, to judge memory use at larger scales"""
+        sizes = np.concatenate([np.diff(self.fwd_offsets), np.diff(self.bwd_offsets)])
+        return {
+            'nodes': len(self.node_ids),
+            'build_time': self.build_time,
+            'entries': self.num_entries,
+            'avg_label_size': float(sizes.mean()) if len(sizes) else 0.0,
+            'max_label_size': int(sizes.max()) if len(sizes) else 0,
+            'bytes': self.nbytes
+        }
+
+    def _meeting_hub(self, s, t):
+        fs, fe = self.fwd_offsets[s], self.fwd_offsets[s + 1]
+        bs, be = self.bwd_offsets[t], self.bwd_offsets[t + 1]
+        _, i, j = np.intersect1d(self.fwd_hubs[fs:fe], self.bwd_hubs[bs:be],
+                                 assume_unique=True, return_indices=True)
+        if len(i) == 0:
+            return float('infinity'), -1
+        totals = self.fwd_dists[fs + i] + self.bwd_dists[bs + j]
+        best = int(np.argmin(totals))
+        return float(totals[best]), int(self.fwd_hubs[fs + i[best]])
+
+    def distance(self, source, target):
+        """Shortest path distance between node indices"""
+        return self._meeting_hub(source, target)[0]
+
+    def query(self, source, target, unpack=True):
+        """
+        Distance (and path) between two string node IDs
+
+        Returns:
+            distance: Total weight of the shortest path
+            path: List of nodes in path ([] when unpack is False or unreachable)
+        """
+        s = self._index.get(source)
+        t = self._index.get(target)
+        if s is None or t is None:
+            return float('infinity'), []
+
+        distance, hub = self._meeting_hub(s, t)
+        if hub == -1 or not unpack:
+            return distance, []
+        return distance, [self.node_ids[i] for i in self._unpack_path(s, t, hub)]
+
+    def distance_table(self, sources, targets):
+        """
+        Distances between all source and target node indices
+
+        Each source label is scattered into a hub-indexed array once, after
+        which every target costs one gather over its backward label.
+        """
+        table = np.full((len(sources), len(targets)), np.inf)
+        reach = np.full(len(self.node_ids), np.inf)
+        for row, s in enumerate(sources):
+            fs, fe = self.fwd_offsets[s], self.fwd_offsets[s + 1]
+            reach[self.fwd_hubs[fs:fe]] = self.fwd_dists[fs:fe]
+            for column, t in enumerate(targets):
+                bs, be = self.bwd_offsets[t], self.bwd_offsets[t + 1]
+                if be > bs:
+                    table[row, column] = np.min(reach[self.bwd_hubs[bs:be]] + self.bwd_dists[bs:be])
+            reach[self.fwd_hubs[fs:fe]] = np.inf
+        return table
+
+    def _entry(self, offsets, hubs, v, hub):
+        start, stop = offsets[v], offsets[v + 1]
+        return start + int(np.searchsorted(hubs[start:stop], hub))
+
+    def _unpack_path(self, s, t, hub):
+        ch = self.hierarchy
+        # Source up to the hub along forward label parents
+        path = [s]
+        v = s
+        while v != hub:
+            k = self._entry(self.fwd_offsets, self.fwd_hubs, v, hub)
+            parent = int(self.fwd_parents[k])
+            path.extend(ch.unpack_arc(v, parent, int(self.fwd_middle[k])))
+            v = parent
+
+        # Target back up to the hub along backward label parents, then reversed
+        arcs = []
+        v = t
+        while v != hub:
+            k = self._entry(self.bwd_offsets, self.bwd_hubs, v, hub)
+            parent = int(self.bwd_parents[k])
+            arcs.append((parent, v, int(self.bwd_middle[k])))
+            v = parent
+        for u, w, middle in reversed(arcs):
+            path.extend(ch.unpack_arc(u, w, middle))
+        return path
+
+
+def build_hub_labels(G, hierarchy=None, weights=None):
+    """
+    Build hub labels from a contraction order
+
+    Nodes are labelled from the highest rank down: a node's forward label is
+    itself plus the forward labels of its upward hierarchy neighbours shifted
+    by the arc weight (backward labels likewise over downward arcs). Entries
+    whose distance is beaten by a query over already finished labels are not
+    shortest distances and are pruned, which keeps labels small.
+
+    Args:
+        G: NetworkX graph or CompiledGraph
+        hierarchy: Optional ContractionHierarchy of G (built if not given)
+        weights: Optional per-edge weight array used when building the hierarchy
+
+    Returns:
+        HubLabels
+    """
+    G = as_compiled(G)
+    start_time = time.time()
+    ch = hierarchy if hierarchy is not None else build_contraction_hierarchy(G, weights)
+    n = len(ch.node_ids)
+
+    forward = [None] * n
+    backward = [None] * n
+    up = (ch.up_offsets, ch.up_targets, ch.up_weights, ch.up_middle)
+    down = (ch.down_offsets, ch.down_sources, ch.down_weights, ch.down_middle)
+
+    for v in reversed(ch.order.tolist()):
+        forward[v] = _label(v, up, forward, backward, reverse=False)
+        backward[v] = _label(v, down, backward, forward, reverse=True)
+
+    labels = HubLabels(ch, _labels_to_csr(forward), _labels_to_csr(backward))
+    labels.build_time = time.time() - start_time
+    return labels
+
+
+def _label(v, arcs, labels, opposite, reverse):
+    """
+    Label of v from the finished labels of its higher-ranked neighbours
+
+    Returns:
+        dict: hub -> (distance, parent node, shortcut middle)
+    """
+    offsets, neighbors, weights, middles = arcs
+    label = {v: (0.0, -1, -1)}
+    start, stop = offsets[v], offsets[v + 1]
+    for w, weight, middle in zip(neighbors[start:stop].tolist(), weights[start:stop].tolist(),
+                                 middles[start:stop].tolist()):
+        for hub, (distance, _, _) in labels[w].items():
+            candidate = distance + weight
+            if candidate < label.get(hub, (float('infinity'),))[0]:
+                label[hub] = (candidate, w, middle)
+
+    # Prune entries a 2-hop query over finished labels already beats. For a
+    # forward label that query is v -> x -> hub, using the backward label of
+    # hub; for a backward label it is hub -> x -> v.
+    pruned = {v: label[v]}
+    for hub, entry in label.items():
+        if hub == v:
+            continue
+        other = opposite[hub]
+        best = min((label[x][0] + other[x][0] for x in other if x in label), default=float('infinity'))
+        if best >= entry[0]:
+            pruned[hub] = entry
+    return pruned
+
+
+def _labels_to_csr(labels):
+    n = len(labels)
+    offsets = np.zeros(n + 1, dtype=np.int64)
+    offsets[1:] = np.cumsum([len(label) for label in labels])
+    hubs = np.empty(offsets[-1], dtype=np.int32)
+    dists = np.empty(offsets[-1], dtype=np.float64)
+    parents = np.empty(offsets[-1], dtype=np.int32)
+    middles = np.empty(offsets[-1], dtype=np.int32)
+    for v, label in enumerate(labels):
+        for k, hub in enumerate(sorted(label)):
+            distance, parent, middle = label[hub]
+            hubs[offsets[v] + k] = hub
+            dists[offsets[v] + k] = distance
+            parents[offsets[v] + k] = parent
+            middles[offsets[v] + k] = middle
+    return offsets, hubs, dists, parents, middles
@@ -0,0 +1,130 @@
+import numpy as np
+from algorithms.compiled_graph import as_compiled
+from algorithms.dijkstra import bounded_search
+from algorithms.time_dependent import FREE_FLOW_SPEED, TRAFFIC_SLOWDOWN
+
+# Default travel time budgets in minutes (1h / 2h / 3h)
+DEFAULT_BUDGETS = [60, 120, 180]
+
+
+def travel_time_weights(G):
+    """Travel time in minutes of every edge under its current traffic level"""
+    return G.derived('travel_minutes', lambda: G.distance / (FREE_FLOW_SPEED * (1 - TRAFFIC_SLOWDOWN * G.traffic)) * 60.0)
+
+
+class Isochrone:
+    """
+    Area reachable from a source within one budget
+
+    nodes: Reached node IDs, closest first
+    costs: Cost of each reached node
+    frontier: (u, v, fraction) for every edge leaving the reached area, where
+        u is reached and fraction is how far along the edge the budget lasts
+    """
+
+    def __init__(self, budget, nodes, costs, frontier):
+        self.budget = budget
+        self.nodes = nodes
+        self.costs = costs
+        self.frontier = frontier
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def boundary_points(self, G):
+        """(lat, lon) points outlining the area: reached nodes and the budget's end on frontier edges"""
+        G = as_compiled(G)
+        points = [tuple(G.pos[G.index[node]]) for node in self.nodes]
+        for u, v, fraction in self.frontier:
+            start, end = G.pos[G.index[u]], G.pos[G.index[v]]
+            points.append(tuple(start + (end - start) * fraction))
+        return points
+
+    def polygon(self, G):
+        """Convex hull of the boundary points, as a list of (lat, lon)"""
+        return convex_hull(self.boundary_points(G))
+
+
+def isochrones(G, source, budgets=DEFAULT_BUDGETS, weights=None):
+    """
+    Reachability from a node for several budgets with one bounded search
+
+    A single Dijkstra search stops once the largest budget is exceeded, so
+    only the reachable part of the network is explored; each smaller budget
+    is then a threshold on the same distances. Frontier edges are collected
+    from the CSR rows of the reached nodes only.
+
+    Args:
+        G: NetworkX graph or CompiledGraph
+        source: Starting node
+        budgets: Cost budgets (in minutes with the default weights)
+        weights: Optional per-edge cost array (defaults to current travel
+            times in minutes, see travel_time_weights)
+
+    Returns:
+        list of Isochrone, one per budget in increasing budget order
+    """
+    G = as_compiled(G)
+    if source not in G:
+        return []
+    weights = travel_time_weights(G) if weights is None else weights
+    budgets = sorted(budgets)
+
+    # Settled nodes come out in order of distance, so each budget reaches a prefix
+    nodes, distances = bounded_search(G, G.index[source], budgets[-1], weights=weights)
+    nodes = np.array(nodes, dtype=np.int64)
+    distances = np.array(distances, dtype=np.float64)
+
+    # Edges leaving reached nodes, with the distance of both ends (inf for unreached heads)
+    counts = (G.offsets[nodes + 1] - G.offsets[nodes]).astype(np.int64)
+    row_starts = np.repeat(G.offsets[nodes] - np.cumsum(counts) + counts, counts)
+    edges = row_starts + np.arange(counts.sum(), dtype=np.int64)
+    tail_distances = np.repeat(distances, counts)
+    heads = G.targets[edges].astype(np.int64)
+    by_node = np.argsort(nodes)
+    position = np.minimum(np.searchsorted(nodes[by_node], heads), max(len(nodes) - 1, 0))
+    head_distances = np.full(len(edges), np.inf)
+    if len(nodes):
+        found = nodes[by_node][position] == heads
+        head_distances[found] = distances[by_node][position[found]]
+
+    results = []
+    for budget in budgets:
+        count = int(np.searchsorted(distances, budget, side='right'))
+        reached = nodes[:count].tolist()
+
+        leaving = (tail_distances <= budget) & (head_distances > budget)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fractions = np.clip((budget - tail_distances[leaving]) / weights[edges[leaving]], 0.0, 1.0)
+        tails = np.repeat(nodes, counts)[leaving]
+
+        results.append(Isochrone(
+            budget,
+            [G.node_ids[i] for i in reached],
+            {G.node_ids[i]: float(d) for i, d in zip(reached, distances[:count].tolist())},
+            [(G.node_ids[u], G.node_ids[v], float(fraction))
+             for u, v, fraction in zip(tails.tolist(), heads[leaving].tolist(), fractions.tolist())]
+        ))
+    return results
+
+
+def convex_hull(points):
+    """Convex hull of 2D points (monotone chain), counter-clockwise without repeating the first point"""
+    points = sorted(set(points))
+    if len(points) <= 2:
+        return points
+
+    def cross(o, a, b):
+        return (a[0] - o[0]) * (b[1] - o[1]) - (a[1] - o[1]) * (b[0] - o[0])
+
+    lower = []
+    for p in points:
+        while len(lower) >= 2 and cross(lower[-2], lower[-1], p) <= 0:
+            lower.pop()
+        lower.append(p)
+    upper = []
+    for p in reversed(points):
+        while len(upper) >= 2 and cross(upper[-2], upper[-1], p) <= 0:
+            upper.pop()
+        upper.append(p)
+    return lower[:-1] + upper[:-1]
@@ -0,0 +1,220 @@
+import heapq
+import numpy as np
+from algorithms.compiled_graph import as_compiled
+from algorithms.dijkstra import shortest_path_tree
+
+# Weight multiplier applied to the edges of each found path by the penalty method
+DEFAULT_PENALTY = 0.5
+
+
+def k_shortest_paths(G, source, target, k=3, method='yen', weights=None, penalty=DEFAULT_PENALTY):
+    """
+    Up to k alternative routes between two nodes, cheapest first
+
+    method='yen' returns the exact k shortest loopless paths (Yen's algorithm).
+    One reverse shortest path tree from the target is computed up front: its
+    distances are an exact A* heuristic for every spur search, and whenever
+    the tree path from a spur node avoids the removed nodes and edges it is
+    taken directly without searching at all.
+
+    method='penalty' is a faster heuristic: it repeatedly takes the shortest
+    path and makes its edges more expensive, which tends to produce routes
+    that differ more from each other, but they are not guaranteed to be the
+    k shortest.
+
+    Args:
+        G: NetworkX graph or CompiledGraph
+        source: Starting node
+        target: Target node
+        k: Number of routes
+        method: 'yen' or 'penalty'
+        weights: Optional per-edge weight array (defaults to the graph weights)
+        penalty: Relative weight increase per use for the penalty method
+
+    Returns:
+        list of (cost, path) tuples
+    """
+    G = as_compiled(G)
+    if source not in G or target not in G or k < 1:
+        return []
+    weights = G.weight if weights is None else weights
+    s, t = G.index[source], G.index[target]
+
+    if method == 'yen':
+        routes = _yen(G, s, t, k, weights)
+    elif method == 'penalty':
+        routes = _penalty(G, s, t, k, weights, penalty)
+    else:
+        raise ValueError(f"Unknown k-shortest-paths method: {method}")
+
+    return [(cost, [G.node_ids[i] for i in path]) for cost, path in routes]
+
+
+def _path_cost(G, path, weights):
+    return sum(float(weights[_edge_between(G, u, v)]) for u, v in zip(path[:-1], path[1:]))
+
+
+def _edge_between(G, u, v):
+    start, stop = G.offsets[u], G.offsets[u + 1]
+    hits = np.flatnonzero(G.targets[start:stop] == v)
+    # Several parallel edges cannot occur in a compiled DiGraph
+    return int(start + hits[0])
+
+
+def _tree_path(next_hop, node, t):
+    path = [node]
+    while node != t:
+        node = int(next_hop[node])
+        path.append(node)
+    return path
+
+
+def _yen(G, s, t, k, weights):
+    # Distances to the target and next hop towards it, on the unmodified graph
+    to_target, next_hop = shortest_path_tree(G, t, weights=weights, reverse=True)
+    if to_target[s] == float('infinity'):
+        return []
+    heuristic = to_target.tolist()
+
+    shortest = _tree_path(next_hop, s, t)
+    # Paths are kept as (cost, path, deviation index from the path they spurred off)
+    accepted = [(float(to_target[s]), shortest, 0)]
+    candidates = []
+    seen = {tuple(shortest)}
+
+    while len(accepted) < k:
+        _, previous, deviation = accepted[-1]
+        # Spurs before the deviation index were already generated from the
+        # parent path (Lawler's refinement), so only later ones are searched
+        root_cost = _path_cost(G, previous[:deviation + 1], weights)
+        for i in range(deviation, len(previous) - 1):
+            spur_node = previous[i]
+            root = previous[:i + 1]
+
+            # Edges leaving the spur node that accepted paths sharing this root already use
+            banned_edges = {
+                _edge_between(G, path[i], path[i + 1])
+                for _, path, _ in accepted
+                if len(path) > i + 1 and path[:i + 1] == root
+            }
+            banned_nodes = set(root[:-1])
+
+            spur = _tree_spur(G, spur_node, t, next_hop, banned_nodes, banned_edges, to_target)
+            if spur is None:
+                spur = _spur_search(G, spur_node, t, weights, heuristic, next_hop, banned_nodes, banned_edges)
+            if spur is not None:
+                spur_cost, spur_path = spur
+                path = root[:-1] + spur_path
+                if tuple(path) not in seen:
+                    seen.add(tuple(path))
+                    heapq.heappush(candidates, (root_cost + spur_cost, path, i))
+
+            root_cost += float(weights[_edge_between(G, previous[i], previous[i + 1])])
+
+        if not candidates:
+            break
+        accepted.append(heapq.heappop(candidates))
+
+    return [(cost, path) for cost, path, _ in accepted]
+
+
+def _tree_spur(G, spur_node, t, next_hop, banned_nodes, banned_edges, to_target):
+    """The tree path from spur_node, if none of its nodes or edges are removed"""
+    if to_target[spur_node] == float('infinity') or spur_node == t:
+        return None
+    if _edge_between(G, spur_node, int(next_hop[spur_node])) in banned_edges:
+        return None
+    path = _tree_path(next_hop, spur_node, t)
+    if banned_nodes.intersection(path):
+        return None
+    return float(to_target[spur_node]), path
+
+
+def _spur_search(G, spur_node, t, weights, heuristic, next_hop, banned_nodes, banned_edges):
+    """
+    A* from spur_node to t avoiding banned nodes and edges
+
+    The heuristic is the exact distance to t on the unmodified graph, so as
+    soon as a popped node's tree path avoids every banned node, following
+    that tree path is optimal and the search stops there.
+    """
+    offsets, targets = G.offsets, G.targets
+    # Tree paths leading back through the spur node would use a banned edge
+    # or form a loop, so the spur node counts as banned for them
+    blocked = banned_nodes | {spur_node}
+    clean = {t: True}
+    cost_so_far = {spur_node: 0.0}
+    came_from = {spur_node: -1}
+    frontier = [(heuristic[spur_node], spur_node)]
+    closed = set()
+
+    while frontier:
+        _, current = heapq.heappop(frontier)
+        if current in closed:
+            continue
+        if current != spur_node and _tree_path_clean(current, next_hop, blocked, clean):
+            path = []
+            node = current
+            while node != -1:
+                path.append(node)
+                node = came_from[node]
+            path.reverse()
+            return cost_so_far[current] + heuristic[current], path + _tree_path(next_hop, current, t)[1:]
+        closed.add(current)
+
+        start, stop = offsets[current], offsets[current + 1]
+        for e, next_node, weight in zip(range(start, stop), targets[start:stop].tolist(), weights[start:stop].tolist()):
+            if next_node in banned_nodes or next_node in closed or e in banned_edges:
+                continue
+            new_cost = cost_so_far[current] + weight
+            if new_cost < cost_so_far.get(next_node, float('infinity')):
+                cost_so_far[next_node] = new_cost
+                came_from[next_node] = current
+                heapq.heappush(frontier, (new_cost + heuristic[next_node], next_node))
+
+    return None
+
+
+def _tree_path_clean(node, next_hop, blocked, clean):
+    """Whether the tree path from node reaches the target without a blocked node (memoized)"""
+    walked = []
+    while node not in clean:
+        if node in blocked or next_hop[node] < 0:
+            clean[node] = False
+            break
+        walked.append(node)
+        node = int(next_hop[node])
+    result = clean[node]
+    for node in walked:
+        clean[node] = result
+    return result
+
+
+def _penalty(G, s, t, k, weights, penalty):
+    penalized = np.array(weights, dtype=np.float64)
+    routes = []
+    seen = set()
+
+    # A few extra rounds allow for repeats of an already found route
+    for _ in range(3 * k):
+        distances, predecessors = shortest_path_tree(G, s, weights=penalized, stop_at=[t])
+        if distances[t] == float('infinity'):
+            break
+
+        path = [t]
+        while path[-1] != s:
+            path.append(int(predecessors[path[-1]]))
+        path.reverse()
+
+        if tuple(path) not in seen:
+            seen.add(tuple(path))
+            routes.append((_path_cost(G, path, weights), path))
+            if len(routes) == k:
+                break
+
+        for u, v in zip(path[:-1], path[1:]):
+            e = _edge_between(G, u, v)
+            penalized[e] += weights[e] * penalty
+
+    routes.sort(key=lambda route: route[0])
+    return routes
@@ -0,0 +1,106 @@
+import heapq
+import numpy as np
+from algorithms.compiled_graph import as_compiled
+from algorithms.dijkstra import shortest_path_tree
+from algorithms.distance_matrix import nodes_of_type
+
+
+class NearestFacilities:
+    """
+    The k nearest facilities of every node, from one multi-source search
+
+    facilities[i, j] is the node index of the j-th nearest facility of node i
+    (-1 where fewer than j + 1 facilities are reachable) and distances[i, j]
+    the cost of getting there (inf where missing).
+    """
+
+    def __init__(self, G, facility_types, facilities, distances):
+        self.G = G
+        self.facility_types = facility_types
+        self.facilities = facilities
+        self.distances = distances
+
+    @property
+    def k(self):
+        return self.facilities.shape[1]
+
+    def nearest(self, node, k=None):
+        """The nearest facilities of a node as a list of (facility ID, cost), closest first"""
+        i = self.G.index[node]
+        k = self.k if k is None else min(k, self.k)
+        return [(self.G.node_ids[f], float(d))
+                for f, d in zip(self.facilities[i, :k].tolist(), self.distances[i, :k].tolist()) if f >= 0]
+
+
+def nearest_facilities(G, node_types, k=1, weights=None):
+    """
+    Nearest facilities of the given node types for every node in one pass
+
+    All facility nodes are seeded at cost 0 and the search runs over reverse
+    edges, so each node's cost is the cost of driving from it to the
+    facility. For k = 1 this is a plain multi-source Dijkstra whose tree
+    roots give the facility; for k > 1 every node may be settled once per
+    facility until it has k of them.
+
+    Results for the graph weights are cached on the graph, so they are
+    rebuilt only when the traffic version changes.
+
+    Args:
+        G: NetworkX graph or CompiledGraph
+        node_types: Node type labels that count as facilities (e.g. ['char_dham'])
+        k: Number of nearest facilities per node
+        weights: Optional per-edge cost array (defaults to the graph weights; not cached)
+
+    Returns:
+        NearestFacilities
+    """
+    G = as_compiled(G)
+    node_types = tuple(sorted(node_types))
+    if weights is not None:
+        return _nearest_facilities(G, node_types, k, weights)
+    return G.derived(('nearest_facilities', node_types, k),
+                     lambda: _nearest_facilities(G, node_types, k, G.weight))
+
+
+def _nearest_facilities(G, node_types, k, weights):
+    sources = [G.index[node] for node in nodes_of_type(G, node_types)]
+    n = G.num_nodes
+    if not sources:
+        return NearestFacilities(G, node_types, np.full((n, k), -1, dtype=np.int64), np.full((n, k), np.inf))
+
+    if k == 1:
+        distances, next_hop = shortest_path_tree(G, sources, weights=weights, reverse=True)
+        # Every node inherits the facility of its next hop; nodes are handled
+        # closest first so the next hop is always resolved already
+        facility = np.full(n, -1, dtype=np.int64)
+        facility[sources] = sources
+        for v in np.argsort(distances, kind='stable').tolist():
+            if facility[v] < 0 and next_hop[v] >= 0:
+                facility[v] = facility[next_hop[v]]
+        return NearestFacilities(G, node_types, facility[:, None], distances[:, None])
+
+    offsets, tails, edge_ids = G.reverse_csr()
+    edge_weights = weights[edge_ids]
+    found = [[] for _ in range(n)]
+    found_distances = [[] for _ in range(n)]
+    queue = [(0.0, s, s) for s in sources]
+    heapq.heapify(queue)
+
+    while queue:
+        distance, node, facility = heapq.heappop(queue)
+        if len(found[node]) >= k or facility in found[node]:
+            continue
+        found[node].append(facility)
+        found_distances[node].append(distance)
+
+        start, stop = offsets[node], offsets[node + 1]
+        for neighbor, weight in zip(tails[start:stop].tolist(), edge_weights[start:stop].tolist()):
+            if len(found[neighbor]) < k and facility not in found[neighbor]:
+                heapq.heappush(queue, (distance + weight, neighbor, facility))
+
+    facilities = np.full((n, k), -1, dtype=np.int64)
+    distances = np.full((n, k), np.inf)
+    for i in range(n):
+        facilities[i, :len(found[i])] = found[i]
+        distances[i, :len(found_distances[i])] = found_distances[i]
+    return NearestFacilities(G, node_types, facilities, distances)
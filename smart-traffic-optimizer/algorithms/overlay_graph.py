@@ -0,0 +1,376 @@
+import heapq
+import time
+import numpy as np
+from algorithms.compiled_graph import as_compiled
+from algorithms.traffic_patch import apply_traffic_patch
+
+# Cells the default fine level splits each division into (k-means over pos)
+DEFAULT_CELLS_PER_DIVISION = 4
+
+# Lloyd iterations of kmeans_partition
+KMEANS_ITERATIONS = 20
+
+
+def kmeans_partition(G, k, within=None, seed=0):
+    """
+    Cluster nodes into k cells by position (Lloyd's k-means over pos)
+
+    With within (a cell array of a coarser partition) every coarser cell is
+    clustered separately into up to k cells, so the result nests inside it.
+
+    Returns:
+        ndarray: cell id of every node, numbered 0..cells-1
+    """
+    G = as_compiled(G)
+    groups = np.zeros(G.num_nodes, dtype=np.int64) if within is None else np.asarray(within)
+    rng = np.random.default_rng(seed)
+    cells = np.empty(G.num_nodes, dtype=np.int64)
+    next_cell = 0
+
+    for group in np.unique(groups).tolist():
+        members = np.flatnonzero(groups == group)
+        points = G.pos[members]
+        count = min(k, len(members))
+        centers = points[rng.choice(len(members), count, replace=False)]
+        for _ in range(KMEANS_ITERATIONS):
+            assignment = np.argmin(((points[:, None, :] - centers[None, :, :]) ** 2).sum(axis=2), axis=1)
+            for c in range(count):
+                if np.any(assignment == c):
+                    centers[c] = points[assignment == c].mean(axis=0)
+        # Renumber so that empty clusters leave no gaps
+        used, assignment = np.unique(assignment, return_inverse=True)
+        cells[members] = next_cell + assignment
+        next_cell += len(used)
+    return cells
+
+
+def default_partition_levels(G, cells_per_division=DEFAULT_CELLS_PER_DIVISION):
+    """
+    Partition levels for the overlay, finest first: k-means cells inside
+    each division, then the divisions (Garhwal / Kumaon) themselves
+    """
+    G = as_compiled(G)
+    divisions = G.division.astype(np.int64)
+    return [kmeans_partition(G, cells_per_division, within=divisions), divisions]
+
+
+class OverlayGraph:
+    """
+    Multi-level overlay for customizable route planning (CRP)
+
+    levels[0] is the finest partition and each further level must group
+    whole cells of the level below (e.g. districts, then divisions). A node
+    is a boundary node of level l when one of its roads crosses between
+    level-l cells. For every cell, customization computes a clique of
+    shortest distances between its boundary nodes that stay inside the cell:
+    level-0 cells on the road network, higher-level cells on the overlay of
+    the level below. Customization snapshots G.weight and queries only read
+    that snapshot, so cliques and roads always use the same weights. When the
+    graph version changes, the next query compares G.weight with the snapshot
+    and customizes again only the cells containing changed roads.
+
+    Queries search the original roads only inside the finest cells of the
+    source and target; elsewhere a node uses the cliques and cut roads of
+    the coarsest level whose cell contains neither endpoint.
+    """
+
+    def __init__(self, G, levels):
+        self.G = G
+        self.levels = [np.asarray(cells, dtype=np.int64) for cells in levels]
+        if not self.levels:
+            raise ValueError("The overlay needs at least one partition level")
+        for finer, coarser in zip(self.levels, self.levels[1:]):
+            parents = np.full(finer.max() + 1, -1, dtype=np.int64)
+            parents[finer] = coarser
+            if np.any(parents[finer] != coarser):
+                raise ValueError("Every cell must lie inside a single cell of the next level")
+
+        tails, heads = G.sources, G.targets
+        # cut[l]: edges crossing between level-l cells
+        self.cut = [cells[tails] != cells[heads] for cells in self.levels]
+        # boundary[l]: node -> whether it is a level-l boundary node
+        self.boundary = []
+        for cut in self.cut:
+            flags = np.zeros(G.num_nodes, dtype=bool)
+            flags[tails[cut]] = True
+            flags[heads[cut]] = True
+            self.boundary.append(flags)
+        # cut_arcs[l][u]: (head, edge id) of the level-l cut roads leaving u
+        self.cut_arcs = []
+        for cut in self.cut:
+            arcs = {}
+            for e in np.flatnonzero(cut).tolist():
+                arcs.setdefault(int(tails[e]), []).append((int(heads[e]), e))
+            self.cut_arcs.append(arcs)
+        # cell_nodes[l][c]: boundary node indices of cell c, sorted
+        self.cell_nodes = []
+        for cells, flags in zip(self.levels, self.boundary):
+            nodes = np.flatnonzero(flags)
+            self.cell_nodes.append({c: nodes[cells[nodes] == c] for c in np.unique(cells).tolist()})
+
+        # cliques[l][c]: distance matrix between the cell's boundary nodes
+        self.cliques = [{} for _ in self.levels]
+        # rows[l][v]: (boundary nodes, distances from v) for query relaxation
+        self.rows = [{} for _ in self.levels]
+        # Edge weights the cliques were customized from, and the graph version they match
+        self.weight = np.array(G.weight, dtype=np.float64)
+        self.version = G.version
+        self.customize_time = 0.0
+        self.customize()
+
+    @property
+    def num_levels(self):
+        return len(self.levels)
+
+    def stats(self):
+        """Cells, boundary nodes and clique arcs per level"""
+        return [{
+            'level': l,
+            'cells': len(self.cell_nodes[l]),
+            'boundary_nodes': int(self.boundary[l].sum()),
+            'clique_arcs': sum(len(nodes) ** 2 for nodes in self.cell_nodes[l].values())
+        } for l in range(self.num_levels)]
+
+    def dirty_cells(self, edge_ids):
+        """Cells per level whose cliques depend on the given edges"""
+        edge_ids = np.asarray(list(edge_ids), dtype=np.int64)
+        tails, heads = self.G.sources[edge_ids], self.G.targets[edge_ids]
+        dirty = []
+        for l, cells in enumerate(self.levels):
+            inside = cells[tails] == cells[heads]
+            dirty.append(set(cells[tails[inside]].tolist()))
+        return dirty
+
+    def customize(self, edge_ids=None):
+        """
+        Recompute cliques from the current G.weight
+
+        The weights of the given edges (all edges when None) are copied into
+        the overlay's weight snapshot first.
+
+        Args:
+            edge_ids: Edges whose weight changed; only cells containing them are
+                customized again (all cells when None)
+
+        Returns:
+            list: number of cells customized per level
+        """
+        start_time = time.time()
+        if edge_ids is None:
+            self.weight[:] = self.G.weight
+            dirty = [set(nodes) for nodes in self.cell_nodes]
+        else:
+            edge_ids = np.asarray(list(edge_ids), dtype=np.int64)
+            self.weight[edge_ids] = self.G.weight[edge_ids]
+            dirty = self.dirty_cells(edge_ids)
+        self.version = self.G.version
+
+        for l in range(self.num_levels):
+            for c in sorted(dirty[l]):
+                nodes = self.cell_nodes[l][c]
+                clique = np.vstack([self._cell_distances(l, c, u, nodes) for u in nodes.tolist()]) \
+                    if len(nodes) else np.empty((0, 0))
+                self.cliques[l][c] = clique
+                for u, row in zip(nodes.tolist(), clique):
+                    self.rows[l][u] = (nodes.tolist(), row.tolist())
+
+        self.customize_time = time.time() - start_time
+        return [len(cells) for cells in dirty]
+
+    def refresh(self):
+        """
+        Customize the cells whose roads changed weight since the last customization
+
+        Returns:
+            list: number of cells customized per level (empty if up to date)
+        """
+        if self.G.version == self.version:
+            return []
+        changed = np.flatnonzero(self.G.weight != self.weight)
+        if not len(changed):
+            self.version = self.G.version
+            return [0] * self.num_levels
+        return self.customize(changed)
+
+    def update(self, patch, roads=None):
+        """
+        Apply new traffic levels to G and customize only the affected cells
+
+        Args:
+            patch: dict mapping road ID (index into roads or (from, to) pair)
+                to traffic level, as for apply_traffic_patch
+            roads: The data["roads"] list, for index road IDs
+
+        Returns:
+            list: number of cells customized per level
+        """
+        edge_ids = apply_traffic_patch(self.G, patch, roads)
+        return self.customize(edge_ids)
+
+    def _arcs(self, l, u, cell):
+        """(neighbor, weight) arcs of u used when customizing a level-l cell"""
+        G = self.G
+        cells = self.levels[l]
+        if l == 0:
+            # Road network inside the cell
+            start, stop = G.offsets[u], G.offsets[u + 1]
+            return [(v, w) for v, w in zip(G.targets[start:stop].tolist(), self.weight[start:stop].tolist())
+                    if cells[v] == cell]
+        # Overlay of the level below: its clique row plus its cut roads, inside the cell
+        nodes, row = self.rows[l - 1].get(u, ((), ()))
+        arcs = list(zip(nodes, row))
+        for v, e in self.cut_arcs[l - 1].get(u, ()):
+            if cells[v] == cell:
+                arcs.append((v, float(self.weight[e])))
+        return arcs
+
+    def _cell_distances(self, l, cell, source, nodes):
+        """Distances from source to nodes, staying inside a level-l cell"""
+        distances = {source: 0.0}
+        queue = [(0.0, source)]
+        settled = set()
+        while queue:
+            distance, u = heapq.heappop(queue)
+            if u in settled:
+                continue
+            settled.add(u)
+            for v, weight in self._arcs(l, u, cell):
+                candidate = distance + weight
+                if candidate < distances.get(v, float('infinity')):
+                    distances[v] = candidate
+                    heapq.heappush(queue, (candidate, v))
+        return np.array([distances.get(v, np.inf) for v in nodes.tolist()])
+
+    def query_levels(self, s, t):
+        """Per node, the coarsest level whose cell of it contains neither s nor t (-1 if none)"""
+        levels = np.full(self.G.num_nodes, -1, dtype=np.int64)
+        for l, cells in enumerate(self.levels):
+            levels[(cells != cells[s]) & (cells != cells[t])] = l
+        return levels
+
+    def query(self, source, target, stats=None):
+        """
+        Shortest path between two string node IDs over the overlay
+
+        Cells whose roads changed weight since the last customization are
+        customized first (see refresh).
+
+        Returns:
+            distance: Total weight of the shortest path
+            path: List of nodes in path, with clique arcs unpacked to roads
+        """
+        G = self.G
+        s = G.index.get(source)
+        t = G.index.get(target)
+        if s is None or t is None:
+            return float('infinity'), []
+
+        self.refresh()
+        offsets, targets = G.offsets, G.targets
+        weights = self.weight.tolist()
+        query_levels = self.query_levels(s, t).tolist()
+        distances = {s: 0.0}
+        # Predecessor of each reached node as (previous node, clique level or -1 for a road)
+        predecessors = {s: (-1, -1)}
+        queue = [(0.0, s)]
+        settled = set()
+
+        while queue:
+            distance, u = heapq.heappop(queue)
+            if u == t:
+                break
+            if u in settled:
+                continue
+            settled.add(u)
+
+            l = query_levels[u]
+            if l == -1:
+                start, stop = offsets[u], offsets[u + 1]
+                arcs = [(v, weights[e], -1) for v, e in zip(targets[start:stop].tolist(), range(start, stop))]
+            else:
+                arcs = [(v, weights[e], -1) for v, e in self.cut_arcs[l].get(u, ())]
+                nodes, row = self.rows[l].get(u, ((), ()))
+                arcs.extend((v, w, l) for v, w in zip(nodes, row) if v != u)
+
+            for v, weight, level in arcs:
+                if v in settled:
+                    continue
+                candidate = distance + weight
+                if candidate < distances.get(v, float('infinity')):
+                    distances[v] = candidate
+                    predecessors[v] = (u, level)
+                    heapq.heappush(queue, (candidate, v))
+
+        if stats is not None:
+            stats['settled'] = len(settled)
+
+        if t not in distances:
+            return float('infinity'), []
+
+        hops = []
+        v = t
+        while v != s:
+            u, level = predecessors[v]
+            hops.append((u, v, level))
+            v = u
+        path = [s]
+        for u, v, level in reversed(hops):
+            path.extend(self._unpack(u, v, level))
+        return distances[t], [G.node_ids[i] for i in path]
+
+    def _unpack(self, u, v, level):
+        """Road nodes after u on a clique arc u -> v (just [v] for a road)"""
+        if level == -1:
+            return [v]
+        # Shortest u -> v roads inside their level cell; any such path has the clique's cost
+        G = self.G
+        cells = self.levels[level]
+        cell = cells[u]
+        distances = {u: 0.0}
+        predecessors = {u: -1}
+        queue = [(0.0, u)]
+        settled = set()
+        while queue:
+            distance, x = heapq.heappop(queue)
+            if x == v:
+                break
+            if x in settled:
+                continue
+            settled.add(x)
+            start, stop = G.offsets[x], G.offsets[x + 1]
+            for y, weight in zip(G.targets[start:stop].tolist(), self.weight[start:stop].tolist()):
+                if cells[y] != cell or y in settled:
+                    continue
+                candidate = distance + weight
+                if candidate < distances.get(y, float('infinity')):
+                    distances[y] = candidate
+                    predecessors[y] = x
+                    heapq.heappush(queue, (candidate, y))
+        path = []
+        x = v
+        while x != u:
+            path.append(x)
+            x = predecessors[x]
+        return path[::-1]
+
+
+def build_overlay_graph(G, levels=None):
+    """
+    Build and customize a multi-level overlay
+
+    Args:
+        G: NetworkX graph or CompiledGraph
+        levels: Partition levels, finest first, as node cell arrays (defaults
+            to default_partition_levels: k-means cells inside each division,
+            then the divisions). A district level would go between the two.
+
+    Returns:
+        OverlayGraph
+    """
+    G = as_compiled(G)
+    return OverlayGraph(G, default_partition_levels(G) if levels is None else levels)
+
+
+def overlay_algorithm(overlay, source, target):
+    """Shortest path query on a customized overlay, returning (distance, path)"""
+    return overlay.query(source, target)
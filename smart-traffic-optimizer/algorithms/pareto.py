@@ -0,0 +1,141 @@
+import heapq
+import numpy as np
+from algorithms.compiled_graph import as_compiled
+from algorithms.dijkstra import shortest_path_tree
+
+# Objectives of every route on the front, in label order
+OBJECTIVES = ['distance', 'traffic', 'climb']
+
+# Cap on non-dominated labels kept per node; bounds the search on large networks
+DEFAULT_MAX_LABELS = 24
+
+
+def edge_objectives(G):
+    """
+    Per-edge cost vectors: (distance km, traffic exposure, climb m)
+
+    Traffic exposure is traffic level times distance, so a congested long road
+    counts more than a congested short one; climb is the elevation gained
+    from tail to head (descents cost nothing).
+    """
+    def build():
+        climb = np.maximum(0.0, G.elevation[G.targets] - G.elevation[G.sources])
+        return np.column_stack([G.distance, G.traffic * G.distance, climb]).astype(np.float64)
+    return G.derived('pareto_objectives', build)
+
+
+def _dominates(a, b, epsilon):
+    """Whether cost vector a (epsilon-)dominates b"""
+    scale = 1.0 + epsilon
+    return a[0] <= b[0] * scale and a[1] <= b[1] * scale and a[2] <= b[2] * scale
+
+
+def pareto_routes(G, source, target, max_labels=DEFAULT_MAX_LABELS, epsilon=0.0, stats=None):
+    """
+    Pareto-optimal routes over total distance, traffic exposure and climb
+
+    Multi-objective label-setting search (Martins): labels are settled in
+    lexicographic order and every node keeps only mutually non-dominated
+    labels. Labels are also pruned when, even with per-objective lower
+    bounds for the rest of the way (one reverse Dijkstra per objective),
+    they could not beat a route already found to the target.
+
+    With max_labels and epsilon > 0 the front is approximate but the work
+    stays bounded: a node accepts at most max_labels labels, and a label
+    within a factor (1 + epsilon) of an existing one in every objective
+    counts as dominated.
+
+    Args:
+        G: NetworkX graph or CompiledGraph
+        source: Starting node
+        target: Target node
+        max_labels: Maximum number of labels per node
+        epsilon: Relative tolerance of the dominance test
+        stats: Optional dict that receives label counts
+
+    Returns:
+        list of dicts with 'path', 'distance', 'traffic' and 'climb', sorted by distance
+    """
+    G = as_compiled(G)
+    if source not in G or target not in G:
+        return []
+    s, t = G.index[source], G.index[target]
+
+    costs = edge_objectives(G)
+    lower_bounds = np.column_stack([
+        shortest_path_tree(G, t, weights=costs[:, k], reverse=True)[0] for k in range(len(OBJECTIVES))
+    ])
+    if not np.isfinite(lower_bounds[s, 0]):
+        return []
+    lower_bounds = lower_bounds.tolist()
+    edge_costs = costs.tolist()
+    offsets, targets = G.offsets, G.targets
+
+    # Label i: cost vector, node and parent label
+    label_costs = [(0.0, 0.0, 0.0)]
+    label_nodes = [s]
+    label_parents = [-1]
+    dead = [False]
+    node_labels = {s: [0]}
+    frontier = [((0.0, 0.0, 0.0), 0)]
+    results = []
+    settled = 0
+
+    while frontier:
+        cost, label = heapq.heappop(frontier)
+        if dead[label]:
+            continue
+        settled += 1
+        node = label_nodes[label]
+        if node == t:
+            results.append(label)
+            continue
+
+        start, stop = offsets[node], offsets[node + 1]
+        for next_node, edge in zip(targets[start:stop].tolist(), range(start, stop)):
+            step = edge_costs[edge]
+            new_cost = (cost[0] + step[0], cost[1] + step[1], cost[2] + step[2])
+
+            # Prune against routes already found to the target
+            bound = lower_bounds[next_node]
+            optimistic = (new_cost[0] + bound[0], new_cost[1] + bound[1], new_cost[2] + bound[2])
+            if any(_dominates(label_costs[found], optimistic, epsilon) for found in results):
+                continue
+
+            existing = node_labels.setdefault(next_node, [])
+            if any(_dominates(label_costs[other], new_cost, epsilon) for other in existing):
+                continue
+            survivors = []
+            for other in existing:
+                if _dominates(new_cost, label_costs[other], 0.0):
+                    dead[other] = True
+                else:
+                    survivors.append(other)
+            if len(survivors) >= max_labels:
+                continue
+
+            new_label = len(label_costs)
+            label_costs.append(new_cost)
+            label_nodes.append(next_node)
+            label_parents.append(label)
+            dead.append(False)
+            survivors.append(new_label)
+            node_labels[next_node] = survivors
+            heapq.heappush(frontier, (new_cost, new_label))
+
+    if stats is not None:
+        stats['labels'] = len(label_costs)
+        stats['settled'] = settled
+
+    routes = []
+    for label in results:
+        path = []
+        current = label
+        while current != -1:
+            path.append(G.node_ids[label_nodes[current]])
+            current = label_parents[current]
+        distance, traffic, climb = label_costs[label]
+        routes.append({'path': path[::-1], 'distance': distance, 'traffic': traffic, 'climb': climb})
+
+    routes.sort(key=lambda route: route['distance'])
+    return routes
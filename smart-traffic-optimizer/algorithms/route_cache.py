@@ -0,0 +1,182 @@
+import functools
+import inspect
+import itertools
+import sys
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from algorithms.compiled_graph import CompiledGraph
+
+# Default memory budget for cached routes
+DEFAULT_MAX_BYTES = 8 * 1024 * 1024
+
+
+# Source of per-graph tokens for NetworkX graphs
+_graph_tokens = itertools.count()
+
+
+def graph_cache_token(G):
+    """
+    Identify the graph and the data a route was computed on
+
+    Returns (graph_id, version). For a CompiledGraph the graph_id is its
+    topology signature, which stays stable across Streamlit reruns, and the
+    version is a digest of the weights and every edge and node attribute
+    route costs are derived from (A* reads traffic, road condition, lanes
+    and elevation even when the weights are distance-only). Sessions whose
+    graphs carry equal data therefore share routes whatever their version
+    counters.
+
+    A NetworkX graph gets a token stored in G.graph, so a graph created
+    after another was garbage collected never inherits its routes, and
+    G.graph['version'] as the version.
+    """
+    if isinstance(G, CompiledGraph):
+        return G.topology_signature(), G.attributes_digest()
+    token = G.graph.get('route_cache_token')
+    # A copy of a graph shares its G.graph entries but is a different graph
+    if token is None or token[0] != id(G):
+        token = G.graph['route_cache_token'] = (id(G), next(_graph_tokens))
+    return token, G.graph.get('version', 0)
+
+
+def _consider_traffic(G):
+    if isinstance(G, CompiledGraph):
+        return G.consider_traffic
+    return G.graph.get('consider_traffic', True)
+
+
+def _estimate_size(key, result):
+    cost, path = result
+    size = sys.getsizeof(key) + sys.getsizeof(cost) + sys.getsizeof(path)
+    size += sum(sys.getsizeof(part) for part in key)
+    size += sum(sys.getsizeof(node) for node in path)
+    return size
+
+
+class RouteCache:
+    """
+    LRU cache of (cost, path) routing results under a memory budget
+
+    Keys are (graph_id, source, target, algorithm, consider_traffic, month,
+    extra arguments, version). A route is only served for the exact graph
+    data it was computed on; routes for data no longer in use simply age out
+    of the LRU. The cache may be shared across threads (e.g. Streamlit
+    sessions), so all access holds a lock.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Return the cached result for key (refreshing its LRU position) or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        cost, path = entry[0]
+        return cost, list(path)
+
+    def put(self, key, result):
+        """Store a result, evicting least recently used entries to stay within budget"""
+        cost, path = result
+        result = (cost, tuple(path))
+        size = _estimate_size(key, result)
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self.current_bytes -= self._entries.pop(key)[1]
+            self._entries[key] = (result, size)
+            self.current_bytes += size
+
+            while self.current_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        """Hit/miss counters and memory use"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions
+            }
+
+    def wrap(self, func, algorithm=None):
+        """
+        Wrap a routing function f(G, source, target, ...) -> (cost, path)
+
+        The wrapper keeps the signature of func. Results are cached per source,
+        target, algorithm, traffic setting, month (for functions taking
+        current_month), further arguments and graph data version. Calls with
+        an unhashable argument, such as a stats dict the function fills in,
+        bypass the cache, since a cached result would leave it empty.
+        """
+        algorithm = algorithm or func.__name__
+        signature = inspect.signature(func)
+        takes_month = 'current_month' in signature.parameters
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = bound.arguments
+            G = next(iter(arguments.values()))
+            source, target = list(arguments.values())[1:3]
+
+            # Arguments beyond the ones in the key (e.g. tuning knobs) still
+            # distinguish results
+            extra = tuple((name, value) for name, value in list(arguments.items())[3:]
+                          if name != 'current_month')
+            if not _hashable(extra):
+                return func(*args, **kwargs)
+
+            month = None
+            if takes_month:
+                month = arguments['current_month'] or datetime.now().month
+
+            graph_id, version = graph_cache_token(G)
+            key = (graph_id, source, target, algorithm, _consider_traffic(G), month, extra, version)
+
+            result = self.get(key)
+            if result is None:
+                result = func(*args, **kwargs)
+                self.put(key, result)
+            return result
+
+        wrapper.cache = self
+        return wrapper
+
+
+def _hashable(value):
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
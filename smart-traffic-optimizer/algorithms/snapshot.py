@@ -0,0 +1,224 @@
+"""
+Binary road network snapshots, loaded by memory-mapping
+
+Layout (little endian):
+    magic        8 bytes  b'STOGRAPH'
+    version      uint32   SNAPSHOT_FORMAT_VERSION
+    header size  uint32   length of the JSON header in bytes
+    header       JSON     graph metadata and the offset, dtype and shape of every array
+    arrays       raw array data, each starting on a 64-byte boundary
+
+String lists (node IDs, names, road names) are stored as a table: one
+UTF-8 blob plus int64 offsets, so they map like any other array. Node and
+road names stay mapped and are decoded one at a time when read.
+
+Convert the JSON data once (from the project directory):
+    python -m algorithms.snapshot data/uttarakhand_realistic_data.json data/cache/uttarakhand.graph
+"""
+import argparse
+import json
+import os
+import struct
+import numpy as np
+from algorithms.compiled_graph import CompiledGraph, as_compiled, compiled_graph_from_data
+
+DEFAULT_DATA_PATH = 'data/uttarakhand_realistic_data.json'
+DEFAULT_SNAPSHOT_PATH = 'data/cache/uttarakhand.graph'
+
+SNAPSHOT_MAGIC = b'STOGRAPH'
+
+# Bumped whenever the layout written by save_snapshot changes
+SNAPSHOT_FORMAT_VERSION = 1
+
+# Array data starts on multiples of this many bytes
+ALIGNMENT = 64
+
+_PREAMBLE = struct.Struct('<8sII')
+
+NODE_ARRAYS = ['offsets', 'elevation', 'pos', 'node_type', 'division']
+EDGE_ARRAYS = ['targets', 'weight', 'distance', 'traffic', 'lanes', 'road_type', 'condition']
+STRING_TABLES = ['node_ids', 'node_names', 'edge_names']
+
+
+def _aligned(offset):
+    return (offset + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+class StringTable:
+    """
+    Read-only sequence of strings stored as int64 offsets into a UTF-8 blob
+
+    Strings are decoded on access, so a table over a memory map costs no
+    private memory until it is read.
+    """
+
+    def __init__(self, offsets, data):
+        self.offsets = offsets
+        self.data = data
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("string table index out of range")
+        start, stop = int(self.offsets[i]), int(self.offsets[i + 1])
+        return self.data[start:stop].tobytes().decode('utf-8')
+
+    def __iter__(self):
+        return iter(_read_strings(self.offsets, self.data))
+
+
+def _string_table(strings):
+    """(offsets, utf-8 blob) for a list of strings"""
+    if isinstance(strings, StringTable):
+        return np.asarray(strings.offsets), np.asarray(strings.data)
+    encoded = [str(s).encode('utf-8') for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(s) for s in encoded], out=offsets[1:])
+    return offsets, np.frombuffer(b''.join(encoded), dtype=np.uint8)
+
+
+def _read_strings(offsets, blob):
+    text = blob.tobytes()
+    bounds = offsets.tolist()
+    return [text[start:stop].decode('utf-8') for start, stop in zip(bounds, bounds[1:])]
+
+
+def save_snapshot(G, path):
+    """
+    Write a graph to a snapshot file, creating its directory if needed
+
+    Args:
+        G: NetworkX graph or CompiledGraph
+        path: Output file
+    """
+    G = as_compiled(G)
+    arrays = {name: np.ascontiguousarray(getattr(G, name)) for name in NODE_ARRAYS + EDGE_ARRAYS}
+    for name in STRING_TABLES:
+        strings = getattr(G, name)
+        if strings is None:
+            continue
+        arrays[f'{name}.offsets'], arrays[f'{name}.data'] = _string_table(strings)
+
+    # Lay out the arrays after the header; the header size depends on the
+    # offsets it lists, so offsets are computed relative to the data start
+    layout = {}
+    position = 0
+    for name, array in arrays.items():
+        position = _aligned(position)
+        layout[name] = {'offset': position, 'dtype': array.dtype.str, 'shape': list(array.shape)}
+        position += array.nbytes
+
+    header = {
+        'num_nodes': G.num_nodes,
+        'num_edges': G.num_edges,
+        'consider_traffic': bool(G.consider_traffic),
+        'labels': G.labels,
+        'arrays': layout
+    }
+    header_bytes = json.dumps(header).encode('utf-8')
+    data_start = _aligned(_PREAMBLE.size + len(header_bytes))
+
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(path, 'wb') as f:
+        f.write(_PREAMBLE.pack(SNAPSHOT_MAGIC, SNAPSHOT_FORMAT_VERSION, len(header_bytes)))
+        f.write(header_bytes)
+        for name, array in arrays.items():
+            f.write(b'\0' * (data_start + layout[name]['offset'] - f.tell()))
+            f.write(array.tobytes())
+
+
+def read_header(path):
+    """
+    Header of a snapshot file, with 'data_start' added
+
+    Raises:
+        ValueError: If the file is not a snapshot or has an unsupported version
+    """
+    with open(path, 'rb') as f:
+        preamble = f.read(_PREAMBLE.size)
+        if len(preamble) < _PREAMBLE.size:
+            raise ValueError(f"{path} is too short to be a graph snapshot")
+        magic, version, header_size = _PREAMBLE.unpack(preamble)
+        if magic != SNAPSHOT_MAGIC:
+            raise ValueError(f"{path} is not a graph snapshot")
+        if version != SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(f"Unsupported graph snapshot format {version} in {path}")
+        header = json.loads(f.read(header_size).decode('utf-8'))
+    header['data_start'] = _aligned(_PREAMBLE.size + header_size)
+    return header
+
+
+def load_snapshot(path, mmap_mode='c'):
+    """
+    Load a snapshot as a CompiledGraph whose arrays are views of a memory map
+
+    Processes mapping the same file share its pages through the OS page
+    cache. With the default copy-on-write mode ('c') in-place weight updates
+    stay private to the process and never reach the file; 'r' maps read-only.
+    Node IDs are decoded up front (queries need the ID index); node and road
+    names are StringTables, decoded only when read.
+
+    Args:
+        path: Snapshot file
+        mmap_mode: numpy memmap mode ('c' or 'r')
+
+    Returns:
+        CompiledGraph
+    """
+    header = read_header(path)
+    data = np.memmap(path, dtype=np.uint8, mode=mmap_mode)
+    start = header['data_start']
+
+    arrays = {}
+    for name, entry in header['arrays'].items():
+        dtype = np.dtype(entry['dtype'])
+        count = int(np.prod(entry['shape'], dtype=np.int64))
+        offset = start + entry['offset']
+        if offset + count * dtype.itemsize > len(data):
+            raise ValueError(f"Graph snapshot {path} is truncated")
+        arrays[name] = data[offset:offset + count * dtype.itemsize].view(dtype).reshape(entry['shape'])
+
+    strings = {name: StringTable(arrays[f'{name}.offsets'], arrays[f'{name}.data'])
+               if f'{name}.offsets' in arrays else None for name in STRING_TABLES}
+    strings['node_ids'] = list(strings['node_ids'])
+
+    return CompiledGraph(
+        strings['node_ids'], arrays['offsets'], arrays['targets'],
+        weight=arrays['weight'], distance=arrays['distance'], traffic=arrays['traffic'],
+        lanes=arrays['lanes'], road_type=arrays['road_type'], condition=arrays['condition'],
+        elevation=arrays['elevation'], pos=arrays['pos'], node_type=arrays['node_type'],
+        division=arrays['division'], node_names=strings['node_names'], edge_names=strings['edge_names'],
+        labels=header['labels'], consider_traffic=header['consider_traffic']
+    )
+
+
+def convert(data_path, snapshot_path, consider_traffic=True):
+    """Convert a road network JSON file into a snapshot"""
+    with open(data_path, 'r') as f:
+        data = json.load(f)
+    G = compiled_graph_from_data(data, consider_traffic)
+    save_snapshot(G, snapshot_path)
+    return G
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Convert road network JSON into a binary graph snapshot")
+    parser.add_argument('data', nargs='?', default=DEFAULT_DATA_PATH, help="Road network JSON file")
+    parser.add_argument('output', nargs='?', default=DEFAULT_SNAPSHOT_PATH, help="Snapshot file to write")
+    parser.add_argument('--no-traffic', action='store_true', help="Store distance-only weights")
+    args = parser.parse_args(argv)
+
+    G = convert(args.data, args.output, consider_traffic=not args.no_traffic)
+    print(f"Wrote {G.num_nodes} nodes and {G.num_edges} edges to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,372 @@
+"""
+Streaming import of large road network files into a CompiledGraph
+
+Two input layouts are accepted:
+    .json   The usual {"intersections": {id: {...}}, "roads": [{...}]} layout,
+            parsed one record at a time
+    .jsonl  One record per line: intersections carry an "id" key, roads a
+            "from" key (e.g. {"id": "DEH", "pos": [30.3, 78.0], "name": "Dehradun"})
+
+Only one record is held as Python objects at a time; attributes go straight
+into growing NumPy columns. Records that do not match the schema expected
+by create_graph_from_data are skipped and reported with their line number.
+Broken JSON syntax is also a per-line reject in .jsonl files, but ends the
+import with ValueError in .json files, where parsing cannot resume.
+
+Command line (from the project directory):
+    python -m algorithms.streaming_import roads.jsonl --snapshot data/cache/roads.graph
+"""
+import argparse
+import json
+import sys
+import numpy as np
+from algorithms.compiled_graph import (CompiledGraph, ROAD_TYPES, ROAD_CONDITIONS, NODE_TYPES, DIVISIONS,
+                                       _encode, build_csr, traffic_weight)
+from algorithms.snapshot import save_snapshot
+
+# Characters read from the file at a time
+CHUNK_SIZE = 1 << 16
+
+# A single record larger than this is treated as malformed input
+MAX_RECORD_CHARS = 1 << 20
+
+_WHITESPACE = ' \t\n\r'
+
+
+class _JsonStream:
+    """Incremental reader of JSON values from a text file, tracking line numbers"""
+
+    def __init__(self, f):
+        self.file = f
+        self.buffer = ''
+        self.pos = 0
+        self.eof = False
+        self.decoder = json.JSONDecoder()
+        # Line number of buffer position line_pos
+        self.line = 1
+        self.line_pos = 0
+
+    def _fill(self):
+        """Read another chunk, dropping the consumed part of the buffer"""
+        self.line_number()
+        self.buffer = self.buffer[self.pos:]
+        self.line_pos -= self.pos
+        self.pos = 0
+        chunk = self.file.read(CHUNK_SIZE)
+        if not chunk:
+            self.eof = True
+        self.buffer += chunk
+
+    def line_number(self):
+        """Line of the current position"""
+        self.line += self.buffer.count('\n', self.line_pos, self.pos)
+        self.line_pos = self.pos
+        return self.line
+
+    def peek(self):
+        """Next non-whitespace character ('' at the end of the file)"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer) or self.eof:
+                return self.buffer[self.pos:self.pos + 1]
+            self._fill()
+
+    def expect(self, chars):
+        """Consume the next character, which must be one of chars"""
+        char = self.peek()
+        if not char or char not in chars:
+            raise ValueError(f"line {self.line_number()}: expected {' or '.join(repr(c) for c in chars)}, "
+                             f"found {char or 'end of file'!r}")
+        self.pos += 1
+        return char
+
+    def value(self):
+        """Decode the next JSON value"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as error:
+                # The value may just be cut off at the end of the buffer
+                if self.eof or len(self.buffer) - self.pos > MAX_RECORD_CHARS:
+                    raise ValueError(f"line {self.line_number()}: {error.msg}") from None
+                self._fill()
+                continue
+            # A number may also continue in the next chunk
+            if end == len(self.buffer) and not self.eof:
+                self._fill()
+                continue
+            self.pos = end
+            return value
+
+    def members(self, open_char, close_char, keyed):
+        """Yield (line, key, value) for the items of an object or array, one at a time"""
+        self.expect(open_char)
+        if self.peek() == close_char:
+            self.pos += 1
+            return
+        while True:
+            self.peek()
+            line = self.line_number()
+            key = None
+            if keyed:
+                key = self.value()
+                self.expect(':')
+            yield line, key, self.value()
+            if self.expect(',' + close_char) == close_char:
+                return
+
+
+def iter_json_records(f):
+    """
+    Yield (line, kind, record) from the standard JSON layout
+
+    kind is 'intersection' (the record gets its key as 'id') or 'road'.
+    """
+    stream = _JsonStream(f)
+    stream.expect('{')
+    if stream.peek() == '}':
+        return
+    while True:
+        key = stream.value()
+        stream.expect(':')
+        if key == 'intersections':
+            for line, node_id, record in stream.members('{', '}', keyed=True):
+                yield line, 'intersection', dict(record, id=node_id) if isinstance(record, dict) else record
+        elif key == 'roads':
+            for line, _, record in stream.members('[', ']', keyed=False):
+                yield line, 'road', record
+        else:
+            stream.value()
+        if stream.expect(',}') == '}':
+            return
+
+
+def iter_jsonl_records(f):
+    """Yield (line, kind, record) from a JSON Lines file (records that fail to parse have kind None)"""
+    for line_number, line in enumerate(f, 1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as error:
+            yield line_number, None, error.msg
+            continue
+        kind = 'road' if isinstance(record, dict) and 'from' in record else 'intersection'
+        yield line_number, kind, record
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def validate_intersection(record):
+    """Schema problems of an intersection record, as a list of messages"""
+    if not isinstance(record, dict):
+        return ["intersection is not an object"]
+    errors = []
+    if not isinstance(record.get('id'), str) or not record.get('id'):
+        errors.append("'id' must be a non-empty string")
+    pos = record.get('pos')
+    if not (isinstance(pos, list) and len(pos) == 2 and all(_is_number(p) for p in pos)):
+        errors.append("'pos' must be [lat, lon]")
+    if not isinstance(record.get('name'), str):
+        errors.append("'name' must be a string")
+    if 'elevation' in record and not _is_number(record['elevation']):
+        errors.append("'elevation' must be a number")
+    for key in ('type', 'division'):
+        if key in record and not isinstance(record[key], str):
+            errors.append(f"'{key}' must be a string")
+    return errors
+
+
+def validate_road(record):
+    """Schema problems of a road record, as a list of messages"""
+    if not isinstance(record, dict):
+        return ["road is not an object"]
+    errors = []
+    for key in ('from', 'to'):
+        if not isinstance(record.get(key), str) or not record.get(key):
+            errors.append(f"'{key}' must be a non-empty string")
+    if not _is_number(record.get('distance')) or record.get('distance') < 0:
+        errors.append("'distance' must be a non-negative number")
+    if not _is_number(record.get('traffic')) or not 0 <= record.get('traffic') <= 1:
+        errors.append("'traffic' must be a number between 0 and 1")
+    if not isinstance(record.get('name'), str):
+        errors.append("'name' must be a string")
+    if 'lanes' in record and not _is_number(record['lanes']):
+        errors.append("'lanes' must be a number")
+    for key in ('type', 'condition'):
+        if key in record and not isinstance(record[key], str):
+            errors.append(f"'{key}' must be a string")
+    return errors
+
+
+class _Column:
+    """Append-only NumPy column that doubles its capacity when full"""
+
+    def __init__(self, dtype, width=None, fill=0):
+        self.shape = () if width is None else (width,)
+        self.fill = fill
+        self.data = np.full((1024,) + self.shape, fill, dtype=dtype)
+        self.size = 0
+
+    def reserve(self, size):
+        if size > len(self.data):
+            grown = np.full((max(size, 2 * len(self.data)),) + self.shape, self.fill, dtype=self.data.dtype)
+            grown[:len(self.data)] = self.data
+            self.data = grown
+
+    def append(self, value):
+        self.reserve(self.size + 1)
+        self.data[self.size] = value
+        self.size += 1
+
+    def array(self, size=None):
+        return self.data[:self.size if size is None else size].copy()
+
+
+def import_network(path, consider_traffic=True, max_rejects=None):
+    """
+    Stream a road network file into a CompiledGraph
+
+    Nodes are numbered in order of first appearance, as an intersection or as
+    a road endpoint; roads may refer to intersections listed later (or not at
+    all, in which case the node keeps default attributes, as
+    create_graph_from_data would give it). Every road becomes an edge in
+    each direction, and a repeated road replaces the earlier one.
+
+    Args:
+        path: .json (standard layout) or .jsonl file
+        consider_traffic: Include the traffic penalty in the edge weights
+        max_rejects: Stop with ValueError after this many rejected records
+
+    Returns:
+        G: CompiledGraph
+        rejects: list of dicts with 'line', 'kind' and 'error' per skipped record
+    """
+    labels = {
+        'road_type': list(ROAD_TYPES),
+        'condition': list(ROAD_CONDITIONS),
+        'node_type': list(NODE_TYPES),
+        'division': list(DIVISIONS)
+    }
+
+    index = {}
+    node_ids = []
+    node_names = []
+    defined = set()
+    pos = _Column(np.float64, width=2)
+    elevation = _Column(np.float64, fill=1000.0)
+    node_type = _Column(np.int8, fill=labels['node_type'].index('city'))
+    division = _Column(np.int8)
+
+    tails = _Column(np.int64)
+    heads = _Column(np.int64)
+    distance = _Column(np.float64)
+    traffic = _Column(np.float64)
+    lanes = _Column(np.float64)
+    road_type = _Column(np.int8)
+    condition = _Column(np.int8)
+    road_names = []
+
+    def node(node_id):
+        i = index.get(node_id)
+        if i is None:
+            i = index[node_id] = len(node_ids)
+            node_ids.append(node_id)
+            node_names.append(node_id)
+            for column in (pos, elevation, node_type, division):
+                column.reserve(i + 1)
+                column.size = i + 1
+        return i
+
+    rejects = []
+
+    def reject(line, kind, error):
+        rejects.append({'line': line, 'kind': kind, 'error': error})
+        if max_rejects is not None and len(rejects) > max_rejects:
+            raise ValueError(f"More than {max_rejects} rejected records; last at line {line}: {error}")
+
+    with open(path, 'r', encoding='utf-8') as f:
+        records = iter_jsonl_records(f) if path.endswith(('.jsonl', '.ndjson')) else iter_json_records(f)
+        for line, kind, record in records:
+            if kind is None:
+                reject(line, None, record)
+                continue
+            errors = validate_intersection(record) if kind == 'intersection' else validate_road(record)
+            if errors:
+                reject(line, kind, '; '.join(errors))
+                continue
+
+            if kind == 'intersection':
+                if record['id'] in defined:
+                    reject(line, kind, f"duplicate intersection '{record['id']}'")
+                    continue
+                defined.add(record['id'])
+                i = node(record['id'])
+                pos.data[i] = record['pos']
+                elevation.data[i] = record.get('elevation', 1000)
+                node_type.data[i] = _encode(record.get('type', 'city'), labels['node_type'])
+                division.data[i] = _encode(record.get('division', 'Garhwal'), labels['division'])
+                node_names[i] = record['name']
+            else:
+                tails.append(node(record['from']))
+                heads.append(node(record['to']))
+                distance.append(record['distance'])
+                traffic.append(record['traffic'])
+                lanes.append(record.get('lanes', 2))
+                road_type.append(_encode(record.get('type', 'highway'), labels['road_type']))
+                condition.append(_encode(record.get('condition', 'good'), labels['condition']))
+                road_names.append(record['name'])
+
+    n = len(node_ids)
+    road_tails, road_heads = tails.array(), heads.array()
+
+    # Every road becomes two directed edges: forward then reverse
+    edge_tails = np.empty(2 * len(road_tails), dtype=np.int64)
+    edge_heads = np.empty(2 * len(road_tails), dtype=np.int64)
+    edge_tails[0::2] = edge_heads[1::2] = road_tails
+    edge_heads[0::2] = edge_tails[1::2] = road_heads
+    offsets, order = build_csr(n, edge_tails, edge_heads)
+    road_of_edge = order // 2
+
+    road_distance = distance.array()
+    road_traffic = traffic.array()
+    weight = traffic_weight(road_distance, road_traffic) if consider_traffic else road_distance.copy()
+
+    G = CompiledGraph(
+        node_ids, offsets, edge_heads[order].astype(np.int32),
+        weight=weight[road_of_edge], distance=road_distance[road_of_edge], traffic=road_traffic[road_of_edge],
+        lanes=lanes.array()[road_of_edge], road_type=road_type.array()[road_of_edge],
+        condition=condition.array()[road_of_edge],
+        elevation=elevation.array(n), pos=pos.array(n), node_type=node_type.array(n), division=division.array(n),
+        node_names=node_names, edge_names=[road_names[r] for r in road_of_edge.tolist()], labels=labels,
+        consider_traffic=consider_traffic
+    )
+    return G, rejects
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream a large road network file into a graph snapshot")
+    parser.add_argument('input', help="Road network .json or .jsonl file")
+    parser.add_argument('--snapshot', help="Write the imported graph to this snapshot file")
+    parser.add_argument('--no-traffic', action='store_true', help="Route on distance only")
+    parser.add_argument('--max-rejects', type=int, default=None, help="Abort after this many rejected records")
+    args = parser.parse_args(argv)
+
+    G, rejects = import_network(args.input, consider_traffic=not args.no_traffic, max_rejects=args.max_rejects)
+    for reject in rejects:
+        print(f"{args.input}:{reject['line']}: rejected {reject['kind'] or 'record'}: {reject['error']}",
+              file=sys.stderr)
+    print(f"Imported {G.num_nodes} nodes and {G.num_edges} edges ({len(rejects)} records rejected)")
+
+    if args.snapshot:
+        save_snapshot(G, args.snapshot)
+        print(f"Wrote {args.snapshot}")
+
+
+if __name__ == "__main__":
+    main()
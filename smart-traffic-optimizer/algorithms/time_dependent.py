@@ -0,0 +1,256 @@
+import heapq
+import numpy as np
+from datetime import datetime, timedelta
+from algorithms.compiled_graph import as_compiled
+from algorithms.alt import select_landmarks
+from algorithms.traffic_prediction import get_base_traffic_pattern
+
+# Speed model shared with the app's route summary: 60 km/h without traffic,
+# 70% slower at full traffic
+FREE_FLOW_SPEED = 60.0
+TRAFFIC_SLOWDOWN = 0.7
+
+# Landmarks for the free-flow A* heuristic
+TD_NUM_LANDMARKS = 8
+
+
+def _month_matches(data, month):
+    months = data.get('months', [data.get('month')])
+    return month in months
+
+
+class TravelTimeProfile:
+    """
+    Departure-time dependent travel times (in minutes) for every edge
+
+    Times are minutes since midnight of the departure day. At each whole hour
+    k the traffic on an edge is its road's traffic level scaled by the hourly,
+    seasonal and special-event factors of get_base_traffic_pattern for that
+    hour (events only on roads touching the places they name), capped at 1.0.
+    Between hours the travel time is interpolated linearly, so every edge
+    cost is a piecewise-linear function of the time the edge is entered.
+
+    Hourly samples are computed the first time a search reaches that hour and
+    are adjusted so that entering an edge later never gets you out earlier
+    (the FIFO property), which keeps time-dependent Dijkstra exact.
+    """
+
+    def __init__(self, G, departure_day):
+        self.G = G
+        self.day = datetime(departure_day.year, departure_day.month, departure_day.day)
+        self.hourly_patterns, self.seasonal_patterns, self.special_events = get_base_traffic_pattern()
+
+        names = G.node_names or [str(node_id) for node_id in G.node_ids]
+        sources = G.sources
+        self._event_edges = {}
+        for event, data in self.special_events.items():
+            touched = np.array([any(place in name for place in data['affected_routes']) for name in names], dtype=bool)
+            self._event_edges[event] = touched[sources] | touched[G.targets]
+
+        self._event_factors = {}
+        self._raw = {}
+        self._samples = {}
+
+    def time_at(self, minutes):
+        """Datetime for a time in minutes since midnight of the departure day"""
+        return self.day + timedelta(minutes=minutes)
+
+    def traffic_factor(self, hour):
+        """Hourly times seasonal factor for hour number hour after midnight"""
+        when = self.day + timedelta(hours=hour)
+        pattern_key = 'weekend' if when.weekday() >= 5 else 'weekday'
+
+        factor = 1.0
+        for period, data in self.hourly_patterns[pattern_key].items():
+            if when.hour in data['hours']:
+                factor *= data['factor']
+                break
+
+        for season, data in self.seasonal_patterns.items():
+            if _month_matches(data, when.month):
+                factor *= data['factor']
+
+        return factor
+
+    def event_factors(self, month):
+        """Per-edge product of the special-event factors active in a month"""
+        if month not in self._event_factors:
+            factors = np.ones(self.G.num_edges)
+            for event, data in self.special_events.items():
+                if _month_matches(data, month):
+                    factors[self._event_edges[event]] *= data['factor']
+            self._event_factors[month] = factors
+        return self._event_factors[month]
+
+    def traffic(self, hour):
+        """Traffic level of every edge during hour number hour"""
+        month = (self.day + timedelta(hours=hour)).month
+        return np.minimum(1.0, self.G.traffic * self.traffic_factor(hour) * self.event_factors(month))
+
+    def _raw_travel_times(self, hour):
+        if hour not in self._raw:
+            speed = FREE_FLOW_SPEED * (1 - TRAFFIC_SLOWDOWN * self.traffic(hour))
+            self._raw[hour] = self.G.distance / speed * 60.0
+        return self._raw[hour]
+
+    def samples(self, hour):
+        """
+        FIFO-adjusted travel times of every edge entered exactly at hour number hour
+
+        Waiting j hours and leaving then takes 60 * j + (travel time then), so
+        the sample is the minimum over j. Only j with 60 * j below the largest
+        raw travel time can win.
+        """
+        if hour not in self._samples:
+            raw = self._raw_travel_times(hour)
+            sample = raw
+            j = 1
+            while 60.0 * j < raw.max():
+                sample = np.minimum(sample, 60.0 * j + self._raw_travel_times(hour + j))
+                j += 1
+            self._samples[hour] = sample
+        return self._samples[hour]
+
+    def travel_times(self, minutes, start=0, stop=None):
+        """Travel times of edges start..stop-1 when entered at the given time"""
+        hour = int(minutes // 60)
+        fraction = (minutes - 60.0 * hour) / 60.0
+        before = self.samples(hour)[start:stop]
+        after = self.samples(hour + 1)[start:stop]
+        return before + (after - before) * fraction
+
+
+def travel_time_profile(G, departure_time):
+    """The TravelTimeProfile of G for the day of departure_time (cached on the graph)"""
+    day = departure_time.date()
+    return G.derived(('travel_time_profile', day), lambda: TravelTimeProfile(G, departure_time))
+
+
+def free_flow_landmarks(G):
+    """ALT landmarks on free-flow (no traffic) travel times, a lower bound at any time of day"""
+    free_flow = G.distance / FREE_FLOW_SPEED * 60.0
+    return G.derived('free_flow_landmarks', lambda: select_landmarks(G, free_flow, TD_NUM_LANDMARKS))
+
+
+def time_dependent_search(G, s, t, departure, profile, heuristic=None, stats=None):
+    """
+    Time-dependent Dijkstra (or A* with a heuristic array) over node indices
+
+    Labels are arrival times in minutes since midnight of the profile's day;
+    each edge is costed at the time the search reaches its tail.
+
+    Returns:
+        tuple: (arrival times dict, predecessors dict)
+    """
+    offsets, targets = G.offsets, G.targets
+    heuristic = heuristic.tolist() if heuristic is not None else None
+
+    arrival = {s: departure}
+    predecessors = {s: -1}
+    frontier = [(departure + (heuristic[s] if heuristic else 0.0), s)]
+    closed = set()
+
+    while frontier:
+        _, current = heapq.heappop(frontier)
+        if current in closed:
+            continue
+        if current == t:
+            break
+        closed.add(current)
+
+        time = arrival[current]
+        start, stop = offsets[current], offsets[current + 1]
+        for next_node, travel_time in zip(targets[start:stop].tolist(),
+                                          profile.travel_times(time, start, stop).tolist()):
+            if next_node in closed:
+                continue
+            new_time = time + travel_time
+            if new_time < arrival.get(next_node, float('infinity')):
+                arrival[next_node] = new_time
+                predecessors[next_node] = current
+                priority = new_time + (heuristic[next_node] if heuristic else 0.0)
+                heapq.heappush(frontier, (priority, next_node))
+
+    if stats is not None:
+        stats['settled'] = len(closed)
+
+    return arrival, predecessors
+
+
+def time_dependent_algorithm(G, start, end, departure_time=None, use_heuristic=True, stats=None):
+    """
+    Fastest route for a given departure time under predicted traffic
+
+    Edge costs follow the hour-by-hour traffic of TravelTimeProfile, so a long
+    drive is costed with the traffic expected when each road is reached. With
+    use_heuristic the search is A* with free-flow landmark bounds, otherwise
+    plain time-dependent Dijkstra; both return the same travel time.
+
+    Args:
+        G: NetworkX graph or CompiledGraph
+        start: Starting node
+        end: Target node
+        departure_time: Departure datetime (defaults to now)
+        use_heuristic: Use A* instead of Dijkstra
+        stats: Optional dict that receives the number of settled nodes
+
+    Returns:
+        tuple: (travel time in minutes, path)
+    """
+    G = as_compiled(G)
+    if start not in G or end not in G:
+        return float('infinity'), []
+    departure_time = departure_time or datetime.now()
+
+    s, t = G.index[start], G.index[end]
+    profile = travel_time_profile(G, departure_time)
+    departure = _minutes_since_midnight(departure_time)
+
+    heuristic = free_flow_landmarks(G).lower_bounds(t) if use_heuristic else None
+    arrival, predecessors = time_dependent_search(G, s, t, departure, profile, heuristic, stats)
+
+    if t not in arrival:
+        return float('infinity'), []
+    return arrival[t] - departure, G.path_from_predecessors(predecessors, t)
+
+
+def time_dependent_dijkstra_algorithm(G, start, end, departure_time=None, stats=None):
+    """Time-dependent Dijkstra (see time_dependent_algorithm)"""
+    return time_dependent_algorithm(G, start, end, departure_time, use_heuristic=False, stats=stats)
+
+
+def time_dependent_astar_algorithm(G, start, end, departure_time=None, stats=None):
+    """Time-dependent A* with free-flow landmark bounds (see time_dependent_algorithm)"""
+    return time_dependent_algorithm(G, start, end, departure_time, use_heuristic=True, stats=stats)
+
+
+def route_schedule(G, path, departure_time):
+    """
+    Entry time, arrival time and predicted traffic for each leg of a path
+
+    Returns:
+        list of dicts with from/to node, enter/arrive datetimes, traffic level
+        and travel time in minutes
+    """
+    G = as_compiled(G)
+    profile = travel_time_profile(G, departure_time)
+    time = _minutes_since_midnight(departure_time)
+
+    schedule = []
+    for u, v in zip(path[:-1], path[1:]):
+        edge = G.edge_index(u, v)
+        travel_time = float(profile.travel_times(time, edge, edge + 1)[0])
+        schedule.append({
+            'from': u,
+            'to': v,
+            'enter': profile.time_at(time),
+            'arrive': profile.time_at(time + travel_time),
+            'traffic': float(profile.traffic(int(time // 60))[edge]),
+            'travel_time': travel_time
+        })
+        time += travel_time
+    return schedule
+
+
+def _minutes_since_midnight(when):
+    return when.hour * 60.0 + when.minute + when.second / 60.0
@@ -0,0 +1,359 @@
+"""
+Append-only columnar store of road traffic levels over time
+
+A history directory holds:
+    manifest.json       road keys and the time index: start, end and row count of every segment
+    segment-NNNNNN.npz  'time' (int64 seconds, local time) and 'traffic' (float32, time x road)
+    journal.bin         rows appended since the last segment, as fixed-size binary records
+
+append() writes one record to the journal. Once the journal holds
+segment_rows records it is compacted into a new immutable segment. Range
+queries and downsampling read only the segments that overlap the requested
+time range, one at a time, so memory stays bounded by the segment size.
+
+Inspect a history (from the project directory):
+    python -m algorithms.traffic_history data/history --road 0 --freq hourly
+"""
+import argparse
+import bisect
+import json
+import os
+import threading
+from datetime import datetime, timedelta
+import numpy as np
+
+DEFAULT_HISTORY_DIR = 'data/history'
+
+# Rows per segment file
+DEFAULT_SEGMENT_ROWS = 1024
+
+# Segments ending more than this long ago are dropped by apply_retention
+DEFAULT_RETENTION = timedelta(days=30)
+
+MANIFEST_VERSION = 1
+
+# numpy datetime units of the downsampling frequencies
+FREQUENCIES = {'hourly': 'h', 'daily': 'D'}
+
+
+def to_seconds(timestamp):
+    """int64 seconds for a datetime, numpy datetime64 or number of seconds"""
+    if timestamp is None:
+        return None
+    if isinstance(timestamp, (datetime, np.datetime64)):
+        return int(np.datetime64(timestamp, 's').astype(np.int64))
+    return int(timestamp)
+
+
+def to_datetimes(seconds):
+    """datetime64[s] array for int64 seconds"""
+    return np.asarray(seconds, dtype=np.int64).astype('datetime64[s]')
+
+
+class TrafficHistory:
+    """
+    Time series of traffic levels for a fixed list of roads
+
+    Args:
+        directory: History directory (created if missing)
+        roads: The data["roads"] list or (from, to) pairs; required when
+            creating a history, checked against the manifest otherwise
+        segment_rows: Journal rows compacted into each segment
+    """
+
+    def __init__(self, directory, roads=None, segment_rows=DEFAULT_SEGMENT_ROWS):
+        self.directory = directory
+        self.segment_rows = segment_rows
+        self._lock = threading.Lock()
+        os.makedirs(directory, exist_ok=True)
+
+        keys = None if roads is None else [
+            (road["from"], road["to"]) if isinstance(road, dict) else tuple(road) for road in roads
+        ]
+        manifest_path = os.path.join(directory, 'manifest.json')
+        if os.path.exists(manifest_path):
+            with open(manifest_path, 'r') as f:
+                manifest = json.load(f)
+            if manifest.get('version') != MANIFEST_VERSION:
+                raise ValueError(f"Unsupported traffic history version {manifest.get('version')} in {directory}")
+            self.roads = [tuple(key) for key in manifest['roads']]
+            if keys is not None and keys != self.roads:
+                raise ValueError(f"Traffic history in {directory} was recorded for a different road list")
+            self.segments = manifest['segments']
+            self._next_segment = manifest['next_segment']
+        else:
+            if keys is None:
+                raise ValueError(f"No traffic history in {directory}; pass roads to create one")
+            self.roads = keys
+            self.segments = []
+            self._next_segment = 0
+            self._write_manifest()
+
+        self._road_index = {key: i for i, key in enumerate(self.roads)}
+        self._record = np.dtype([('time', '<i8'), ('traffic', '<f4', (len(self.roads),))])
+        self._journal_path = os.path.join(directory, 'journal.bin')
+        self._journal_rows = self._valid_journal_rows()
+        journal_times = self._read_journal()['time']
+        self.last_time = max([s['end'] for s in self.segments] + journal_times.tolist(), default=None)
+
+    @property
+    def num_roads(self):
+        return len(self.roads)
+
+    def __len__(self):
+        return sum(segment['rows'] for segment in self.segments) + self._journal_rows
+
+    def road_index(self, road):
+        """Column of a road given by index or (from, to) pair"""
+        if isinstance(road, tuple):
+            if road not in self._road_index:
+                raise KeyError(f"No road {road} in the traffic history")
+            return self._road_index[road]
+        road = int(road)
+        if not 0 <= road < self.num_roads:
+            raise KeyError(f"No road {road} in the traffic history")
+        return road
+
+    def _write_manifest(self):
+        manifest = {
+            'version': MANIFEST_VERSION,
+            'roads': [list(key) for key in self.roads],
+            'segments': self.segments,
+            'next_segment': self._next_segment
+        }
+        path = os.path.join(self.directory, 'manifest.json')
+        with open(path + '.tmp', 'w') as f:
+            json.dump(manifest, f)
+        os.replace(path + '.tmp', path)
+
+    def _valid_journal_rows(self):
+        """Complete records in the journal, dropping a partial record left by an interrupted write"""
+        if not os.path.exists(self._journal_path):
+            return 0
+        size = os.path.getsize(self._journal_path)
+        rows, partial = divmod(size, self._record.itemsize)
+        if partial:
+            with open(self._journal_path, 'r+b') as f:
+                f.truncate(rows * self._record.itemsize)
+        return rows
+
+    def _read_journal(self):
+        if not self._journal_rows:
+            return self._record_array(0)
+        return np.fromfile(self._journal_path, dtype=self._record, count=self._journal_rows)
+
+    def _record_array(self, rows):
+        return np.empty(rows, dtype=self._record)
+
+    def append(self, timestamp, traffic, min_interval=None):
+        """
+        Record the traffic level of every road at a point in time
+
+        Args:
+            timestamp: datetime, datetime64 or seconds; should not go backwards
+            traffic: Traffic level per road, in road order
+            min_interval: Optional timedelta; the row is skipped when the
+                latest recorded row is less than this much older
+
+        Returns:
+            bool: whether the row was recorded
+
+        Raises:
+            ValueError: If traffic does not have one value per road
+        """
+        traffic = np.asarray(traffic, dtype=np.float32)
+        if traffic.shape != (self.num_roads,):
+            raise ValueError(f"Expected {self.num_roads} traffic levels, got shape {traffic.shape}")
+        record = self._record_array(1)
+        seconds = to_seconds(timestamp)
+        record['time'] = seconds
+        record['traffic'] = traffic
+
+        with self._lock:
+            if min_interval is not None and self.last_time is not None and \
+                    seconds - self.last_time < min_interval.total_seconds():
+                return False
+            with open(self._journal_path, 'ab') as f:
+                f.write(record.tobytes())
+            self._journal_rows += 1
+            self.last_time = seconds if self.last_time is None else max(self.last_time, seconds)
+            if self._journal_rows >= self.segment_rows:
+                self._compact()
+        return True
+
+    def flush(self):
+        """Compact the journal into a segment even if it is not full"""
+        with self._lock:
+            if self._journal_rows:
+                self._compact()
+
+    def _compact(self):
+        records = self._read_journal()
+        order = np.argsort(records['time'], kind='stable')
+        times, traffic = records['time'][order], records['traffic'][order]
+
+        name = f'segment-{self._next_segment:06d}.npz'
+        path = os.path.join(self.directory, name)
+        with open(path + '.tmp', 'wb') as f:
+            np.savez(f, time=times, traffic=traffic)
+        os.replace(path + '.tmp', path)
+
+        # Keep the time index sorted by segment start
+        segment = {'file': name, 'start': int(times[0]), 'end': int(times[-1]), 'rows': len(times)}
+        position = bisect.bisect_right([s['start'] for s in self.segments], segment['start'])
+        self.segments.insert(position, segment)
+        self._next_segment += 1
+        self._write_manifest()
+
+        os.remove(self._journal_path)
+        self._journal_rows = 0
+
+    def _chunks(self, start=None, end=None, columns=None):
+        """
+        Yield (seconds, traffic) per segment overlapping [start, end], then the journal
+
+        Only overlapping segments are opened, and only the requested columns
+        are kept from each. The segment list and the journal are read under
+        one lock, so a compaction cannot move rows out of sight in between.
+        """
+        start, end = to_seconds(start), to_seconds(end)
+        with self._lock:
+            sources = [s['file'] for s in self.segments
+                       if (start is None or s['end'] >= start) and (end is None or s['start'] <= end)]
+            records = self._read_journal()
+
+        def select(times, traffic):
+            mask = np.ones(len(times), dtype=bool)
+            if start is not None:
+                mask &= times >= start
+            if end is not None:
+                mask &= times <= end
+            traffic = traffic[mask]
+            return times[mask], traffic if columns is None else traffic[:, columns]
+
+        for name in sources:
+            try:
+                with np.load(os.path.join(self.directory, name)) as segment:
+                    times, traffic = select(segment['time'], segment['traffic'])
+            except FileNotFoundError:
+                # Expired by apply_retention since the list was taken
+                continue
+            if len(times):
+                yield times, traffic
+
+        if len(records):
+            times, traffic = select(records['time'], records['traffic'])
+            if len(times):
+                yield times, traffic
+
+    def query(self, start=None, end=None, roads=None):
+        """
+        Traffic levels recorded in a time range
+
+        Args:
+            start: First time included (None for the beginning)
+            end: Last time included (None for the end)
+            roads: Roads (indices or (from, to) pairs) to return; all when None
+
+        Returns:
+            times: datetime64[s] array, ascending
+            traffic: float32 array of shape (times, roads)
+        """
+        columns = None if roads is None else [self.road_index(road) for road in roads]
+        width = self.num_roads if columns is None else len(columns)
+        times, traffic = [np.empty(0, dtype=np.int64)], [np.empty((0, width), dtype=np.float32)]
+        for chunk_times, chunk_traffic in self._chunks(start, end, columns):
+            times.append(chunk_times)
+            traffic.append(chunk_traffic)
+        times, traffic = np.concatenate(times), np.concatenate(traffic)
+        order = np.argsort(times, kind='stable')
+        return to_datetimes(times[order]), traffic[order]
+
+    def downsample(self, freq='hourly', start=None, end=None, roads=None):
+        """
+        Mean traffic per hour or day, accumulated one segment at a time
+
+        Args:
+            freq: 'hourly' or 'daily'
+            start, end: Time range, as in query
+            roads: Roads to return; all when None
+
+        Returns:
+            times: datetime64 start of every bucket that has data, ascending
+            means: float64 array of shape (buckets, roads)
+        """
+        if freq not in FREQUENCIES:
+            raise ValueError(f"Unknown frequency: {freq}")
+        unit = FREQUENCIES[freq]
+        columns = None if roads is None else [self.road_index(road) for road in roads]
+        width = self.num_roads if columns is None else len(columns)
+
+        sums = {}
+        counts = {}
+        for times, traffic in self._chunks(start, end, columns):
+            buckets = to_datetimes(times).astype(f'datetime64[{unit}]').astype(np.int64)
+            keys, inverse = np.unique(buckets, return_inverse=True)
+            chunk_sums = np.zeros((len(keys), width))
+            np.add.at(chunk_sums, inverse, traffic)
+            chunk_counts = np.bincount(inverse, minlength=len(keys))
+            for key, row, count in zip(keys.tolist(), chunk_sums, chunk_counts.tolist()):
+                sums[key] = sums.get(key, 0.0) + row
+                counts[key] = counts.get(key, 0) + count
+
+        keys = sorted(sums)
+        means = np.array([sums[key] / counts[key] for key in keys]).reshape(len(keys), width)
+        return np.array(keys, dtype=np.int64).astype(f'datetime64[{unit}]'), means
+
+    def road_series(self, road, freq=None, start=None, end=None):
+        """(times, traffic levels) of one road, raw or downsampled ('hourly' / 'daily')"""
+        if freq is None:
+            times, traffic = self.query(start, end, [road])
+        else:
+            times, traffic = self.downsample(freq, start, end, [road])
+        return times, traffic[:, 0]
+
+    def apply_retention(self, max_age=DEFAULT_RETENTION, now=None):
+        """
+        Delete segments whose newest row is older than max_age
+
+        Whole segments are dropped, so rows up to one segment older than
+        max_age may remain.
+
+        Returns:
+            int: number of segments deleted
+        """
+        now = datetime.now() if now is None else now
+        cutoff = to_seconds(now) - int(max_age.total_seconds())
+        with self._lock:
+            expired = [s for s in self.segments if s['end'] < cutoff]
+            if not expired:
+                return 0
+            self.segments = [s for s in self.segments if s['end'] >= cutoff]
+            self._write_manifest()
+            for segment in expired:
+                path = os.path.join(self.directory, segment['file'])
+                if os.path.exists(path):
+                    os.remove(path)
+        return len(expired)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Print the recorded traffic history of a road")
+    parser.add_argument('directory', nargs='?', default=DEFAULT_HISTORY_DIR, help="History directory")
+    parser.add_argument('--road', type=int, default=0, help="Road index")
+    parser.add_argument('--freq', choices=sorted(FREQUENCIES), help="Downsample to hourly or daily means")
+    parser.add_argument('--start', help="First time included (ISO format)")
+    parser.add_argument('--end', help="Last time included (ISO format)")
+    args = parser.parse_args(argv)
+
+    history = TrafficHistory(args.directory)
+    start = datetime.fromisoformat(args.start) if args.start else None
+    end = datetime.fromisoformat(args.end) if args.end else None
+    times, traffic = history.road_series(args.road, args.freq, start, end)
+    print(f"{len(history)} rows, {len(history.segments)} segments, {history.num_roads} roads")
+    for time, level in zip(times, traffic):
+        print(f"{time}  {level:.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+import networkx as nx
+from algorithms.compiled_graph import CompiledGraph, traffic_weight
+
+
+def road_endpoints(road_id, roads=None):
+    """
+    (from, to) node IDs of a road given by index into roads or as a (from, to) pair
+
+    Args:
+        road_id: Index into roads, or a (from, to) tuple
+        roads: The data["roads"] list (needed for index road IDs)
+    """
+    if isinstance(road_id, tuple):
+        return road_id
+    if roads is None:
+        raise ValueError(f"Road index {road_id} needs the roads list to resolve")
+    road = roads[road_id]
+    return road["from"], road["to"]
+
+
+def apply_traffic_patch(G, patch, roads=None):
+    """
+    Update traffic levels of roads in place instead of rebuilding the graph
+
+    Both directions of every road get the new traffic level and weight (the
+    traffic-aware weight when G considers traffic, the distance otherwise).
+    Entries that do not change the current level are skipped. If anything
+    changed, the graph version is bumped so route caches and weight-derived
+    data refresh.
+
+    Args:
+        G: NetworkX graph from create_graph_from_data or CompiledGraph
+        patch: dict mapping road ID (index into roads or (from, to) pair) to
+            traffic level in [0, 1]
+        roads: The data["roads"] list, for index road IDs
+
+    Returns:
+        The directed edges updated: edge ids for a CompiledGraph, (u, v)
+        pairs for a NetworkX graph
+
+    Raises:
+        KeyError: If a road is not in the graph
+        ValueError: If a traffic level is outside [0, 1]
+    """
+    updates = []
+    for road_id, traffic in patch.items():
+        if not 0 <= traffic <= 1:
+            raise ValueError(f"Traffic level {traffic} of road {road_id} is outside [0, 1]")
+        u, v = road_endpoints(road_id, roads)
+        edges = [(u, v), (v, u)]
+        if isinstance(G, CompiledGraph):
+            edges = [G.edge_index(a, b) for a, b in edges]
+            found = [e for e in edges if e >= 0]
+        else:
+            found = [(a, b) for a, b in edges if G.has_edge(a, b)]
+        if not found:
+            raise KeyError(f"No road {road_id} in the graph")
+        updates.extend((edge, float(traffic)) for edge in found)
+
+    if isinstance(G, CompiledGraph):
+        changed = [(e, traffic) for e, traffic in updates if G.traffic[e] != traffic]
+        if changed:
+            edge_ids, levels = zip(*changed)
+            G.apply_traffic(list(edge_ids), list(levels))
+        return [e for e, _ in changed]
+
+    consider_traffic = G.graph.get('consider_traffic', True)
+    changed = []
+    for (a, b), traffic in updates:
+        attrs = G[a][b]
+        if attrs['traffic'] == traffic:
+            continue
+        attrs['traffic'] = traffic
+        attrs['weight'] = traffic_weight(attrs['distance'], traffic) if consider_traffic else attrs['distance']
+        changed.append((a, b))
+    if changed:
+        G.graph['version'] = G.graph.get('version', 0) + 1
+    return changed
+
+
+def set_consider_traffic(G, consider_traffic):
+    """
+    Switch a graph between traffic-aware and distance-only weights in place
+
+    A CompiledGraph swaps between its two weight arrays; a NetworkX graph
+    recomputes the 'weight' attribute of each edge from its distance and
+    traffic. Either way the graph version is bumped when the setting changes.
+    """
+    if isinstance(G, CompiledGraph):
+        G.set_consider_traffic(consider_traffic)
+        return
+    if not isinstance(G, nx.Graph):
+        raise TypeError(f"Expected a NetworkX graph or CompiledGraph, got {type(G).__name__}")
+
+    consider_traffic = bool(consider_traffic)
+    if G.graph.get('consider_traffic', True) == consider_traffic:
+        return
+    for _, _, attrs in G.edges(data=True):
+        attrs['weight'] = traffic_weight(attrs['distance'], attrs['traffic']) if consider_traffic \
+            else attrs['distance']
+    G.graph['consider_traffic'] = consider_traffic
+    G.graph['version'] = G.graph.get('version', 0) + 1
@@ -1,5 +1,8 @@
 import networkx as nx
+import numpy as np
 import random
+from algorithms.compiled_graph import CompiledGraph, as_compiled
+from algorithms.delta_stepping import many_source_distances
 
 def generate_random_graph(num_nodes=10, edge_probability=0.3, min_weight=1, max_weight=10):
     
@@ -28,11 +31,15 @@ def calculate_path_metrics(G, path):
     Calculate metrics for a given path
     
     Args:
-        G: NetworkX graph
+        G: NetworkX graph or CompiledGraph
         path: List of nodes representing a path
         
     Returns:
         dict: Dictionary containing path metrics
+    
+    Raises:
+        ValueError: If consecutive path nodes of a CompiledGraph path are not
+            joined by a road (a NetworkX graph raises KeyError)
     """
     if not path or len(path) < 2:
         return {
@@ -47,7 +54,13 @@ def calculate_path_metrics(G, path):
     
     for i in range(len(path) - 1):
         u, v = path[i], path[i+1]
-        edge_data = G[u][v]
+        if isinstance(G, CompiledGraph):
+            edge = G.edge_index(u, v)
+            if edge == -1:
+                raise ValueError(f"No road from {u} to {v} in the graph")
+            edge_data = {'distance': float(G.distance[edge]), 'traffic': float(G.traffic[edge])}
+        else:
+            edge_data = G[u][v]
         total_distance += edge_data['distance']
         total_traffic += edge_data['traffic']
     
@@ -62,3 +75,54 @@ def calculate_path_metrics(G, path):
         "travel_time": travel_time * 60,  # convert to minutes
         "num_intersections": len(path) - 1
     }
+
+def closeness_centrality(G, weights=None, workers=1):
+    """
+    Closeness centrality of every node, computed with delta-stepping
+    
+    Matches nx.closeness_centrality (incoming distances, Wasserman-Faust
+    scaling for unreachable nodes). Without weights every road counts as one
+    hop, as in NetworkX's default.
+    
+    Args:
+        G: NetworkX graph or CompiledGraph
+        weights: Optional per-edge weight array (defaults to hop counts)
+        workers: Processes for the all-sources search (1 runs in-process)
+    
+    Returns:
+        dict: Node ID -> closeness centrality
+    """
+    G = as_compiled(G)
+    n = G.num_nodes
+    weights = np.ones(G.num_edges) if weights is None else weights
+    distances = many_source_distances(G, range(n), weights=weights, reverse=True, workers=workers)
+    
+    reachable = np.isfinite(distances)
+    totals = np.where(reachable, distances, 0.0).sum(axis=1)
+    counts = reachable.sum(axis=1) - 1
+    closeness = np.zeros(n)
+    connected = totals > 0
+    closeness[connected] = counts[connected] / totals[connected]
+    if n > 1:
+        closeness *= counts / (n - 1)
+    return dict(zip(G.node_ids, closeness.tolist()))
+
+def average_shortest_path_length(G, weights=None, workers=1):
+    """
+    Mean shortest path length over all ordered node pairs, with delta-stepping
+    
+    Like nx.average_shortest_path_length the graph must be strongly
+    connected; without weights the length is the number of roads.
+    
+    Raises:
+        ValueError: If some node cannot reach another
+    """
+    G = as_compiled(G)
+    n = G.num_nodes
+    if n < 2:
+        return 0
+    weights = np.ones(G.num_edges) if weights is None else weights
+    distances = many_source_distances(G, range(n), weights=weights, workers=workers)
+    if not np.isfinite(distances).all():
+        raise ValueError("Graph is not strongly connected")
+    return float(distances.sum() / (n * (n - 1)))
@@ -4,7 +4,7 @@ import matplotlib.pyplot as plt
 import numpy as np
 import pandas as pd
 import time, json, random, os, io, base64
-from datetime import datetime
+from datetime import datetime, timedelta
 from PIL import Image
 import folium
 from streamlit_folium import st_folium
@@ -15,11 +15,26 @@ import matplotlib.animation as animation
 from matplotlib.animation import FuncAnimation
 
 # Import algorithms from separate modules
-from algorithms.dijkstra import dijkstra_algorithm
+from algorithms.dijkstra import dijkstra_algorithm, bidirectional_dijkstra_algorithm
 from algorithms.astar import astar_algorithm
-from algorithms.bellman_ford import bellman_ford_algorithm
+from algorithms.alt import alt_astar_algorithm, compare_heuristics
+from algorithms.arc_flags import arc_flags_algorithm, compare_settled
+from algorithms.bellman_ford import bellman_ford_algorithm, spfa_algorithm, vectorized_bellman_ford_algorithm
+from algorithms.compiled_graph import compile_graph
+from algorithms.traffic_patch import apply_traffic_patch, set_consider_traffic
+from algorithms.distance_matrix import distance_matrix, nodes_of_type
+from algorithms.k_shortest_paths import k_shortest_paths
+from algorithms.pareto import pareto_routes
+from algorithms.isochrone import isochrones
+from algorithms.nearest_facility import nearest_facilities
+from algorithms.time_dependent import time_dependent_astar_algorithm, route_schedule
+from algorithms.contraction_hierarchies import load_or_build_hierarchy
+from algorithms.overlay_graph import build_overlay_graph
+from algorithms.route_cache import RouteCache
+from algorithms.traffic_history import TrafficHistory, DEFAULT_HISTORY_DIR
 from algorithms.traffic_prediction import get_future_traffic_predictions, get_road_specific_prediction
 from algorithms.weather_impact import WeatherImpact
+from algorithms.utils import calculate_path_metrics, closeness_centrality, average_shortest_path_length
 
 # Page configuration and simplified CSS
 st.set_page_config(page_title="Uttarakhand Traffic Flow Optimizer", page_icon="🏔️", layout="wide")
@@ -495,7 +510,7 @@ def load_sample_data():
 
 def create_graph_from_data(data, consider_traffic=True):
     """Create a NetworkX graph from the data"""
-    G = nx.DiGraph()
+    G = nx.DiGraph(consider_traffic=consider_traffic)
     
     for node_id, node_data in data["intersections"].items():
         # Add node with all available attributes
@@ -529,6 +544,41 @@ def create_graph_from_data(data, consider_traffic=True):
     
     return G
 
+def get_session_network(key):
+    """NetworkX and compiled road network built once per session, then patched in place on reruns"""
+    if key not in st.session_state:
+        G = create_graph_from_data(load_sample_data())
+        st.session_state[key] = (G, compile_graph(G))
+    return st.session_state[key]
+
+@st.cache_resource(max_entries=4)
+def get_contraction_hierarchy(_compiled_G, consider_traffic, weights_digest):
+    """Load the persisted contraction hierarchy for the current weights (keyed by their digest), building it if needed"""
+    weights = "traffic" if consider_traffic else "distance"
+    return load_or_build_hierarchy(_compiled_G, f"data/cache/ch_{weights}.npz")
+
+def get_session_overlay(compiled_G, consider_traffic):
+    """Multi-level overlay per session and traffic setting, customized again only where weights changed"""
+    overlays = st.session_state.setdefault('route_overlays', {})
+    if consider_traffic not in overlays:
+        overlays[consider_traffic] = build_overlay_graph(compiled_G)
+    return overlays[consider_traffic]
+
+@st.cache_resource
+def get_route_cache():
+    """Route cache shared across reruns and sessions"""
+    return RouteCache(max_bytes=16 * 1024 * 1024)
+
+# Minimum time between traffic history samples
+TRAFFIC_HISTORY_INTERVAL = timedelta(minutes=5)
+
+@st.cache_resource
+def get_traffic_history():
+    """Traffic history store shared across reruns and sessions, with old segments expired on startup"""
+    history = TrafficHistory(DEFAULT_HISTORY_DIR, load_sample_data()["roads"])
+    history.apply_retention()
+    return history
+
 def visualize_graph(G, path=None, title="Uttarakhand Traffic Network", step=None):
     """Create a network visualization of the traffic graph, optionally animating the route step-by-step."""
     plt.figure(figsize=(12, 8))
@@ -675,10 +725,26 @@ def simulate_traffic_change():
         }
         road["speed_limit"] = random.randint(*speed_limits.get(road_type, (40, 60)))
     
+    # Keep the simulated levels instead of discarding them on the next render,
+    # sampled at most once per interval however often the page reruns
+    get_traffic_history().append(datetime.now(), [road["traffic"] for road in data["roads"]],
+                                 min_interval=TRAFFIC_HISTORY_INTERVAL)
+    
     return data, predictions, current_weather
 
-def create_map_visualization(G, path=None, map_type="folium"):
-    """Create an interactive map visualization"""
+# Line colors for alternative routes on the map, best route first
+ALTERNATIVE_ROUTE_COLORS = ['#1565c0', '#8e24aa', '#00897b', '#f4511e', '#6d4c41']
+
+# Fill colors for isochrones, smallest budget first
+ISOCHRONE_COLORS = ['#2e7d32', '#f9a825', '#ef6c00', '#c62828']
+
+def create_map_visualization(G, path=None, map_type="folium", alternatives=None, isochrones=None):
+    """
+    Create an interactive map visualization
+    
+    alternatives: list of (cost, path) routes to overlay
+    isochrones: list of Isochrone areas to shade (smallest budget first)
+    """
     # Calculate center point
     lats = [data['pos'][0] for node, data in G.nodes(data=True)]
     lons = [data['pos'][1] for node, data in G.nodes(data=True)]
@@ -752,6 +818,31 @@ def create_map_visualization(G, path=None, map_type="folium"):
                 popup=folium.Popup(popup_html, max_width=300)
             ).add_to(m)
         
+        # Shade isochrones, largest first so smaller budgets stay visible on top
+        for rank, isochrone in reversed(list(enumerate(isochrones or []))):
+            polygon = isochrone.polygon(G)
+            if len(polygon) < 3:
+                continue
+            folium.Polygon(
+                locations=polygon,
+                color=ISOCHRONE_COLORS[rank % len(ISOCHRONE_COLORS)],
+                weight=2,
+                fill=True,
+                fill_opacity=0.25,
+                tooltip=f"Within {isochrone.budget / 60:g} h: {len(isochrone)} places"
+            ).add_to(m)
+        
+        # Overlay alternative routes, drawing the best one last so it stays on top
+        for rank, (cost, route) in reversed(list(enumerate(alternatives or [], 1))):
+            metrics = calculate_path_metrics(G, route)
+            folium.PolyLine(
+                [G.nodes[node]['pos'] for node in route],
+                weight=7 if rank == 1 else 5,
+                color=ALTERNATIVE_ROUTE_COLORS[(rank - 1) % len(ALTERNATIVE_ROUTE_COLORS)],
+                opacity=0.9 if rank == 1 else 0.7,
+                tooltip=f"Route {rank}: {metrics['distance']:.1f} km, {metrics['travel_time']:.0f} min"
+            ).add_to(m)
+        
         return m
     
     elif map_type == "plotly":
@@ -850,12 +941,33 @@ def create_traffic_prediction_plot(predictions):
     )
     return fig
 
+def create_road_history_plot(times, traffic_levels, road_name):
+    """Create a plot of a road's recorded traffic history"""
+    fig = go.Figure()
+    fig.add_trace(go.Scatter(
+        x=pd.to_datetime(times),
+        y=traffic_levels * 100,
+        mode='lines+markers' if len(times) < 50 else 'lines',
+        name='Recorded Traffic Level',
+        line=dict(color='#1565C0', width=2)
+    ))
+    
+    fig.update_layout(
+        title=f"Traffic History: {road_name}",
+        xaxis_title="Time",
+        yaxis_title="Traffic Level (%)",
+        hovermode='x unified',
+        plot_bgcolor='white',
+        paper_bgcolor='white'
+    )
+    return fig
+
 def create_network_analysis_plot(G):
     """Create network analysis visualizations"""
     # Calculate centrality metrics
     degree_cent = nx.degree_centrality(G)
     betweenness_cent = nx.betweenness_centrality(G)
-    closeness_cent = nx.closeness_centrality(G)
+    closeness_cent = closeness_centrality(G)
     
     # Create a DataFrame for visualization
     metrics_df = pd.DataFrame({
@@ -882,7 +994,7 @@ def get_network_metrics(G):
         subgraph = G.subgraph(largest_scc)
         
         if len(largest_scc) > 1:
-            avg_path_length = nx.average_shortest_path_length(subgraph)
+            avg_path_length = average_shortest_path_length(subgraph)
         else:
             avg_path_length = 0
     except (nx.NetworkXError, ValueError):
@@ -1257,7 +1369,11 @@ def main():
                 help="Enable real-time traffic analysis for optimal routing"
             )
             
-            G = create_graph_from_data(data, consider_traffic)
+            # Array-backed copy used by the routing algorithms; G stays for display and metrics.
+            # Toggling traffic only swaps weights instead of rebuilding both graphs
+            G, compiled_G = get_session_network('route_network')
+            set_consider_traffic(G, consider_traffic)
+            set_consider_traffic(compiled_G, consider_traffic)
             
             # Source and destination selection with better UX
             nodes = list(data["intersections"].keys())
@@ -1284,22 +1400,81 @@ def main():
             # Algorithm selection with enhanced tooltips
             algorithm = st.selectbox(
                 "🧮 Routing Algorithm",
-                ["Dijkstra's Algorithm", "A* Algorithm", "Bellman-Ford Algorithm"],
+                ["Dijkstra's Algorithm", "Bidirectional Dijkstra", "Dijkstra (Arc Flags)", "Contraction Hierarchies", "Multi-Level Overlay (CRP)", "A* Algorithm", "A* (ALT Landmarks)", "Time-Dependent (Predicted Traffic)", "Bellman-Ford Algorithm", "Bellman-Ford (SPFA Queue)", "Bellman-Ford (Vectorized)"],
                 help="Select the optimal pathfinding algorithm for your needs"
             )
             
+            if algorithm == "Time-Dependent (Predicted Traffic)":
+                # Roads are costed with the traffic predicted for when they are reached
+                col_date, col_time = st.columns(2)
+                with col_date:
+                    departure_date = st.date_input("📅 Departure Date", value=datetime.now().date())
+                with col_time:
+                    departure_clock = st.time_input("🕐 Departure Time", value=datetime.now().time().replace(second=0, microsecond=0))
+                departure_time = datetime.combine(departure_date, departure_clock)
+            
+            # Alternatives are recomputed with Yen's algorithm on the same weights
+            num_routes = st.slider(
+                "🔀 Routes to Show",
+                1, 5, 1,
+                help="Show up to 5 alternative routes, e.g. for monsoon road closures"
+            )
+            fast_alternatives = st.checkbox(
+                "⚡ Fast Alternatives",
+                value=False,
+                help="Use the penalty heuristic: quicker and more varied routes, but not guaranteed to be the shortest ones"
+            )
+            
+            show_tradeoffs = st.checkbox(
+                "📊 Show Route Trade-offs",
+                value=False,
+                help="Plot the Pareto-optimal routes over distance, traffic exposure and total climb"
+            )
+            
+            compare_effort = st.checkbox(
+                "🔬 Compare Search Effort",
+                value=False,
+                help="Rerun the query with the baseline search (plain Dijkstra or the terrain heuristic) to compare work done"
+            )
+            
+            # Cached wrappers keep the algorithm signatures; repeated queries skip the search
+            route_cache = get_route_cache()
+            cached_dijkstra = route_cache.wrap(dijkstra_algorithm)
+            cached_astar = route_cache.wrap(astar_algorithm)
+            cached_bellman_ford = route_cache.wrap(bellman_ford_algorithm)
+            alternatives = None
+            
             # Enhanced button with icon and loading state
             if st.button("🧠 Calculate Optimal Route", help="Find the best route considering all factors"):
                 with st.spinner("🔄 Analyzing traffic patterns and calculating optimal route..."):
                     start_time = time.time()
+                    search_stats = {}
                     
                     # Run selected algorithm
                     if algorithm == "Dijkstra's Algorithm":
-                        distance, path = dijkstra_algorithm(G, source.split("(")[1].split(")")[0].strip(), destination.split("(")[1].split(")")[0].strip())
+                        distance, path = cached_dijkstra(compiled_G, source.split("(")[1].split(")")[0].strip(), destination.split("(")[1].split(")")[0].strip())
+                    elif algorithm == "Bidirectional Dijkstra":
+                        distance, path = bidirectional_dijkstra_algorithm(compiled_G, source.split("(")[1].split(")")[0].strip(), destination.split("(")[1].split(")")[0].strip(), stats=search_stats)
+                    elif algorithm == "Dijkstra (Arc Flags)":
+                        distance, path = arc_flags_algorithm(compiled_G, source.split("(")[1].split(")")[0].strip(), destination.split("(")[1].split(")")[0].strip(), method='kmeans', stats=search_stats)
+                    elif algorithm == "Contraction Hierarchies":
+                        hierarchy = get_contraction_hierarchy(compiled_G, consider_traffic, compiled_G.weights_digest())
+                        distance, path = hierarchy.query(source.split("(")[1].split(")")[0].strip(), destination.split("(")[1].split(")")[0].strip(), stats=search_stats)
+                    elif algorithm == "Multi-Level Overlay (CRP)":
+                        overlay = get_session_overlay(compiled_G, consider_traffic)
+                        distance, path = overlay.query(source.split("(")[1].split(")")[0].strip(), destination.split("(")[1].split(")")[0].strip(), stats=search_stats)
                     elif algorithm == "A* Algorithm":
-                        distance, path = astar_algorithm(G, source.split("(")[1].split(")")[0].strip(), destination.split("(")[1].split(")")[0].strip())
+                        distance, path = cached_astar(compiled_G, source.split("(")[1].split(")")[0].strip(), destination.split("(")[1].split(")")[0].strip())
+                    elif algorithm == "A* (ALT Landmarks)":
+                        distance, path = alt_astar_algorithm(compiled_G, source.split("(")[1].split(")")[0].strip(), destination.split("(")[1].split(")")[0].strip(), stats=search_stats)
+                    elif algorithm == "Time-Dependent (Predicted Traffic)":
+                        distance, path = time_dependent_astar_algorithm(compiled_G, source.split("(")[1].split(")")[0].strip(), destination.split("(")[1].split(")")[0].strip(), departure_time, stats=search_stats)
+                    elif algorithm == "Bellman-Ford (SPFA Queue)":
+                        distance, path = spfa_algorithm(compiled_G, source.split("(")[1].split(")")[0].strip(), destination.split("(")[1].split(")")[0].strip(), stats=search_stats)
+                    elif algorithm == "Bellman-Ford (Vectorized)":
+                        distance, path = vectorized_bellman_ford_algorithm(compiled_G, source.split("(")[1].split(")")[0].strip(), destination.split("(")[1].split(")")[0].strip(), stats=search_stats)
                     else:  # Bellman-Ford
-                        distance, path = bellman_ford_algorithm(G, source.split("(")[1].split(")")[0].strip(), destination.split("(")[1].split(")")[0].strip())
+                        distance, path = cached_bellman_ford(compiled_G, source.split("(")[1].split(")")[0].strip(), destination.split("(")[1].split(")")[0].strip())
                     
                     computation_time = time.time() - start_time
                     
@@ -1310,6 +1485,8 @@ def main():
                         avg_traffic = total_traffic / (len(path)-1) if (len(path)-1) > 0 else 0
                         avg_speed = 60 * (1 - avg_traffic * 0.7)  # km/h
                         travel_time = (total_distance / avg_speed) * 60  # minutes
+                        if algorithm == "Time-Dependent (Predicted Traffic)":
+                            travel_time = distance  # predicted minutes for the chosen departure
                         
                         # Enhanced route summary panel
                         st.markdown('<div class="route-summary fade-in">', unsafe_allow_html=True)
@@ -1361,6 +1538,38 @@ def main():
                                 unsafe_allow_html=True
                             )
                         
+                        cache_stats = route_cache.stats()
+                        st.caption(f"🗄️ Route cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses, {cache_stats['entries']} routes ({cache_stats['bytes'] / 1024:.0f} KB)")
+                        if 'settled' in search_stats:
+                            st.caption(f"🔍 {search_stats['settled']} of {compiled_G.num_nodes} intersections settled during the search")
+                        if algorithm == "Dijkstra (Arc Flags)" and compare_effort:
+                            comparison = compare_settled(compiled_G, [(path[0], path[-1])], method='kmeans')[0]
+                            st.caption(f"🚩 Arc flags skipped roads leading away from the destination region: {comparison['arc_flags_settled']} settled vs {comparison['dijkstra_settled']} for plain Dijkstra")
+                        if 'relaxations' in search_stats:
+                            st.caption(f"🔍 {search_stats['relaxations']} edge relaxations vs {(compiled_G.num_nodes - 1) * compiled_G.num_edges} for classic Bellman-Ford")
+                        if 'passes' in search_stats:
+                            st.caption(f"🔍 Converged after {search_stats['passes']} vectorized passes (classic Bellman-Ford runs {compiled_G.num_nodes - 1})")
+                        if 'expanded' in search_stats and compare_effort:
+                            comparison = compare_heuristics(compiled_G, [(path[0], path[-1])])[0]
+                            st.caption(f"🔍 {search_stats['expanded']} node expansions with landmarks vs {comparison['terrain_expanded']} with the terrain heuristic")
+                        elif 'expanded' in search_stats:
+                            st.caption(f"🔍 {search_stats['expanded']} node expansions with landmarks")
+                        
+                        if algorithm == "Time-Dependent (Predicted Traffic)":
+                            schedule = route_schedule(compiled_G, path, departure_time)
+                            st.markdown(f"### 🕐 Departure {departure_time:%a %d %b, %H:%M} → Arrival {schedule[-1]['arrive']:%a %d %b, %H:%M}")
+                            st.dataframe(pd.DataFrame([
+                                {
+                                    "From": G.nodes[leg['from']]['name'],
+                                    "To": G.nodes[leg['to']]['name'],
+                                    "Enter": leg['enter'].strftime('%H:%M'),
+                                    "Arrive": leg['arrive'].strftime('%H:%M'),
+                                    "Predicted Traffic": round(leg['traffic'], 2),
+                                    "Time (min)": round(leg['travel_time'])
+                                }
+                                for leg in schedule
+                            ]), hide_index=True)
+                        
                         # Enhanced turn-by-turn directions with modern styling
                         st.markdown("### 🗺️ Turn-by-Turn Directions")
                         for i, (start, end) in enumerate(zip(path[:-1], path[1:]), 1):
@@ -1387,6 +1596,57 @@ def main():
                             </div>
                             """, unsafe_allow_html=True)
                         
+                        if num_routes > 1:
+                            # Route 1 is the route found above; the others are ranked on the
+                            # static edge weights, skipping the route already shown
+                            candidates = k_shortest_paths(compiled_G, path[0], path[-1], k=num_routes, method='penalty' if fast_alternatives else 'yen')
+                            alternatives = [(distance, path)] + [(cost, route) for cost, route in candidates if route != path][:num_routes - 1]
+                            st.markdown("### 🔀 Alternative Routes")
+                            if algorithm == "Time-Dependent (Predicted Traffic)":
+                                st.caption("Route 1 uses predicted traffic at departure; alternatives are ranked on current traffic")
+                            route_rows = []
+                            for rank, (cost, route) in enumerate(alternatives, 1):
+                                metrics = calculate_path_metrics(compiled_G, route)
+                                route_rows.append({
+                                    "Route": rank,
+                                    "Via": ", ".join(G.nodes[node]['name'] for node in route[1:-1]) or "Direct",
+                                    "Distance (km)": round(metrics['distance'], 1),
+                                    "Traffic": round(metrics['traffic_level'], 2),
+                                    "Travel Time (min)": round(metrics['travel_time']),
+                                    "Road Segments": metrics['num_intersections']
+                                })
+                            st.dataframe(pd.DataFrame(route_rows), hide_index=True)
+                        
+                        if show_tradeoffs:
+                            front = pareto_routes(compiled_G, path[0], path[-1])
+                            st.markdown("### 📊 Route Trade-offs")
+                            st.caption(f"{len(front)} Pareto-optimal routes: none is better than another on distance, traffic and climb at once")
+                            front_df = pd.DataFrame([
+                                {
+                                    "Distance (km)": round(route['distance'], 1),
+                                    "Traffic Exposure": round(route['traffic'], 1),
+                                    "Total Climb (m)": round(route['climb']),
+                                    "Via": ", ".join(G.nodes[node]['name'] for node in route['path'][1:-1]) or "Direct"
+                                }
+                                for route in front
+                            ])
+                            fig = px.scatter(
+                                front_df,
+                                x="Distance (km)",
+                                y="Total Climb (m)",
+                                color="Traffic Exposure",
+                                hover_data=["Via"],
+                                color_continuous_scale="RdYlGn_r"
+                            )
+                            fig.update_traces(marker=dict(size=14, line=dict(color='white', width=1)))
+                            fig.update_layout(
+                                margin=dict(t=20, l=0, r=0, b=0),
+                                height=350,
+                                paper_bgcolor='rgba(0,0,0,0)',
+                                plot_bgcolor='rgba(0,0,0,0)'
+                            )
+                            st.plotly_chart(fig, use_container_width=True)
+                        
                         st.markdown('</div>', unsafe_allow_html=True)
                     else:
                         st.error("❌ No optimal route found between selected locations or source and destination are the same.")
@@ -1409,7 +1669,8 @@ def main():
                 st.pyplot(fig)
             
             with viz_tabs[1]:
-                m = create_map_visualization(G, path=path if 'path' in locals() else None, map_type="folium")
+                m = create_map_visualization(G, path=path if 'path' in locals() else None, map_type="folium",
+                                             alternatives=alternatives)
                 st_folium(m, width=800)
             
             st.markdown('</div>', unsafe_allow_html=True)
@@ -1639,14 +1900,37 @@ def main():
                 </div>
             """, unsafe_allow_html=True)
             st.markdown('</div>', unsafe_allow_html=True)
+        
+        # Recorded traffic history of a single road
+        st.markdown('<h3 class="sub-header">📜 Road Traffic History</h3>', unsafe_allow_html=True)
+        history = get_traffic_history()
+        road_names = [road["name"] for road in data["roads"]]
+        
+        col1, col2 = st.columns([2, 1])
+        with col2:
+            history_road = st.selectbox("Road", range(len(road_names)), format_func=lambda i: road_names[i],
+                                        key="history_road")
+            resolution = st.radio("Resolution", ["Raw", "Hourly", "Daily"], horizontal=True,
+                                  key="history_resolution")
+            st.caption(f"{len(history)} snapshots recorded in {len(history.segments)} segments")
+        with col1:
+            freq = None if resolution == "Raw" else resolution.lower()
+            times, levels = history.road_series(history_road, freq)
+            st.plotly_chart(create_road_history_plot(times, levels, road_names[history_road]),
+                            use_container_width=True)
     
     # Network Analysis Tab with enhanced design
     with tabs[2]:
         st.markdown('<div class="fade-in">', unsafe_allow_html=True)
         st.markdown('<h2 class="sub-header">📊 Network Intelligence & Analytics</h2>', unsafe_allow_html=True)
         
+        # Apply the simulated traffic levels to the session's analysis network
+        G, compiled_network = get_session_network('analysis_network')
+        traffic_patch = {i: road['traffic'] for i, road in enumerate(data['roads'])}
+        apply_traffic_patch(G, traffic_patch, data['roads'])
+        apply_traffic_patch(compiled_network, traffic_patch, data['roads'])
+        
         # Calculate and display network metrics
-        G = create_graph_from_data(data)
         metrics_df = create_network_analysis_plot(G)
         network_metrics = get_network_metrics(G)
         
@@ -1706,7 +1990,7 @@ def main():
         st.markdown('<div class="modern-card">', unsafe_allow_html=True)
         
         # Create enhanced tabs for different visualizations
-        analysis_tabs = st.tabs(["📊 Centrality Metrics", "🗺️ Visual Analysis", "🔍 Node Details"])
+        analysis_tabs = st.tabs(["📊 Centrality Metrics", "🗺️ Visual Analysis", "🔍 Node Details", "🧮 Travel Cost Matrix", "⏱️ Reachability", "🏁 Nearest Facilities"])
         
         with analysis_tabs[0]:
             st.markdown('<h4 style="color: var(--primary-blue); margin-bottom: 1.5rem;">📊 Node Centrality Rankings</h4>', unsafe_allow_html=True)
@@ -1848,6 +2132,106 @@ def main():
                             </div>
                         """, unsafe_allow_html=True)
         
+        with analysis_tabs[3]:
+            st.markdown('<h4 style="color: var(--primary-green); margin-bottom: 1.5rem;">🧮 Travel Costs Between Node Types</h4>', unsafe_allow_html=True)
+            
+            node_type_options = sorted({node_data.get('type', 'city') for node_data in data['intersections'].values()})
+            col1, col2 = st.columns(2)
+            with col1:
+                origin_types = st.multiselect(
+                    "Origins",
+                    node_type_options,
+                    default=[t for t in ['capital', 'city'] if t in node_type_options],
+                    help="Node types used as rows of the matrix"
+                )
+            with col2:
+                destination_types = st.multiselect(
+                    "Destinations",
+                    node_type_options,
+                    default=[t for t in ['char_dham', 'pilgrimage'] if t in node_type_options],
+                    help="Node types used as columns of the matrix"
+                )
+            
+            origins = nodes_of_type(compiled_network, origin_types)
+            destinations = nodes_of_type(compiled_network, destination_types)
+            
+            if origins and destinations:
+                matrix = distance_matrix(compiled_network, origins, destinations)
+                matrix_df = pd.DataFrame(
+                    np.where(np.isfinite(matrix), matrix, np.nan),
+                    index=[G.nodes[node]['name'] for node in origins],
+                    columns=[G.nodes[node]['name'] for node in destinations]
+                )
+                st.dataframe(matrix_df.style.format("{:.1f}", na_rep="—").background_gradient(cmap="RdYlGn_r", axis=None), use_container_width=True)
+                st.caption(f"Traffic-weighted travel cost (km equivalent) for {len(origins)} × {len(destinations)} node pairs")
+            else:
+                st.info("Select at least one origin and one destination node type.")
+        
+        with analysis_tabs[4]:
+            st.markdown('<h4 style="color: var(--primary-blue); margin-bottom: 1.5rem;">⏱️ What Can Be Reached in Time?</h4>', unsafe_allow_html=True)
+            
+            col1, col2 = st.columns(2)
+            with col1:
+                reach_source = st.selectbox(
+                    "Starting Point",
+                    list(G.nodes()),
+                    index=list(G.nodes()).index('RIS') if 'RIS' in G else 0,
+                    format_func=lambda node: f"{G.nodes[node]['name']} ({node})",
+                    help="Place to measure travel times from"
+                )
+            with col2:
+                reach_hours = st.multiselect(
+                    "Time Budgets (hours)",
+                    [1, 2, 3, 4, 6, 8],
+                    default=[1, 2, 3],
+                    help="All budgets are answered by a single bounded search"
+                )
+            
+            if reach_hours:
+                # Travel times under current traffic, same graph as the cost matrix
+                areas = isochrones(compiled_network, reach_source, [hours * 60 for hours in reach_hours])
+                st.dataframe(pd.DataFrame([
+                    {
+                        "Within": f"{area.budget / 60:g} h",
+                        "Places Reached": len(area),
+                        "Farthest": G.nodes[area.nodes[-1]]['name'],
+                        "Roads Leaving Area": len(area.frontier)
+                    }
+                    for area in areas
+                ]), hide_index=True)
+                st_folium(create_map_visualization(G, map_type="folium", isochrones=areas), width=800, key="isochrone_map")
+            else:
+                st.info("Select at least one time budget.")
+        
+        with analysis_tabs[5]:
+            st.markdown('<h4 style="color: var(--primary-purple); margin-bottom: 1.5rem;">🏁 Nearest Facility From Every Place</h4>', unsafe_allow_html=True)
+            
+            col1, col2 = st.columns([2, 1])
+            with col1:
+                facility_types = st.multiselect(
+                    "Facility Types",
+                    node_type_options,
+                    default=[t for t in ['char_dham'] if t in node_type_options],
+                    help="Node types to search for"
+                )
+            with col2:
+                num_facilities = st.number_input("Nearest k", min_value=1, max_value=5, value=1)
+            
+            if facility_types:
+                # One multi-source search answers every place at once
+                nearest = nearest_facilities(compiled_network, facility_types, k=int(num_facilities))
+                facility_rows = []
+                for node in G.nodes():
+                    row = {"Place": f"{G.nodes[node]['name']} ({node})"}
+                    for rank, (facility, cost) in enumerate(nearest.nearest(node), 1):
+                        row[f"#{rank} Facility"] = G.nodes[facility]['name']
+                        row[f"#{rank} Cost"] = round(cost, 1)
+                    facility_rows.append(row)
+                st.dataframe(pd.DataFrame(facility_rows), hide_index=True, use_container_width=True)
+                st.caption("Traffic-weighted travel cost (km equivalent) from each place to its nearest facilities")
+            else:
+                st.info("Select at least one facility type.")
+        
         st.markdown('</div>', unsafe_allow_html=True)
         st.markdown('</div>', unsafe_allow_html=True)
     
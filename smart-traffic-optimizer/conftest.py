@@ -0,0 +1,97 @@
+"""
+Shared fixtures for the test modules
+
+Routing results are checked against NetworkX on the bundled Uttarakhand
+network, built with the same weights as create_graph_from_data in app.py
+(which cannot be imported without Streamlit).
+"""
+import json
+import os
+import random
+import networkx as nx
+import pytest
+from algorithms.compiled_graph import compiled_graph_from_data
+
+DATA_PATH = os.path.join(os.path.dirname(__file__), 'data', 'uttarakhand_realistic_data.json')
+
+# Fixed month so seasonal costs do not depend on the day the tests run
+MONTH = 1
+
+NUM_PAIRS = 40
+
+
+def reference_graph(data, consider_traffic=True):
+    """NetworkX graph with the nodes, edges and attributes of create_graph_from_data"""
+    G = nx.DiGraph(consider_traffic=consider_traffic)
+    for node_id, node_data in data["intersections"].items():
+        G.add_node(node_id, pos=node_data["pos"], name=node_data["name"],
+                   type=node_data.get("type", "city"), division=node_data.get("division", "Garhwal"),
+                   elevation=node_data.get("elevation", 1000))
+    for road in data["roads"]:
+        weight = road["distance"] * (1 + road["traffic"] * 2) if consider_traffic else road["distance"]
+        edge_attrs = {
+            'weight': weight,
+            'distance': road["distance"],
+            'traffic': road["traffic"],
+            'name': road["name"],
+            'type': road.get("type", "highway"),
+            'condition': road.get("condition", "good"),
+            'lanes': road.get("lanes", 2)
+        }
+        G.add_edge(road["from"], road["to"], **edge_attrs)
+        G.add_edge(road["to"], road["from"], **edge_attrs)
+    return G
+
+
+def cost_graph(G, costs):
+    """NetworkX graph of a CompiledGraph with per-edge costs, keeping the cheapest parallel edge"""
+    R = nx.DiGraph()
+    R.add_nodes_from(G.node_ids)
+    for e, cost in enumerate(costs.tolist()):
+        u, v = G.node_ids[G.sources[e]], G.node_ids[G.targets[e]]
+        if not R.has_edge(u, v) or R[u][v]['weight'] > cost:
+            R.add_edge(u, v, weight=cost)
+    return R
+
+
+def sample_pairs(R, count, seed=0):
+    """Random (source, target) pairs inside the largest strongly connected component"""
+    nodes = sorted(max(nx.strongly_connected_components(R), key=len))
+    rng = random.Random(seed)
+    return [tuple(rng.sample(nodes, 2)) for _ in range(count)]
+
+
+def patched_data(data, patch):
+    """Copy of data with the traffic of road indices in patch replaced"""
+    patched = json.loads(json.dumps(data))
+    for i, traffic in patch.items():
+        patched["roads"][i]["traffic"] = traffic
+    return patched
+
+
+def assert_route(R, source, target, cost, path):
+    """cost is the shortest distance in R and path is a route of that cost"""
+    assert cost == pytest.approx(nx.dijkstra_path_length(R, source, target))
+    assert path[0] == source and path[-1] == target
+    assert nx.path_weight(R, path, 'weight') == pytest.approx(cost)
+
+
+@pytest.fixture(scope='session')
+def data():
+    with open(DATA_PATH, 'r') as f:
+        return json.load(f)
+
+
+@pytest.fixture(scope='session')
+def reference(data):
+    return reference_graph(data)
+
+
+@pytest.fixture(scope='session')
+def pairs(reference):
+    return sample_pairs(reference, NUM_PAIRS)
+
+
+@pytest.fixture
+def compiled(data):
+    return compiled_graph_from_data(data)
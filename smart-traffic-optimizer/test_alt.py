@@ -0,0 +1,40 @@
+import networkx as nx
+import pytest
+from algorithms.alt import alt_astar_algorithm, compare_heuristics, select_landmarks
+from algorithms.astar import astar_cost_table
+from conftest import MONTH, assert_route, cost_graph
+
+
+def test_alt_costs_match_networkx(compiled, pairs):
+    R = cost_graph(compiled, astar_cost_table(compiled, MONTH))
+    for source, target in pairs:
+        cost, path = alt_astar_algorithm(compiled, source, target, MONTH)
+        assert_route(R, source, target, cost, path)
+
+
+def test_alt_after_traffic_change(compiled, pairs):
+    alt_astar_algorithm(compiled, *pairs[0], MONTH)
+    edge_ids = list(range(0, compiled.num_edges, 4))
+    compiled.apply_traffic(edge_ids, [1.0] * len(edge_ids))
+    R = cost_graph(compiled, astar_cost_table(compiled, MONTH))
+    for source, target in pairs[:10]:
+        cost, path = alt_astar_algorithm(compiled, source, target, MONTH)
+        assert_route(R, source, target, cost, path)
+
+
+def test_landmark_bounds_are_admissible(compiled, pairs):
+    costs = astar_cost_table(compiled, MONTH)
+    landmarks = select_landmarks(compiled, costs, seeds=[pairs[0][0]])
+    assert landmarks.landmarks[0] == compiled.index[pairs[0][0]]
+    R = cost_graph(compiled, costs).reverse()
+    for _, target in pairs[:5]:
+        bounds = landmarks.lower_bounds(compiled.index[target])
+        for node, length in nx.single_source_dijkstra_path_length(R, target).items():
+            assert bounds[compiled.index[node]] <= length + 1e-9
+
+
+def test_compare_heuristics(compiled, pairs):
+    for row in compare_heuristics(compiled, pairs[:5], MONTH):
+        assert row['alt_cost'] <= row['terrain_cost'] + 1e-9
+        assert row['alt_cost'] == pytest.approx(alt_astar_algorithm(compiled, row['start'], row['end'], MONTH)[0])
+        assert row['alt_expanded'] > 0 and row['terrain_expanded'] > 0
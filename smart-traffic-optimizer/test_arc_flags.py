@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+import algorithms.arc_flags as arc_flags
+from algorithms.arc_flags import arc_flags_algorithm, arc_flags_for, build_arc_flags, compare_settled, region_partition
+from conftest import assert_route, patched_data, reference_graph
+
+
+@pytest.mark.parametrize('method', ['division', 'kmeans'])
+def test_routes_match_networkx(compiled, reference, pairs, method):
+    for source, target in pairs:
+        assert_route(reference, source, target, *arc_flags_algorithm(compiled, source, target, method=method))
+
+
+def test_chunked_preprocessing_gives_the_same_flags(compiled, monkeypatch):
+    regions = region_partition(compiled, 'kmeans')
+    expected = build_arc_flags(compiled, regions)
+    monkeypatch.setattr(arc_flags, 'MAX_CHUNK_ENTRIES', 1)
+    chunked = build_arc_flags(compiled, regions)
+    np.testing.assert_array_equal(chunked.flags, expected.flags)
+    assert expected.stats()['regions'] == expected.num_regions == len(np.unique(regions))
+
+
+def test_flags_follow_traffic(compiled, data, pairs):
+    first = arc_flags_for(compiled)
+    assert arc_flags_for(compiled) is first
+    patch = {i: 1.0 for i in range(0, len(data["roads"]), 4)}
+    edges = [compiled.edge_index(data["roads"][i][a], data["roads"][i][b]) for i in patch
+             for a, b in (("from", "to"), ("to", "from"))]
+    compiled.apply_traffic(edges, [1.0] * len(edges))
+    assert arc_flags_for(compiled) is not first
+    expected = reference_graph(patched_data(data, patch))
+    for source, target in pairs:
+        assert_route(expected, source, target, *arc_flags_algorithm(compiled, source, target))
+
+
+def test_compare_settled(compiled, pairs):
+    for row in compare_settled(compiled, pairs, method='kmeans'):
+        assert row['arc_flags_distance'] == pytest.approx(row['dijkstra_distance'])
+        assert row['arc_flags_settled'] <= row['dijkstra_settled']
+
+
+def test_unreachable_and_unknown(compiled, reference, pairs):
+    isolated = next(node for node in reference if reference.degree(node) == 0)
+    assert arc_flags_algorithm(compiled, pairs[0][0], isolated) == (float('infinity'), [])
+    assert arc_flags_algorithm(compiled, 'NOWHERE', pairs[0][1]) == (float('infinity'), [])
+    with pytest.raises(ValueError):
+        region_partition(compiled, 'districts')
@@ -0,0 +1,30 @@
+import pytest
+from algorithms.astar import astar_algorithm, astar_cost_table
+from conftest import MONTH, assert_route, cost_graph
+
+
+def test_astar_costs_match_networkx(compiled, pairs):
+    R = cost_graph(compiled, astar_cost_table(compiled, MONTH))
+    for source, target in pairs:
+        cost, path = astar_algorithm(compiled, source, target, MONTH)
+        assert_route(R, source, target, cost, path)
+
+
+def test_compiled_astar_matches_networkx_implementation(compiled, reference, pairs):
+    for source, target in pairs[:10]:
+        cost, path = astar_algorithm(compiled, source, target, MONTH)
+        expected_cost, expected_path = astar_algorithm(reference, source, target, MONTH)
+        assert cost == pytest.approx(expected_cost)
+        assert path == expected_path
+
+
+def test_cost_table_follows_traffic(compiled):
+    costs = astar_cost_table(compiled, MONTH)
+    assert astar_cost_table(compiled, MONTH) is costs
+    before = float(costs[0])
+    compiled.apply_traffic([0], [float(compiled.traffic[0]) + 0.5])
+    assert astar_cost_table(compiled, MONTH)[0] > before
+
+
+def test_missing_nodes(compiled):
+    assert astar_algorithm(compiled, 'NOWHERE', compiled.node_ids[0], MONTH) == (float('inf'), [])
@@ -0,0 +1,96 @@
+import csv
+import json
+import multiprocessing
+import networkx as nx
+import pytest
+from algorithms import batch_routing
+from algorithms.batch_routing import main, read_od_pairs, run_batch, shard_by_source
+from algorithms.snapshot import save_snapshot
+from algorithms.utils import calculate_path_metrics
+
+
+def od_pairs(pairs, reference):
+    isolated = next(node for node in reference if reference.degree(node) == 0)
+    return pairs[:20] + [(pairs[0][0], isolated), ('NOWHERE', pairs[0][1]), (pairs[1][0], 'NOWHERE')]
+
+
+def read_records(path):
+    with open(path, 'r') as f:
+        return sorted((json.loads(line) for line in f), key=lambda record: record['pair'])
+
+
+def assert_records(records, od, reference):
+    assert [record['pair'] for record in records] == list(range(len(od)))
+    for record, (source, target) in zip(records, od):
+        assert (record['source'], record['target']) == (source, target)
+        if source not in reference or target not in reference or not nx.has_path(reference, source, target):
+            assert record['cost'] is None and record['path'] == [] and record['error']
+            continue
+        assert record['cost'] == pytest.approx(nx.dijkstra_path_length(reference, source, target))
+        assert nx.path_weight(reference, record['path'], 'weight') == pytest.approx(record['cost'])
+        assert record['metrics'] == calculate_path_metrics(reference, record['path'])
+
+
+def test_shard_by_source():
+    shards = shard_by_source([('A', 'B'), ('C', 'D'), ('A', 'E')])
+    assert shards == [('A', [(0, 'B'), (2, 'E')]), ('C', [(1, 'D')])]
+
+
+def test_read_od_pairs(tmp_path):
+    csv_path = tmp_path / 'od.csv'
+    csv_path.write_text('from,to\nDEH,HRD\nRIS,NTL\n')
+    jsonl_path = tmp_path / 'od.jsonl'
+    jsonl_path.write_text('{"source": "DEH", "target": "HRD"}\n\n{"from": "RIS", "to": "NTL"}\n')
+    assert list(read_od_pairs(str(csv_path))) == list(read_od_pairs(str(jsonl_path))) == \
+        [('DEH', 'HRD'), ('RIS', 'NTL')]
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_run_batch_matches_networkx(compiled, reference, pairs, tmp_path, workers):
+    od = od_pairs(pairs, reference)
+    output = str(tmp_path / 'routes.jsonl')
+    summary = run_batch(compiled, od, output, workers=workers, progress=None)
+    assert summary['pairs'] == len(od) and summary['failed'] == 3
+    assert_records(read_records(output), od, reference)
+
+
+def test_snapshot_workers_use_traffic_setting(compiled, reference, pairs, tmp_path):
+    snapshot = str(tmp_path / 'network.graph')
+    save_snapshot(compiled, snapshot)
+    compiled.set_consider_traffic(False)
+    distance_only = nx.DiGraph()
+    for u, v, attrs in reference.edges(data=True):
+        distance_only.add_edge(u, v, weight=attrs['distance'], distance=attrs['distance'], traffic=attrs['traffic'])
+
+    output = str(tmp_path / 'routes.jsonl')
+    run_batch(compiled, pairs[:10], output, workers=2, progress=None, snapshot=snapshot)
+    assert_records(read_records(output), pairs[:10], distance_only)
+
+
+def test_csv_output_and_command_line(reference, pairs, tmp_path):
+    od_path = tmp_path / 'od.csv'
+    od_path.write_text('source,target\n' + ''.join(f'{s},{t}\n' for s, t in pairs[:5]))
+    output = tmp_path / 'routes.csv'
+    main([str(od_path), str(output), '--workers', '1'])
+    with open(output, newline='') as f:
+        rows = sorted(csv.DictReader(f), key=lambda row: int(row['pair']))
+    for row, (source, target) in zip(rows, pairs[:5]):
+        assert float(row['cost']) == pytest.approx(nx.dijkstra_path_length(reference, source, target))
+        assert row['path'].split('>')[0] == source and row['path'].split('>')[-1] == target
+
+
+def test_workers_stop_when_writing_fails(compiled, pairs, tmp_path, monkeypatch):
+    def fail(self, record):
+        raise OSError("disk full")
+    monkeypatch.setattr(batch_routing._ResultWriter, 'write', fail)
+    with pytest.raises(OSError):
+        run_batch(compiled, pairs, str(tmp_path / 'routes.jsonl'), workers=2, progress=None)
+    assert multiprocessing.active_children() == []
+
+
+def test_path_metrics_reject_missing_roads(compiled, reference, pairs):
+    path = nx.dijkstra_path(reference, *pairs[0])
+    assert calculate_path_metrics(compiled, path) == pytest.approx(calculate_path_metrics(reference, path))
+    isolated = next(node for node in reference if reference.degree(node) == 0)
+    with pytest.raises(ValueError):
+        calculate_path_metrics(compiled, [path[0], isolated])
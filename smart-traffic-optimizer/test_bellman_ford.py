@@ -0,0 +1,50 @@
+import networkx as nx
+import pytest
+from algorithms.bellman_ford import bellman_ford_algorithm, spfa_algorithm, vectorized_bellman_ford_algorithm
+from conftest import assert_route
+
+QUEUE_AND_VECTORIZED = [spfa_algorithm, vectorized_bellman_ford_algorithm]
+
+
+@pytest.mark.parametrize('algorithm', QUEUE_AND_VECTORIZED)
+def test_costs_match_networkx(algorithm, compiled, reference, pairs):
+    for source, target in pairs:
+        stats = {}
+        cost, path = algorithm(compiled, source, target, stats=stats)
+        assert_route(reference, source, target, cost, path)
+        assert stats
+
+
+@pytest.mark.parametrize('algorithm', QUEUE_AND_VECTORIZED)
+def test_agrees_with_classic_bellman_ford(algorithm, compiled, reference, pairs):
+    for source, target in pairs[:5]:
+        assert algorithm(compiled, source, target)[0] == \
+            pytest.approx(bellman_ford_algorithm(reference, source, target)[0])
+
+
+def small_graph(edges):
+    G = nx.DiGraph()
+    for u, v, weight in edges:
+        G.add_edge(u, v, weight=weight, distance=abs(weight), traffic=0.0)
+    return G
+
+
+@pytest.mark.parametrize('algorithm', QUEUE_AND_VECTORIZED)
+def test_negative_edges(algorithm):
+    G = small_graph([('A', 'B', 4.0), ('A', 'C', 2.0), ('C', 'B', -1.5), ('B', 'D', 1.0), ('C', 'D', 5.0)])
+    cost, path = algorithm(G, 'A', 'D')
+    assert cost == pytest.approx(nx.bellman_ford_path_length(G, 'A', 'D'))
+    assert path == ['A', 'C', 'B', 'D']
+
+
+@pytest.mark.parametrize('algorithm', QUEUE_AND_VECTORIZED)
+def test_negative_cycle(algorithm):
+    G = small_graph([('A', 'B', 1.0), ('B', 'C', -2.0), ('C', 'B', 1.0), ('C', 'D', 1.0)])
+    assert algorithm(G, 'A', 'D') == (float('infinity'), [])
+
+
+@pytest.mark.parametrize('algorithm', QUEUE_AND_VECTORIZED)
+def test_unreachable_and_unknown(algorithm, compiled, reference, pairs):
+    isolated = next(node for node in reference if reference.degree(node) == 0)
+    assert algorithm(compiled, pairs[0][0], isolated) == (float('infinity'), [])
+    assert algorithm(compiled, 'NOWHERE', pairs[0][1]) == (float('infinity'), [])
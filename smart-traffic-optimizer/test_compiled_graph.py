@@ -0,0 +1,73 @@
+import numpy as np
+from algorithms.compiled_graph import compile_graph, compiled_graph_from_data
+from algorithms.dijkstra import dijkstra_algorithm
+from conftest import NUM_PAIRS, assert_route, reference_graph, sample_pairs
+
+ARRAYS = ('offsets', 'targets', 'weight', 'distance', 'traffic', 'lanes', 'road_type', 'condition',
+          'elevation', 'pos', 'node_type', 'division')
+
+
+def assert_same_graph(G, expected):
+    assert list(G.node_ids) == list(expected.node_ids)
+    assert list(G.node_names) == list(expected.node_names)
+    assert list(G.edge_names) == list(expected.edge_names)
+    assert G.labels == expected.labels
+    assert G.consider_traffic == expected.consider_traffic
+    for name in ARRAYS:
+        np.testing.assert_array_equal(getattr(G, name), getattr(expected, name), err_msg=name)
+
+
+def test_compiled_from_data_matches_compile_graph(data, reference):
+    assert_same_graph(compiled_graph_from_data(data), compile_graph(reference))
+
+
+def test_csr_edges_match_networkx(compiled, reference):
+    assert compiled.num_nodes == reference.number_of_nodes()
+    assert compiled.num_edges == reference.number_of_edges()
+    for e in range(compiled.num_edges):
+        u, v = compiled.node_ids[compiled.sources[e]], compiled.node_ids[compiled.targets[e]]
+        assert compiled.edge_index(u, v) == e
+        assert compiled.weight[e] == reference[u][v]['weight']
+    assert compiled.edge_index('NOWHERE', compiled.node_ids[0]) == -1
+
+
+def test_dijkstra_matches_networkx(compiled, reference, pairs):
+    for source, target in pairs:
+        cost, path = dijkstra_algorithm(compiled, source, target)
+        assert_route(reference, source, target, cost, path)
+        assert (cost, path) == dijkstra_algorithm(reference, source, target)
+
+
+def test_dijkstra_without_traffic(data):
+    G = compiled_graph_from_data(data, consider_traffic=False)
+    R = reference_graph(data, consider_traffic=False)
+    for source, target in sample_pairs(R, NUM_PAIRS):
+        cost, path = dijkstra_algorithm(G, source, target)
+        assert_route(R, source, target, cost, path)
+
+
+def test_unreachable_target(compiled, reference):
+    isolated = [node for node in reference if reference.degree(node) == 0]
+    assert isolated
+    source = next(iter(reference.edges))[0]
+    for target in isolated:
+        assert dijkstra_algorithm(compiled, source, target) == (float('infinity'), [])
+
+
+def test_set_consider_traffic_swaps_weights(data, compiled):
+    distance_only = compiled_graph_from_data(data, consider_traffic=False)
+    version = compiled.version
+    compiled.set_consider_traffic(False)
+    np.testing.assert_array_equal(compiled.weight, distance_only.weight)
+    compiled.set_consider_traffic(True)
+    np.testing.assert_array_equal(compiled.weight, compiled_graph_from_data(data).weight)
+    assert compiled.version == version + 2
+
+
+def test_derived_data_rebuilt_on_version_change(compiled):
+    builds = []
+    build = lambda: builds.append(1) or len(builds)
+    assert compiled.derived('key', build) == 1
+    assert compiled.derived('key', build) == 1
+    compiled.apply_traffic([0], [0.5])
+    assert compiled.derived('key', build) == 2
@@ -0,0 +1,30 @@
+import numpy as np
+from algorithms.contraction_hierarchies import (build_contraction_hierarchy, contraction_hierarchy_algorithm,
+                                                load_or_build_hierarchy, weights_digest)
+from algorithms.traffic_patch import apply_traffic_patch
+from conftest import assert_route, patched_data, reference_graph
+
+
+def test_queries_match_networkx(compiled, reference, pairs):
+    ch = build_contraction_hierarchy(compiled)
+    for source, target in pairs:
+        cost, path = contraction_hierarchy_algorithm(ch, source, target)
+        assert_route(reference, source, target, cost, path)
+    assert ch.query('NOWHERE', pairs[0][1]) == (float('infinity'), [])
+
+
+def test_load_or_build_follows_traffic(data, compiled, pairs, tmp_path):
+    path = str(tmp_path / 'cache' / 'ch.npz')
+    ch = load_or_build_hierarchy(compiled, path)
+    assert load_or_build_hierarchy(compiled, path).weights_digest == ch.weights_digest
+
+    patch = {i: 1.0 - data["roads"][i]["traffic"] for i in range(0, len(data["roads"]), 3)}
+    apply_traffic_patch(compiled, patch, data["roads"])
+    customized = load_or_build_hierarchy(compiled, path)
+    assert customized.weights_digest == weights_digest(compiled.weight)
+    np.testing.assert_array_equal(customized.order, ch.order)
+
+    R = reference_graph(patched_data(data, patch))
+    for source, target in pairs:
+        cost, path = customized.query(source, target)
+        assert_route(R, source, target, cost, path)
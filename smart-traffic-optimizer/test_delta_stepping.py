@@ -0,0 +1,63 @@
+import networkx as nx
+import numpy as np
+import pytest
+from algorithms.compiled_graph import as_compiled
+from algorithms.delta_stepping import delta_stepping_algorithm, delta_stepping_tree, many_source_distances
+from algorithms.utils import average_shortest_path_length, closeness_centrality
+from conftest import assert_route
+
+
+def expected_row(R, G, source, reverse=False):
+    lengths = nx.single_source_dijkstra_path_length(R.reverse() if reverse else R, source)
+    return np.array([lengths.get(node, np.inf) for node in G.node_ids])
+
+
+def test_routes_match_networkx(compiled, reference, pairs):
+    for source, target in pairs:
+        assert_route(reference, source, target, *delta_stepping_algorithm(compiled, source, target))
+
+
+@pytest.mark.parametrize('delta', [None, 1.0, 1e9])
+@pytest.mark.parametrize('reverse', [False, True])
+def test_tree_matches_networkx(compiled, reference, pairs, delta, reverse):
+    source = pairs[0][0]
+    distances, predecessors = delta_stepping_tree(compiled, compiled.index[source], reverse=reverse, delta=delta)
+    np.testing.assert_allclose(distances, expected_row(reference, compiled, source, reverse))
+    for v, u in enumerate(predecessors.tolist()):
+        if u >= 0:
+            a, b = (v, u) if reverse else (u, v)
+            edge = compiled.edge_index(compiled.node_ids[a], compiled.node_ids[b])
+            assert distances[u] + compiled.weight[edge] == pytest.approx(distances[v])
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_many_source_distances_match_networkx(compiled, reference, workers):
+    sources = list(range(0, compiled.num_nodes, 3))
+    distances = many_source_distances(compiled, sources, workers=workers)
+    assert distances.shape == (len(sources), compiled.num_nodes)
+    for row, s in zip(distances, sources):
+        np.testing.assert_allclose(row, expected_row(reference, compiled, compiled.node_ids[s]))
+
+
+def test_closeness_matches_networkx(reference):
+    expected = nx.closeness_centrality(reference)
+    closeness = closeness_centrality(reference)
+    assert closeness.keys() == expected.keys()
+    for node, value in expected.items():
+        assert closeness[node] == pytest.approx(value)
+
+
+def test_average_path_length(reference):
+    component = reference.subgraph(max(nx.strongly_connected_components(reference), key=len)).copy()
+    G = as_compiled(component)
+    assert average_shortest_path_length(G) == pytest.approx(nx.average_shortest_path_length(component))
+    assert average_shortest_path_length(G, weights=G.weight) == \
+        pytest.approx(nx.average_shortest_path_length(component, weight='weight'))
+    with pytest.raises(ValueError):
+        average_shortest_path_length(reference)
+
+
+def test_unreachable_and_unknown(compiled, reference, pairs):
+    isolated = next(node for node in reference if reference.degree(node) == 0)
+    assert delta_stepping_algorithm(compiled, pairs[0][0], isolated) == (float('infinity'), [])
+    assert delta_stepping_algorithm(compiled, 'NOWHERE', pairs[0][1]) == (float('infinity'), [])
@@ -0,0 +1,33 @@
+import pytest
+from algorithms.dijkstra import dijkstra_algorithm, bidirectional_dijkstra_algorithm
+from conftest import assert_route
+
+
+def test_bidirectional_matches_networkx(compiled, reference, pairs):
+    for source, target in pairs:
+        cost, path = bidirectional_dijkstra_algorithm(compiled, source, target)
+        assert_route(reference, source, target, cost, path)
+
+
+def test_bidirectional_reports_settled_nodes(compiled, pairs):
+    settled = 0
+    for source, target in pairs:
+        stats = {}
+        bidirectional_dijkstra_algorithm(compiled, source, target, stats=stats)
+        settled += stats['settled']
+    assert 0 < settled < len(pairs) * compiled.num_nodes
+
+
+def test_bidirectional_on_networkx_graph(reference, pairs):
+    source, target = pairs[0]
+    assert bidirectional_dijkstra_algorithm(reference, source, target)[0] == \
+        pytest.approx(dijkstra_algorithm(reference, source, target)[0])
+
+
+def test_bidirectional_edge_cases(compiled, reference):
+    node = compiled.node_ids[0]
+    assert bidirectional_dijkstra_algorithm(compiled, node, node) == (0.0, [node])
+    assert bidirectional_dijkstra_algorithm(compiled, 'NOWHERE', node) == (float('infinity'), [])
+    isolated = next(n for n in reference if reference.degree(n) == 0)
+    source = next(iter(reference.edges))[0]
+    assert bidirectional_dijkstra_algorithm(compiled, source, isolated) == (float('infinity'), [])
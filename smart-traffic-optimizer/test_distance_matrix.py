@@ -0,0 +1,42 @@
+import networkx as nx
+import numpy as np
+import pytest
+from algorithms.distance_matrix import distance_matrix, nodes_of_type
+from algorithms.dijkstra import targeted_search
+
+
+def test_matrix_matches_networkx(compiled, reference, pairs):
+    sources = sorted({s for s, _ in pairs})[:8]
+    targets = sorted({t for _, t in pairs})[:6]
+    matrix, trees = distance_matrix(compiled, sources, targets, return_predecessors=True)
+    assert matrix.shape == (len(sources), len(targets))
+    for i, source in enumerate(sources):
+        lengths = nx.single_source_dijkstra_path_length(reference, source)
+        for j, target in enumerate(targets):
+            assert matrix[i, j] == pytest.approx(lengths[target])
+            path = trees.path(i, j)
+            assert path[0] == source and path[-1] == target
+            assert nx.path_weight(reference, path, 'weight') == pytest.approx(matrix[i, j])
+
+
+def test_unreachable_and_same_node(compiled, reference):
+    isolated = next(node for node in reference if reference.degree(node) == 0)
+    source = next(iter(reference.edges))[0]
+    matrix, trees = distance_matrix(compiled, [source], [isolated, source], return_predecessors=True)
+    assert matrix[0, 0] == np.inf and trees.path(0, 0) == []
+    assert matrix[0, 1] == 0.0 and trees.path(0, 1) == [source]
+
+
+def test_search_stops_at_targets(compiled, pairs):
+    source, target = pairs[0]
+    s, t = compiled.index[source], compiled.index[target]
+    distances, _ = targeted_search(compiled, s, [t])
+    full, _ = targeted_search(compiled, s, range(compiled.num_nodes))
+    assert distances[t] == full[t]
+    assert len(distances) < len(full)
+
+
+def test_nodes_of_type(data, compiled):
+    expected = [node for node, attrs in data["intersections"].items() if attrs.get("type", "city") == 'char_dham']
+    assert nodes_of_type(compiled, ['char_dham']) == expected
+    assert nodes_of_type(compiled, ['no_such_type']) == []
@@ -0,0 +1,70 @@
+import random
+import networkx as nx
+import numpy as np
+import pytest
+from algorithms.compiled_graph import compiled_graph_from_data
+from algorithms.dijkstra import shortest_path_tree
+from algorithms.dynamic_sssp import HotSourceTrees, benchmark_repair
+from algorithms.traffic_patch import apply_traffic_patch
+from conftest import patched_data, reference_graph
+
+
+def assert_trees_exact(trees, G):
+    for tree in trees.trees.values():
+        expected, _ = shortest_path_tree(G, tree.root)
+        np.testing.assert_allclose(tree.distances, expected, rtol=1e-9, atol=1e-9)
+        for target in G.node_ids[:40]:
+            path = tree.path(target)
+            if path:
+                edges = [G.edge_index(u, v) for u, v in zip(path[:-1], path[1:])]
+                assert sum(G.weight[edges]) == pytest.approx(tree.distance(target))
+
+
+@pytest.mark.parametrize('batch_size', [1, 5, 40])
+def test_repair_equals_recompute(data, compiled, batch_size):
+    trees = HotSourceTrees(compiled)
+    assert set(trees.trees) == {'DEH', 'HAR'}
+    rng = random.Random(batch_size)
+    for _ in range(10):
+        roads = rng.sample(range(len(data["roads"])), batch_size)
+        trees.update({i: rng.random() for i in roads}, data["roads"])
+        assert_trees_exact(trees, compiled)
+
+
+def test_update_keeps_traffic_and_weights_consistent(data, compiled):
+    trees = HotSourceTrees(compiled)
+    patch = {i: 1.0 - data["roads"][i]["traffic"] for i in range(0, len(data["roads"]), 4)}
+    trees.update(patch, data["roads"])
+
+    patched = patched_data(data, patch)
+    expected = compiled_graph_from_data(patched)
+    np.testing.assert_array_equal(compiled.traffic, expected.traffic)
+    np.testing.assert_array_equal(compiled.weight, expected.weight)
+
+    # Switching the traffic setting afterwards keeps the patched traffic
+    compiled.set_consider_traffic(False)
+    np.testing.assert_array_equal(compiled.weight, compiled_graph_from_data(patched, False).weight)
+    trees.refresh()
+    assert_trees_exact(trees, compiled)
+
+    R = reference_graph(patched, consider_traffic=False)
+    for target in ['RIS', 'NTL', 'HAR']:
+        assert trees['DEH'].distance(target) == pytest.approx(nx.dijkstra_path_length(R, 'DEH', target))
+
+
+def test_refresh_picks_up_outside_changes(data, compiled):
+    trees = HotSourceTrees(compiled)
+    assert trees.refresh() == {'DEH': 0, 'HAR': 0}
+    apply_traffic_patch(compiled, {i: 1.0 for i in range(0, len(data["roads"]), 3)}, data["roads"])
+    touched = trees.refresh()
+    assert sum(touched.values()) > 0
+    assert_trees_exact(trees, compiled)
+
+
+def test_benchmark_restores_traffic(data):
+    G = compiled_graph_from_data(data)
+    traffic, weight = G.traffic.copy(), G.weight.copy()
+    rows = benchmark_repair(G, batch_sizes=(1, 10), rounds=3)
+    assert all(row['exact'] for row in rows)
+    np.testing.assert_array_equal(G.traffic, traffic)
+    np.testing.assert_array_equal(G.weight, weight)
@@ -0,0 +1,44 @@
+import networkx as nx
+import pytest
+from algorithms.contraction_hierarchies import build_contraction_hierarchy
+from algorithms.hub_labels import build_hub_labels
+from conftest import assert_route
+
+
+@pytest.fixture
+def labels(compiled):
+    return build_hub_labels(compiled)
+
+
+def test_queries_match_networkx(labels, reference, pairs):
+    for source, target in pairs:
+        cost, path = labels.query(source, target)
+        assert_route(reference, source, target, cost, path)
+        assert labels.query(source, target, unpack=False) == (cost, [])
+
+
+def test_distance_table_matches_networkx(compiled, labels, reference, pairs):
+    sources = sorted({s for s, _ in pairs})[:6]
+    targets = sorted({t for _, t in pairs})[:6]
+    table = labels.distance_table([compiled.index[s] for s in sources], [compiled.index[t] for t in targets])
+    for i, source in enumerate(sources):
+        lengths = nx.single_source_dijkstra_path_length(reference, source)
+        for j, target in enumerate(targets):
+            assert table[i, j] == pytest.approx(lengths[target])
+            assert labels.distance(compiled.index[source], compiled.index[target]) == pytest.approx(lengths[target])
+
+
+def test_labels_from_existing_hierarchy(compiled, reference, pairs):
+    hierarchy = build_contraction_hierarchy(compiled)
+    labels = build_hub_labels(compiled, hierarchy)
+    assert labels.hierarchy is hierarchy
+    for source, target in pairs[:10]:
+        assert_route(reference, source, target, *labels.query(source, target))
+
+
+def test_unreachable_and_unknown(labels, reference, pairs):
+    isolated = next(node for node in reference if reference.degree(node) == 0)
+    assert labels.query(pairs[0][0], isolated) == (float('infinity'), [])
+    assert labels.query('NOWHERE', pairs[0][1]) == (float('infinity'), [])
+    stats = labels.stats()
+    assert stats['nodes'] == reference.number_of_nodes() and stats['entries'] == labels.num_entries
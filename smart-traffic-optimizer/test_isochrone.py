@@ -0,0 +1,74 @@
+import networkx as nx
+import pytest
+from algorithms.dijkstra import bounded_search
+from algorithms.isochrone import convex_hull, isochrones, travel_time_weights
+from conftest import cost_graph
+
+BUDGETS = [30, 60, 120]
+
+
+@pytest.fixture
+def travel_times(compiled):
+    return cost_graph(compiled, travel_time_weights(compiled))
+
+
+def test_reached_nodes_match_networkx(compiled, travel_times, pairs):
+    for source in sorted({s for s, _ in pairs[:5]}):
+        lengths = nx.single_source_dijkstra_path_length(travel_times, source)
+        areas = isochrones(compiled, source, BUDGETS)
+        assert [area.budget for area in areas] == BUDGETS
+        for area in areas:
+            expected = {node for node, length in lengths.items() if length <= area.budget}
+            assert set(area.nodes) == expected
+            for node in area.nodes:
+                assert area.costs[node] == pytest.approx(lengths[node])
+            assert [area.costs[node] for node in area.nodes] == sorted(area.costs.values())
+
+
+def test_frontier_edges_leave_the_area(compiled, travel_times, pairs):
+    source = pairs[0][0]
+    lengths = nx.single_source_dijkstra_path_length(travel_times, source)
+    for area in isochrones(compiled, source, BUDGETS):
+        expected = {(u, v) for u, v in travel_times.edges
+                    if lengths.get(u, float('inf')) <= area.budget < lengths.get(v, float('inf'))}
+        assert {(u, v) for u, v, _ in area.frontier} == expected
+        for u, v, fraction in area.frontier:
+            assert fraction == pytest.approx(
+                min(1.0, (area.budget - lengths[u]) / travel_times[u][v]['weight']))
+
+
+def test_areas_are_nested(compiled, pairs):
+    areas = isochrones(compiled, pairs[0][0], [120, 30, 60])
+    assert [area.budget for area in areas] == BUDGETS
+    for smaller, larger in zip(areas, areas[1:]):
+        assert set(smaller.nodes) <= set(larger.nodes)
+    polygon = areas[-1].polygon(compiled)
+    assert len(polygon) >= 3 and set(polygon) <= set(areas[-1].boundary_points(compiled))
+
+
+def test_bounded_search_stops_at_budget(compiled, travel_times, pairs):
+    source = pairs[0][0]
+    lengths = nx.single_source_dijkstra_path_length(travel_times, source)
+    weights = travel_time_weights(compiled)
+    nodes, distances = bounded_search(compiled, compiled.index[source], 45, weights=weights)
+    assert {compiled.node_ids[v] for v in nodes} == {node for node, length in lengths.items() if length <= 45}
+    assert distances == sorted(distances)
+
+
+def test_traffic_change_shrinks_areas(compiled, pairs):
+    source = pairs[0][0]
+    before = isochrones(compiled, source, [180])[0]
+    compiled.apply_traffic(list(range(compiled.num_edges)), [1.0] * compiled.num_edges)
+    after = isochrones(compiled, source, [180])[0]
+    assert set(after.nodes) < set(before.nodes)
+    assert all(after.costs[node] > before.costs[node] for node in after.nodes if node != source)
+
+
+def test_convex_hull():
+    square = [(0, 0), (1, 0), (1, 1), (0, 1), (0.5, 0.5), (1, 0)]
+    assert convex_hull(square) == [(0, 0), (1, 0), (1, 1), (0, 1)]
+    assert convex_hull([(0, 0), (1, 1)]) == [(0, 0), (1, 1)]
+
+
+def test_unknown_source(compiled):
+    assert isochrones(compiled, 'NOWHERE') == []
@@ -0,0 +1,37 @@
+from itertools import islice
+import networkx as nx
+import pytest
+from algorithms.k_shortest_paths import k_shortest_paths
+
+
+def test_yen_matches_networkx(compiled, reference, pairs):
+    k = 4
+    for source, target in pairs[:10]:
+        routes = k_shortest_paths(compiled, source, target, k=k)
+        expected = [nx.path_weight(reference, path, 'weight')
+                    for path in islice(nx.shortest_simple_paths(reference, source, target, 'weight'), k)]
+        assert [cost for cost, _ in routes] == pytest.approx(expected)
+        assert len({tuple(path) for _, path in routes}) == len(routes)
+        for cost, path in routes:
+            assert len(set(path)) == len(path)
+            assert nx.path_weight(reference, path, 'weight') == pytest.approx(cost)
+
+
+def test_penalty_routes_are_valid(compiled, reference, pairs):
+    for source, target in pairs[:10]:
+        routes = k_shortest_paths(compiled, source, target, k=3, method='penalty')
+        assert routes[0][0] == pytest.approx(nx.dijkstra_path_length(reference, source, target))
+        assert len({tuple(path) for _, path in routes}) == len(routes)
+        for cost, path in routes:
+            assert path[0] == source and path[-1] == target
+            assert nx.path_weight(reference, path, 'weight') == pytest.approx(cost)
+
+
+def test_edge_cases(compiled, reference, pairs):
+    source, target = pairs[0]
+    assert k_shortest_paths(compiled, source, target, k=0) == []
+    assert k_shortest_paths(compiled, 'NOWHERE', target) == []
+    isolated = next(node for node in reference if reference.degree(node) == 0)
+    assert k_shortest_paths(compiled, source, isolated) == []
+    with pytest.raises(ValueError):
+        k_shortest_paths(compiled, source, target, method='unknown')
@@ -0,0 +1,49 @@
+import networkx as nx
+import numpy as np
+import pytest
+from algorithms.distance_matrix import nodes_of_type
+from algorithms.nearest_facility import nearest_facilities
+
+FACILITY_TYPES = ['char_dham', 'pilgrimage']
+
+
+def facility_costs(reference, facilities):
+    """Cost from every node to every facility, by NetworkX searches over reverse edges"""
+    reverse = reference.reverse()
+    return {facility: nx.single_source_dijkstra_path_length(reverse, facility) for facility in facilities}
+
+
+@pytest.mark.parametrize('k', [1, 3])
+def test_nearest_match_networkx(compiled, reference, k):
+    facilities = nodes_of_type(compiled, FACILITY_TYPES)
+    costs = facility_costs(reference, facilities)
+    result = nearest_facilities(compiled, FACILITY_TYPES, k=k)
+    assert result.k == k
+    for node in compiled.node_ids:
+        expected = sorted(costs[f][node] for f in facilities if node in costs[f])[:k]
+        nearest = result.nearest(node)
+        assert [cost for _, cost in nearest] == pytest.approx(expected)
+        for facility, cost in nearest:
+            assert costs[facility][node] == pytest.approx(cost)
+        assert len({facility for facility, _ in nearest}) == len(nearest)
+
+
+def test_facilities_are_their_own_nearest(compiled):
+    result = nearest_facilities(compiled, FACILITY_TYPES)
+    for facility in nodes_of_type(compiled, FACILITY_TYPES):
+        assert result.nearest(facility) == [(facility, 0.0)]
+
+
+def test_results_follow_traffic(compiled):
+    first = nearest_facilities(compiled, FACILITY_TYPES, k=2)
+    assert nearest_facilities(compiled, list(reversed(FACILITY_TYPES)), k=2) is first
+    compiled.apply_traffic(list(range(compiled.num_edges)), [1.0] * compiled.num_edges)
+    second = nearest_facilities(compiled, FACILITY_TYPES, k=2)
+    assert second is not first
+    reached = np.isfinite(first.distances) & (first.distances > 0)
+    assert (second.distances[reached] > first.distances[reached]).all()
+
+
+def test_no_facilities(compiled):
+    result = nearest_facilities(compiled, ['no_such_type'], k=2)
+    assert result.nearest(compiled.node_ids[0]) == []
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+from algorithms.overlay_graph import OverlayGraph, build_overlay_graph, default_partition_levels, kmeans_partition
+from conftest import assert_route, patched_data, reference_graph
+
+PATCH = {0: 0.95, 3: 0.9, 10: 0.05, 25: 1.0}
+
+
+def test_queries_match_networkx(compiled, reference, pairs):
+    overlay = build_overlay_graph(compiled)
+    for source, target in pairs:
+        stats = {}
+        assert_route(reference, source, target, *overlay.query(source, target, stats=stats))
+        assert stats['settled'] > 0
+
+
+def test_partition_levels_nest(compiled):
+    fine, coarse = default_partition_levels(compiled)
+    for cell in np.unique(fine).tolist():
+        assert len(np.unique(coarse[fine == cell])) == 1
+    cells = kmeans_partition(compiled, 5)
+    assert sorted(np.unique(cells).tolist()) == list(range(len(np.unique(cells))))
+    with pytest.raises(ValueError):
+        OverlayGraph(compiled, [coarse, fine])
+
+
+def test_update_customizes_changed_cells(compiled, data, pairs):
+    overlay = build_overlay_graph(compiled)
+    customized = overlay.update(PATCH, data["roads"])
+    assert sum(customized) > 0 and customized[0] < len(overlay.cell_nodes[0])
+    expected = reference_graph(patched_data(data, PATCH))
+    for source, target in pairs:
+        assert_route(expected, source, target, *overlay.query(source, target))
+
+
+def test_refresh_picks_up_outside_changes(compiled, data, pairs):
+    overlay = build_overlay_graph(compiled)
+    assert overlay.refresh() == []
+    edges, traffic = [], []
+    for i, level in PATCH.items():
+        road = data["roads"][i]
+        edges += [compiled.edge_index(road["from"], road["to"]), compiled.edge_index(road["to"], road["from"])]
+        traffic += [level, level]
+    compiled.apply_traffic(edges, traffic)
+    expected = reference_graph(patched_data(data, PATCH))
+    for source, target in pairs:
+        assert_route(expected, source, target, *overlay.query(source, target))
+    np.testing.assert_array_equal(overlay.weight, compiled.weight)
+    assert overlay.refresh() == []
+
+
+def test_set_consider_traffic(compiled, data, pairs):
+    overlay = build_overlay_graph(compiled)
+    compiled.set_consider_traffic(False)
+    expected = reference_graph(data, consider_traffic=False)
+    for source, target in pairs:
+        assert_route(expected, source, target, *overlay.query(source, target))
+
+
+def test_unreachable_and_unknown(compiled, reference, pairs):
+    overlay = build_overlay_graph(compiled)
+    isolated = next(node for node in reference if reference.degree(node) == 0)
+    assert overlay.query(pairs[0][0], isolated) == (float('infinity'), [])
+    assert overlay.query('NOWHERE', pairs[0][1]) == (float('infinity'), [])
+    assert [level['level'] for level in overlay.stats()] == list(range(overlay.num_levels))
@@ -0,0 +1,66 @@
+import networkx as nx
+import pytest
+from algorithms.pareto import OBJECTIVES, edge_objectives, pareto_routes
+from conftest import cost_graph
+
+# Large enough that the front is not truncated on the bundled network
+UNBOUNDED_LABELS = 10 ** 6
+
+
+def strictly_dominates(a, b):
+    return all(x <= y for x, y in zip(a, b)) and any(x < y for x, y in zip(a, b))
+
+
+def objective_vector(route):
+    return tuple(route[name] for name in OBJECTIVES)
+
+
+def test_front_is_non_dominated(compiled, pairs):
+    for source, target in pairs[:8]:
+        routes = pareto_routes(compiled, source, target, max_labels=UNBOUNDED_LABELS)
+        assert routes
+        vectors = [objective_vector(route) for route in routes]
+        for a in vectors:
+            assert not any(strictly_dominates(b, a) for b in vectors)
+        assert [route['distance'] for route in routes] == sorted(route['distance'] for route in routes)
+
+
+def test_route_costs_follow_paths(compiled, pairs):
+    costs = edge_objectives(compiled)
+    for source, target in pairs[:8]:
+        for route in pareto_routes(compiled, source, target):
+            path = route['path']
+            assert path[0] == source and path[-1] == target
+            edges = [compiled.edge_index(u, v) for u, v in zip(path[:-1], path[1:])]
+            assert tuple(costs[edges].sum(axis=0)) == pytest.approx(objective_vector(route))
+
+
+def test_front_contains_each_single_objective_optimum(compiled, pairs):
+    costs = edge_objectives(compiled)
+    graphs = [cost_graph(compiled, costs[:, k]) for k in range(len(OBJECTIVES))]
+    for source, target in pairs[:8]:
+        routes = pareto_routes(compiled, source, target, max_labels=UNBOUNDED_LABELS)
+        for name, R in zip(OBJECTIVES, graphs):
+            best = min(route[name] for route in routes)
+            assert best == pytest.approx(nx.dijkstra_path_length(R, source, target), abs=1e-9)
+
+
+def test_bounded_front_stays_valid(compiled, pairs):
+    costs = edge_objectives(compiled)
+    for source, target in pairs[:8]:
+        stats = {}
+        exact = pareto_routes(compiled, source, target, max_labels=UNBOUNDED_LABELS)
+        approximate = pareto_routes(compiled, source, target, max_labels=4, epsilon=0.1, stats=stats)
+        assert 0 < len(approximate) <= len(exact)
+        assert approximate[0]['distance'] >= exact[0]['distance'] - 1e-9
+        for route in approximate:
+            path = route['path']
+            edges = [compiled.edge_index(u, v) for u, v in zip(path[:-1], path[1:])]
+            assert tuple(costs[edges].sum(axis=0)) == pytest.approx(objective_vector(route))
+        assert stats['labels'] >= stats['settled'] > 0
+
+
+def test_unreachable_and_unknown(compiled, reference, pairs):
+    isolated = next(node for node in reference if reference.degree(node) == 0)
+    assert pareto_routes(compiled, pairs[0][0], isolated) == []
+    assert pareto_routes(compiled, 'NOWHERE', pairs[0][1]) == []
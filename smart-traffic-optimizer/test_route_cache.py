@@ -0,0 +1,122 @@
+import gc
+import pytest
+from algorithms.astar import astar_algorithm
+from algorithms.compiled_graph import compiled_graph_from_data
+from algorithms.dijkstra import dijkstra_algorithm, bidirectional_dijkstra_algorithm
+from algorithms.route_cache import RouteCache, graph_cache_token
+from algorithms.traffic_patch import apply_traffic_patch
+from conftest import MONTH, reference_graph
+
+
+def test_hits_and_misses(compiled, pairs):
+    cache = RouteCache()
+    cached = cache.wrap(dijkstra_algorithm)
+    source, target = pairs[0]
+    first = cached(compiled, source, target)
+    assert cached(compiled, source, target) == first == dijkstra_algorithm(compiled, source, target)
+    cached(compiled, *pairs[1])
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (1, 2, 2)
+
+    # Returned paths are copies
+    cached(compiled, source, target)[1].append('X')
+    assert cached(compiled, source, target) == first
+
+
+def test_graphs_with_equal_data_share_entries(data, pairs):
+    cache = RouteCache()
+    cached = cache.wrap(dijkstra_algorithm)
+    cached(compiled_graph_from_data(data), *pairs[0])
+    cached(compiled_graph_from_data(data), *pairs[0])
+    assert cache.hits == 1
+
+
+def test_traffic_patch_invalidates(data, compiled, pairs):
+    cache = RouteCache()
+    cached = cache.wrap(dijkstra_algorithm)
+    cached(compiled, *pairs[0])
+    apply_traffic_patch(compiled, {i: 1.0 - road["traffic"] for i, road in enumerate(data["roads"])},
+                        data["roads"])
+    assert cached(compiled, *pairs[0]) == dijkstra_algorithm(compiled, *pairs[0])
+    assert cache.hits == 0
+
+
+def test_astar_invalidated_by_traffic_on_distance_weights(data, pairs):
+    # Distance-only weights do not change with traffic, but A* costs do
+    G = compiled_graph_from_data(data, consider_traffic=False)
+    cache = RouteCache()
+    cached = cache.wrap(astar_algorithm)
+    source, target = pairs[0]
+    cached(G, source, target, MONTH)
+    weights = G.weight.copy()
+    apply_traffic_patch(G, {i: 1.0 for i in range(len(data["roads"]))}, data["roads"])
+    assert (G.weight == weights).all()
+    assert cached(G, source, target, MONTH) == astar_algorithm(G, source, target, MONTH)
+    assert cache.hits == 0
+
+
+def test_calls_with_stats_bypass_cache(compiled, pairs):
+    cache = RouteCache()
+    cached = cache.wrap(bidirectional_dijkstra_algorithm)
+    cached(compiled, *pairs[0])
+    stats = {}
+    assert cached(compiled, *pairs[0], stats=stats) == cached(compiled, *pairs[0])
+    assert stats['settled'] > 0
+    assert (cache.hits, cache.misses) == (1, 1)
+
+
+def test_networkx_graphs_get_their_own_token(data, pairs):
+    cache = RouteCache()
+    cached = cache.wrap(dijkstra_algorithm)
+    G = reference_graph(data)
+    token = graph_cache_token(G)
+    assert graph_cache_token(G) == token
+
+    # A copy carries the token in G.graph but is a different graph
+    copy = G.copy()
+    assert graph_cache_token(copy)[0] != token[0]
+
+    cached(G, *pairs[0])
+    apply_traffic_patch(G, {0: 1.0 - data["roads"][0]["traffic"]}, data["roads"])
+    assert graph_cache_token(G)[1] == token[1] + 1
+
+    # A new graph never inherits the routes of a collected one
+    del G, copy
+    gc.collect()
+    other = reference_graph(data, consider_traffic=True)
+    for u, v, attrs in other.edges(data=True):
+        attrs['weight'] *= 2
+    assert cached(other, *pairs[0]) == dijkstra_algorithm(other, *pairs[0])
+    assert cache.hits == 0
+
+
+def test_eviction_keeps_memory_budget(compiled, pairs):
+    cache = RouteCache()
+    cached = cache.wrap(dijkstra_algorithm)
+    cached(compiled, *pairs[0])
+    entry_size = cache.current_bytes
+
+    cache = RouteCache(max_bytes=int(entry_size * 2.5))
+    cached = cache.wrap(dijkstra_algorithm)
+    for source, target in pairs[:10]:
+        cached(compiled, source, target)
+        assert cache.current_bytes <= cache.max_bytes
+    assert cache.evictions > 0 and len(cache) < 10
+
+    # The most recent route is still cached, the first one was evicted
+    cached(compiled, *pairs[9])
+    assert cache.hits == 1
+    cached(compiled, *pairs[0])
+    assert cache.hits == 1
+
+    cache.clear()
+    assert len(cache) == 0 and cache.current_bytes == 0
+
+
+def test_month_is_part_of_the_key(compiled, pairs):
+    cache = RouteCache()
+    cached = cache.wrap(astar_algorithm)
+    source, target = pairs[0]
+    assert cached(compiled, source, target, 1)[0] == pytest.approx(astar_algorithm(compiled, source, target, 1)[0])
+    assert cached(compiled, source, target, 7)[0] == pytest.approx(astar_algorithm(compiled, source, target, 7)[0])
+    assert cache.misses == 2
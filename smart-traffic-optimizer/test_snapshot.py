@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+from algorithms.snapshot import load_snapshot, main, read_header, save_snapshot
+from conftest import DATA_PATH
+from test_compiled_graph import assert_same_graph
+
+
+def test_round_trip(compiled, tmp_path):
+    path = tmp_path / 'uttarakhand.graph'
+    save_snapshot(compiled, str(path))
+    loaded = load_snapshot(str(path))
+    assert_same_graph(loaded, compiled)
+    assert isinstance(loaded.weight, np.memmap) or isinstance(loaded.weight.base, np.memmap)
+    assert read_header(str(path))['num_edges'] == compiled.num_edges
+
+
+def test_resave_is_byte_identical(compiled, tmp_path):
+    first, second = tmp_path / 'first.graph', tmp_path / 'second.graph'
+    save_snapshot(compiled, str(first))
+    save_snapshot(load_snapshot(str(first)), str(second))
+    assert first.read_bytes() == second.read_bytes()
+
+
+def test_copy_on_write_keeps_the_file(compiled, tmp_path):
+    path = tmp_path / 'uttarakhand.graph'
+    save_snapshot(compiled, str(path))
+    original = path.read_bytes()
+    loaded = load_snapshot(str(path))
+    loaded.apply_traffic(list(range(loaded.num_edges)), [1.0] * loaded.num_edges)
+    assert path.read_bytes() == original
+
+
+def test_rejects_other_files(tmp_path):
+    short, other = tmp_path / 'short.graph', tmp_path / 'other.graph'
+    short.write_bytes(b'STO')
+    other.write_bytes(b'NOTGRAPH' + bytes(64))
+    for path in (short, other):
+        with pytest.raises(ValueError):
+            load_snapshot(str(path))
+
+
+def test_truncated_file(compiled, tmp_path):
+    path = tmp_path / 'uttarakhand.graph'
+    save_snapshot(compiled, str(path))
+    path.write_bytes(path.read_bytes()[:-100])
+    with pytest.raises(ValueError):
+        load_snapshot(str(path))
+
+
+def test_creates_missing_directories(compiled, tmp_path, monkeypatch):
+    path = tmp_path / 'new' / 'nested' / 'uttarakhand.graph'
+    save_snapshot(compiled, str(path))
+    assert_same_graph(load_snapshot(str(path)), compiled)
+
+    # The command line default writes under data/cache/
+    monkeypatch.chdir(tmp_path)
+    main([DATA_PATH])
+    assert_same_graph(load_snapshot('data/cache/uttarakhand.graph'), compiled)
@@ -0,0 +1,85 @@
+import json
+import pytest
+import algorithms.streaming_import as streaming_import
+from algorithms.compiled_graph import compiled_graph_from_data
+from algorithms.snapshot import load_snapshot
+from algorithms.streaming_import import import_network, main
+from conftest import DATA_PATH
+from test_compiled_graph import assert_same_graph
+
+
+def jsonl_lines(data):
+    lines = [json.dumps({'id': node_id, **node}) for node_id, node in data["intersections"].items()]
+    return lines + [json.dumps(road) for road in data["roads"]]
+
+
+@pytest.mark.parametrize('consider_traffic', [True, False])
+def test_json_import_matches_compiled_graph(data, consider_traffic, monkeypatch):
+    # Small chunks make records straddle buffer refills
+    monkeypatch.setattr(streaming_import, 'CHUNK_SIZE', 97)
+    G, rejects = import_network(DATA_PATH, consider_traffic=consider_traffic)
+    assert rejects == []
+    assert_same_graph(G, compiled_graph_from_data(data, consider_traffic))
+
+
+def test_jsonl_rejects_bad_records(data, tmp_path):
+    lines = jsonl_lines(data)
+    bad = {
+        3: ('intersection', '{"id": "BAD1", "name": "No position"}'),
+        10: (None, '{"id": "BAD2", "pos": [30.1,'),
+        len(lines) - 5: ('road', json.dumps({'from': 'DEH', 'to': 'HAR', 'distance': -1,
+                                             'traffic': 0.5, 'name': 'Negative'})),
+        len(lines) - 1: ('road', json.dumps({'from': 'DEH', 'to': 'HAR', 'distance': 5,
+                                             'traffic': 2, 'name': 'Jammed'}))
+    }
+    # Insert from the end so earlier positions stay valid; line numbers are 1-based
+    for position in sorted(bad, reverse=True):
+        lines.insert(position, bad[position][1])
+    lines.insert(20, '')
+    path = tmp_path / 'network.jsonl'
+    path.write_text('\n'.join(lines) + '\n')
+
+    G, rejects = import_network(str(path))
+    expected_lines = []
+    for offset, position in enumerate(sorted(bad)):
+        line = position + offset + 1
+        expected_lines.append(line + 1 if line > 20 else line)
+    assert [reject['line'] for reject in rejects] == expected_lines
+    assert [reject['kind'] for reject in rejects] == [bad[position][0] for position in sorted(bad)]
+    assert_same_graph(G, compiled_graph_from_data(data))
+
+    with pytest.raises(ValueError):
+        import_network(str(path), max_rejects=2)
+
+
+def test_json_line_numbers_and_duplicates(tmp_path):
+    path = tmp_path / 'network.json'
+    path.write_text('{"roads": [\n'
+                    '  {"from": "A", "to": "B", "distance": 2, "traffic": 0.5, "name": "A-B"},\n'
+                    '  {"from": "A", "to": "B", "name": "No distance"}\n'
+                    '],\n'
+                    '"intersections": {\n'
+                    '  "A": {"pos": [30.0, 78.0], "name": "Alpha"},\n'
+                    '  "A": {"pos": [30.5, 78.5], "name": "Again"}\n'
+                    '}}\n')
+    G, rejects = import_network(str(path))
+    assert [(reject['line'], reject['kind']) for reject in rejects] == [(3, 'road'), (7, 'intersection')]
+    # Roads may come before their intersections; B keeps default attributes
+    assert list(G.node_ids) == ['A', 'B'] and list(G.node_names) == ['Alpha', 'B']
+    assert G.num_edges == 2 and G.weight.tolist() == [4.0, 4.0]
+
+
+def test_broken_json_syntax(tmp_path):
+    path = tmp_path / 'network.json'
+    path.write_text('{"intersections": {"A": {"pos": [30.0, 78.0], "name": "Alpha"}, "roads": [')
+    with pytest.raises(ValueError):
+        import_network(str(path))
+
+
+def test_main_writes_snapshot(data, tmp_path, capsys):
+    source = tmp_path / 'network.jsonl'
+    source.write_text('\n'.join(jsonl_lines(data) + ['{"id": "BAD"}']) + '\n')
+    snapshot = tmp_path / 'cache' / 'network.graph'
+    main([str(source), '--snapshot', str(snapshot)])
+    assert '1 records rejected' in capsys.readouterr().out
+    assert_same_graph(load_snapshot(str(snapshot)), compiled_graph_from_data(data))
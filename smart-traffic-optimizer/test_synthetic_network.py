@@ -0,0 +1,82 @@
+import networkx as nx
+import numpy as np
+import pytest
+from algorithms.snapshot import load_snapshot, save_snapshot
+from algorithms.synthetic_network import (ReferenceProfile, component_labels, connect_components, generate_network,
+                                          main, nearest_neighbors)
+from conftest import DATA_PATH
+from test_compiled_graph import assert_same_graph
+
+
+@pytest.fixture(scope='module')
+def profile(data):
+    return ReferenceProfile(data)
+
+
+def brute_force_neighbors(points, k, groups=None):
+    distances = ((points[:, None, :] - points[None, :, :]) ** 2).sum(axis=2)
+    np.fill_diagonal(distances, np.inf)
+    if groups is not None:
+        distances[groups[:, None] == groups[None, :]] = np.inf
+    return np.sort(distances, axis=1)[:, :k], distances
+
+
+@pytest.mark.parametrize('num_nodes', [50, 500])
+def test_same_seed_gives_identical_files(profile, tmp_path, num_nodes):
+    first, second, other = (tmp_path / f'{name}.graph' for name in ('first', 'second', 'other'))
+    save_snapshot(generate_network(num_nodes, profile, seed=3), str(first))
+    save_snapshot(generate_network(num_nodes, profile, seed=3), str(second))
+    save_snapshot(generate_network(num_nodes, profile, seed=4), str(other))
+    assert first.read_bytes() == second.read_bytes()
+    assert first.read_bytes() != other.read_bytes()
+
+
+@pytest.mark.parametrize('k', [1, 3, 8])
+def test_nearest_neighbors_match_brute_force(k):
+    rng = np.random.default_rng(0)
+    # Clustered points force the wider block searches
+    points = np.concatenate([rng.uniform(0, 100, (300, 2)), rng.normal(50, 0.5, (100, 2))])
+    neighbors = nearest_neighbors(points, k)
+    expected, distances = brute_force_neighbors(points, k)
+    found = np.take_along_axis(distances, neighbors, axis=1)
+    np.testing.assert_allclose(found, expected)
+    assert (neighbors != np.arange(len(points))[:, None]).all()
+
+
+def test_nearest_neighbors_in_other_groups():
+    rng = np.random.default_rng(1)
+    points = rng.uniform(0, 10, (120, 2))
+    groups = rng.integers(0, 3, len(points))
+    neighbors = nearest_neighbors(points, 2, groups=groups)
+    expected, distances = brute_force_neighbors(points, 2, groups)
+    np.testing.assert_allclose(np.take_along_axis(distances, neighbors, axis=1), expected)
+    # Fewer candidates than k are padded with -1
+    assert (nearest_neighbors(points[:3], 5) == -1).sum() == 3 * 3
+
+
+def test_component_labels_and_connection():
+    u, v = np.array([0, 1, 3, 5]), np.array([1, 2, 4, 6])
+    assert component_labels(8, u, v).tolist() == [0, 0, 0, 3, 3, 5, 5, 7]
+    points = np.random.default_rng(2).uniform(0, 10, (8, 2))
+    extra_u, extra_v = connect_components(points, u, v)
+    labels = component_labels(8, np.concatenate([u, extra_u]), np.concatenate([v, extra_v]))
+    assert len(np.unique(labels)) == 1
+
+
+@pytest.mark.parametrize('connected', [True, False])
+def test_generated_network(profile, connected):
+    stats = {}
+    G = generate_network(400, profile, neighbors=1, seed=5, connected=connected, stats=stats)
+    assert G.num_nodes == 400 and G.num_edges == 2 * stats['roads']
+    R = nx.DiGraph()
+    R.add_nodes_from(range(G.num_nodes))
+    R.add_edges_from(zip(G.sources.tolist(), G.targets.tolist()))
+    assert nx.is_strongly_connected(R) == connected
+    assert len(set(G.node_names)) == G.num_nodes
+    assert G.distance.min() >= 0.1 and 0 <= G.traffic.min() and G.traffic.max() <= 1
+
+
+def test_main_writes_default_output(data, tmp_path, monkeypatch, profile):
+    monkeypatch.chdir(tmp_path)
+    main(['--nodes', '200', '--seed', '9', '--data', DATA_PATH])
+    assert_same_graph(load_snapshot('data/cache/synthetic_200.graph'), generate_network(200, profile, seed=9))
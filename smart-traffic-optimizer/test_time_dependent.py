@@ -0,0 +1,67 @@
+from datetime import datetime, timedelta
+import numpy as np
+import pytest
+from algorithms.time_dependent import (route_schedule, time_dependent_algorithm, travel_time_profile,
+                                       _minutes_since_midnight)
+
+# A weekday morning rush hour in the pilgrimage season
+DEPARTURE = datetime(2024, 5, 10, 8, 30)
+
+
+def label_correcting(G, source, departure_time):
+    """Earliest arrival (minutes after departure) at every node, relaxing all edges until nothing changes"""
+    profile = travel_time_profile(G, departure_time)
+    departure = _minutes_since_midnight(departure_time)
+    arrival = {G.index[source]: departure}
+    sources, targets = G.sources.tolist(), G.targets.tolist()
+    changed = True
+    while changed:
+        changed = False
+        for e, (u, v) in enumerate(zip(sources, targets)):
+            if u not in arrival:
+                continue
+            time = arrival[u] + float(profile.travel_times(arrival[u], e, e + 1)[0])
+            if time < arrival.get(v, float('infinity')) - 1e-12:
+                arrival[v] = time
+                changed = True
+    return {G.node_ids[node]: time - departure for node, time in arrival.items()}
+
+
+def test_travel_times_are_fifo(compiled):
+    profile = travel_time_profile(compiled, DEPARTURE)
+    minutes = np.arange(0, 48 * 60, 7.5)
+    arrivals = np.array([m + profile.travel_times(m) for m in minutes])
+    assert (np.diff(arrivals, axis=0) >= -1e-9).all()
+
+
+def test_travel_times_interpolate_hourly_samples(compiled):
+    profile = travel_time_profile(compiled, DEPARTURE)
+    np.testing.assert_allclose(profile.travel_times(8 * 60), profile.samples(8))
+    np.testing.assert_allclose(profile.travel_times(8 * 60 + 30), (profile.samples(8) + profile.samples(9)) / 2)
+    assert (profile.traffic(8) <= 1.0).all()
+
+
+@pytest.mark.parametrize('use_heuristic', [False, True])
+def test_searches_match_label_correcting(compiled, pairs, use_heuristic):
+    for source in sorted({s for s, _ in pairs[:2]}):
+        expected = label_correcting(compiled, source, DEPARTURE)
+        for _, target in pairs:
+            travel_time, path = time_dependent_algorithm(compiled, source, target, DEPARTURE, use_heuristic)
+            assert travel_time == pytest.approx(expected[target])
+            assert path[0] == source and path[-1] == target
+
+
+def test_schedule_follows_route(compiled, pairs):
+    source, target = pairs[0]
+    travel_time, path = time_dependent_algorithm(compiled, source, target, DEPARTURE)
+    schedule = route_schedule(compiled, path, DEPARTURE)
+    assert [leg['from'] for leg in schedule] + [schedule[-1]['to']] == path
+    assert schedule[0]['enter'] == DEPARTURE
+    for leg, following in zip(schedule, schedule[1:]):
+        assert leg['arrive'] == following['enter']
+    assert sum(leg['travel_time'] for leg in schedule) == pytest.approx(travel_time)
+    assert schedule[-1]['arrive'] - DEPARTURE == pytest.approx(timedelta(minutes=travel_time), abs=timedelta(seconds=1))
+
+
+def test_unknown_nodes(compiled):
+    assert time_dependent_algorithm(compiled, 'NOWHERE', compiled.node_ids[0], DEPARTURE) == (float('infinity'), [])
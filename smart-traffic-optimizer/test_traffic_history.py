@@ -0,0 +1,115 @@
+import os
+from datetime import datetime, timedelta
+import numpy as np
+import pytest
+from algorithms.traffic_history import TrafficHistory
+
+
+START = datetime(2024, 5, 1, 8, 0)
+
+
+def fill_history(history, rows, step=timedelta(minutes=20)):
+    """Append rows with traffic row * 0.01 + road * 0.1 and return (times, traffic)"""
+    times = [START + i * step for i in range(rows)]
+    traffic = np.array([[i * 0.01 + r * 0.1 for r in range(history.num_roads)] for i in range(rows)],
+                       dtype=np.float32)
+    for time, levels in zip(times, traffic):
+        assert history.append(time, levels)
+    return np.array(times, dtype='datetime64[s]'), traffic
+
+
+def test_history_query_round_trip(data, tmp_path):
+    roads = data["roads"][:4]
+    history = TrafficHistory(str(tmp_path), roads, segment_rows=4)
+    times, traffic = fill_history(history, 10)
+    assert len(history) == 10 and len(history.segments) == 2
+
+    # Reopening reads the segments and the journal back
+    history = TrafficHistory(str(tmp_path), roads)
+    queried_times, queried = history.query()
+    np.testing.assert_array_equal(queried_times, times)
+    np.testing.assert_array_equal(queried, traffic)
+
+    start, end = START + timedelta(minutes=40), START + timedelta(minutes=140)
+    queried_times, queried = history.query(start, end, roads=[2, (roads[0]["from"], roads[0]["to"])])
+    mask = (times >= np.datetime64(start)) & (times <= np.datetime64(end))
+    np.testing.assert_array_equal(queried_times, times[mask])
+    np.testing.assert_array_equal(queried, traffic[mask][:, [2, 0]])
+
+    with pytest.raises(ValueError):
+        TrafficHistory(str(tmp_path), data["roads"][:3])
+
+
+def test_history_min_interval(data, tmp_path):
+    history = TrafficHistory(str(tmp_path), data["roads"][:2])
+    assert history.append(START, [0.1, 0.2], min_interval=timedelta(minutes=5))
+    assert not history.append(START + timedelta(minutes=4), [0.3, 0.4], min_interval=timedelta(minutes=5))
+    assert history.append(START + timedelta(minutes=5), [0.5, 0.6], min_interval=timedelta(minutes=5))
+    assert len(history) == 2
+
+
+def test_history_downsample(data, tmp_path):
+    history = TrafficHistory(str(tmp_path), data["roads"][:3], segment_rows=5)
+    times, traffic = fill_history(history, 12)
+
+    buckets, means = history.downsample('hourly')
+    hours = times.astype('datetime64[h]')
+    expected_buckets = np.unique(hours)
+    np.testing.assert_array_equal(buckets, expected_buckets)
+    expected = np.array([traffic[hours == hour].astype(np.float64).mean(axis=0) for hour in expected_buckets])
+    np.testing.assert_allclose(means, expected)
+
+    days, daily = history.downsample('daily', roads=[1])
+    np.testing.assert_array_equal(days, np.array(['2024-05-01'], dtype='datetime64[D]'))
+    np.testing.assert_allclose(daily[:, 0], [traffic[:, 1].astype(np.float64).mean()])
+
+    series_times, series = history.road_series(1, freq='hourly')
+    np.testing.assert_array_equal(series_times, expected_buckets)
+    np.testing.assert_allclose(series, expected[:, 1])
+
+    with pytest.raises(ValueError):
+        history.downsample('weekly')
+
+
+def test_history_retention(data, tmp_path):
+    history = TrafficHistory(str(tmp_path), data["roads"][:2], segment_rows=4)
+    times, traffic = fill_history(history, 10, step=timedelta(days=1))
+    assert [s['rows'] for s in history.segments] == [4, 4]
+
+    # The first segment ends on day 3, the second on day 7
+    now = START + timedelta(days=10)
+    assert history.apply_retention(timedelta(days=5), now=now) == 1
+    assert history.apply_retention(timedelta(days=5), now=now) == 0
+    assert len(os.listdir(tmp_path)) == 3  # manifest, one segment, journal
+
+    history = TrafficHistory(str(tmp_path))
+    queried_times, queried = history.query()
+    np.testing.assert_array_equal(queried_times, times[4:])
+    np.testing.assert_array_equal(queried, traffic[4:])
+
+
+def test_history_rejects_bad_input(data, tmp_path):
+    with pytest.raises(ValueError):
+        TrafficHistory(str(tmp_path / 'missing'))
+    history = TrafficHistory(str(tmp_path), data["roads"][:2])
+    with pytest.raises(ValueError):
+        history.append(START, [0.1, 0.2, 0.3])
+    with pytest.raises(KeyError):
+        history.query(roads=[2])
+    with pytest.raises(KeyError):
+        history.query(roads=[('NOWHERE', 'DEH')])
+
+
+def test_history_drops_partial_journal_record(data, tmp_path):
+    history = TrafficHistory(str(tmp_path), data["roads"][:2])
+    times, traffic = fill_history(history, 3)
+    with open(tmp_path / 'journal.bin', 'ab') as f:
+        f.write(b'\x01\x02\x03')
+
+    history = TrafficHistory(str(tmp_path))
+    assert len(history) == 3
+    queried_times, queried = history.query()
+    np.testing.assert_array_equal(queried_times, times)
+    np.testing.assert_array_equal(queried, traffic)
+    assert history.append(START + timedelta(hours=2), [0.5, 0.6])
+    assert len(TrafficHistory(str(tmp_path))) == 4
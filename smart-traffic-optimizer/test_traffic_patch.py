@@ -0,0 +1,74 @@
+import pytest
+from algorithms.compiled_graph import compiled_graph_from_data
+from algorithms.traffic_patch import apply_traffic_patch, road_endpoints, set_consider_traffic
+from conftest import patched_data, reference_graph
+from test_compiled_graph import assert_same_graph
+
+
+def make_patch(data):
+    """Index patch over every fifth road plus one (from, to) entry, and the same patch by index"""
+    by_index = {i: round(1.0 - data["roads"][i]["traffic"], 2) for i in range(0, len(data["roads"]), 5)}
+    road = data["roads"][3]
+    patch = dict(by_index)
+    patch[(road["from"], road["to"])] = by_index[3] = 0.9
+    return patch, by_index
+
+
+def assert_same_edges(G, expected):
+    assert set(G.edges) == set(expected.edges)
+    for u, v, attrs in expected.edges(data=True):
+        for key in ('weight', 'distance', 'traffic'):
+            assert G[u][v][key] == pytest.approx(attrs[key]), (u, v, key)
+
+
+@pytest.mark.parametrize('consider_traffic', [True, False])
+def test_compiled_patch_matches_rebuild(data, consider_traffic):
+    G = compiled_graph_from_data(data, consider_traffic)
+    patch, by_index = make_patch(data)
+    version = G.version
+    updated = apply_traffic_patch(G, patch, data["roads"])
+    assert updated and G.version > version
+    patched = patched_data(data, by_index)
+    assert_same_graph(G, compiled_graph_from_data(patched, consider_traffic))
+
+    # Reapplying the same levels changes nothing
+    version = G.version
+    assert apply_traffic_patch(G, patch, data["roads"]) == []
+    assert G.version == version
+
+    set_consider_traffic(G, not consider_traffic)
+    assert G.version > version
+    assert_same_graph(G, compiled_graph_from_data(patched, not consider_traffic))
+
+
+@pytest.mark.parametrize('consider_traffic', [True, False])
+def test_networkx_patch_matches_rebuild(data, consider_traffic):
+    G = reference_graph(data, consider_traffic)
+    patch, by_index = make_patch(data)
+    updated = apply_traffic_patch(G, patch, data["roads"])
+    assert updated and G.graph['version'] == 1
+    patched = patched_data(data, by_index)
+    assert_same_edges(G, reference_graph(patched, consider_traffic))
+
+    assert apply_traffic_patch(G, patch, data["roads"]) == []
+    assert G.graph['version'] == 1
+
+    set_consider_traffic(G, not consider_traffic)
+    assert G.graph['version'] == 2 and G.graph['consider_traffic'] == (not consider_traffic)
+    assert_same_edges(G, reference_graph(patched, not consider_traffic))
+    set_consider_traffic(G, not consider_traffic)
+    assert G.graph['version'] == 2
+
+
+def test_bad_input(data, compiled, reference):
+    for G in (compiled, reference):
+        with pytest.raises(ValueError):
+            apply_traffic_patch(G, {0: 1.5}, data["roads"])
+        with pytest.raises(ValueError):
+            apply_traffic_patch(G, {0: 0.5})
+        with pytest.raises(KeyError):
+            apply_traffic_patch(G, {('NOWHERE', 'DEH'): 0.5})
+    with pytest.raises(TypeError):
+        set_consider_traffic(data, False)
+    assert road_endpoints(('DEH', 'HAR')) == ('DEH', 'HAR')
+    assert road_endpoints(0, data["roads"]) == (data["roads"][0]["from"], data["roads"][0]["to"])